@@ -0,0 +1,128 @@
+"""
+Animation Module
+
+Decodes GIF animations once into SSD1306 page buffers and keeps them in
+memory, so playing an animation again costs no decoding, resizing or disk I/O.
+Decoded animations are cached by file path and modification time. Playback
+runs on a frame clock: every frame is due at a fixed offset from the start of
+the animation, so the time spent pushing a frame over I2C is absorbed instead
+of being added to the frame delay.
+"""
+import os
+import time
+from collections import OrderedDict, namedtuple
+from PIL import Image, ImageSequence
+from framebuffer import pack_pages
+
+# frames: page-packed frame bytes, delays: seconds each frame stays up,
+# last_image: the final frame as a 1-bit image.
+Animation = namedtuple('Animation', ['frames', 'delays', 'last_image'])
+
+
+def fit_frame(frame, size):
+    """
+    Scales a GIF frame to `size` and dithers it to 1 bit.
+
+    Frames narrower than the display's 2:1 aspect ratio are centered on a black
+    background first so they are not stretched.
+    """
+    frame = frame.convert('L')
+    width, height = frame.size
+    if width < height * 2:
+        padded = Image.new('L', (height * 2, height), 0)
+        padded.paste(frame, ((height * 2 - width) // 2, 0))
+        frame = padded
+    return frame.resize(size, Image.LANCZOS).convert('1')
+
+
+def decode_gif(gif_path, size, resize=None, position=(0, 0)):
+    """
+    Decodes every frame of a GIF into full-screen page-packed frames.
+
+    Parameters
+    ----------
+    gif_path : str
+        Path of the GIF file.
+    size : tuple
+        Display (width, height).
+    resize : tuple, optional
+        Size of the animation on the display (default is the display size).
+    position : tuple, optional
+        Top-left corner of the animation on the display (default is (0, 0)).
+
+    Returns
+    -------
+    Animation
+        The decoded animation.
+    """
+    frames = []
+    delays = []
+    canvas = None
+    with Image.open(gif_path) as gif:
+        for frame in ImageSequence.Iterator(gif):
+            delays.append(frame.info.get('duration', 100) / 1000.0)
+            canvas = Image.new('1', size)
+            canvas.paste(fit_frame(frame, resize or size), position)
+            frames.append(pack_pages(canvas))
+    return Animation(tuple(frames), tuple(delays), canvas)
+
+
+class AnimationCache:
+    """
+    Keeps decoded animations in memory, keyed by path, size and placement.
+
+    An entry is decoded again when the file's modification time changes.
+    `decoder` is called with the same arguments as decode_gif() on a miss,
+    which lets a persistent cache sit behind this one.
+    """
+
+    def __init__(self, max_entries=4, decoder=decode_gif):
+        self.max_entries = max_entries
+        self.decoder = decoder
+        self._entries = OrderedDict()
+
+    def get(self, gif_path, size, resize=None, position=(0, 0)):
+        """Returns the decoded animation, decoding it on first use or when the file changed."""
+        path = os.path.abspath(gif_path)
+        mtime = os.stat(path).st_mtime_ns
+        key = (path, tuple(size), tuple(resize) if resize else None, tuple(position))
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == mtime:
+            self._entries.move_to_end(key)
+            return entry[1]
+        animation = self.decoder(path, size, resize, position)
+        self._entries[key] = (mtime, animation)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return animation
+
+    def clear(self):
+        """Drops all decoded animations."""
+        self._entries.clear()
+
+
+def play(animation, push_frame, clock=None, sleep=None):
+    """
+    Plays an animation on its own frame clock.
+
+    Parameters
+    ----------
+    animation : Animation
+        The animation to play.
+    push_frame : callable
+        Called with the page-packed bytes of every frame.
+    clock : callable, optional
+        Monotonic time source (default is time.monotonic).
+    sleep : callable, optional
+        Sleep function (default is time.sleep).
+    """
+    clock = clock or time.monotonic
+    sleep = sleep or time.sleep
+    due = clock()
+    for frame, delay in zip(animation.frames, animation.delays):
+        push_frame(frame)
+        due += delay
+        remaining = due - clock()
+        if remaining > 0:
+            sleep(remaining)
@@ -12,32 +12,84 @@ import sys
 import time
 import atexit
 import signal
+import asyncio
 import threading
+import contextlib
 import datetime
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 
 from oled import OLED
 from expansion import Expansion
-from plugin_loader import load_plugins
+from plugin_loader import load_plugins, PluginReloader
 from logger import setup_logger
+from scheduler import Scheduler, advance_deadline
+from metrics import MetricsStore
+from sampler import Sampler
+from profiler import Profiler
+from metrics_exporter import MetricsExporter, render_metrics, DEFAULT_HOST
+import status_channel
+from led_compositor import LedCompositor
+from led_effects import FRAME_RATE
 
 class Pi_Monitor:
     __slots__ = ['oled', 'expansion', 'font_size', 'cleanup_done', 
-                 'stop_event', '_format_strings', 'plugins', 'logger']
+                 'stop_event', '_format_strings', 'plugins', 'logger',
+                 'scheduler', 'snapshot_max_age', '_snapshot', 'metrics',
+                 '_loop', '_wakeups', 'leds', 'reloader', 'profiler', 'exporter', 'sampler',
+                 '_update_gate', '_updates_in_flight', '_reloading']
 
-    def __init__(self, oled, expansion):
+    DEFAULT_PERIOD = 1.0  # Used for plugins that do not declare a valid period
+    STATUS_LOG_PERIOD = 1.0
+    SNAPSHOT_PERIOD = 2.0  # Interval of the scheduled expansion board read
+    SNAPSHOT_METRICS = ('temp', 'fan_mode', 'fan0_duty', 'fan1_duty', 'led_mode')
+    LED_FRAME_PERIOD = 1.0 / FRAME_RATE
+    PROFILE_SUMMARY_PERIOD = 60.0  # Interval of the plugin timing summary in the log
+    RELOAD_CHECK_PERIOD = 1.0  # Interval between checks for edited plugin modules
+    RELOAD_WAIT = 5.0  # Longest wait for running updates before a reload is deferred
+    EXPORT_PERIOD = 1.0  # Interval at which the page served to metrics scrapers is rendered
+
+    def __init__(self, oled, expansion, snapshot_max_age=5.0, enabled_plugins=None, hot_reload=False,
+                 metrics_port=None, metrics_host=DEFAULT_HOST):
         # Initialize OLED and Expansion objects
         self.oled = oled
         self.expansion = expansion
+        self.snapshot_max_age = snapshot_max_age
+        self._snapshot = None
         self.font_size = 12
         self.cleanup_done = False
         self.stop_event = threading.Event()  # Keep for signal handling
+        self.scheduler = Scheduler()
+        self.metrics = MetricsStore()  # History of every plugin's readings
+        self.sampler = Sampler()  # One /proc and sysfs read per tick, shared by the plugins
+        self._loop = None  # Event loop of the asyncio runtime
+        self._wakeups = {}  # Plugin name -> asyncio.Event used by request_update
+        self._update_gate = threading.Condition()  # Guards the two fields below
+        self._updates_in_flight = 0  # Async plugin updates currently running
+        self._reloading = False  # New async updates are skipped while set
         
         # Set up logger
         self.logger = setup_logger()
+        self.profiler = Profiler(logger=self.logger)  # Times every plugin update
         
-        # Load plugins
-        self.plugins = load_plugins(self.oled, self.expansion)
-        self.logger.info(f"Loaded {len(self.plugins)} plugins.")
+        # LED plugins submit layers; the compositor writes the LEDs once per frame
+        self.leds = LedCompositor(self.expansion)
+
+        # Load plugins (all registered plugins unless a subset is enabled)
+        self.plugins = load_plugins(self.oled, self.expansion, self.leds, enabled_plugins)
+        self.logger.info("Loaded %s plugins.", len(self.plugins))
+        self.profiler.exempt.update(name for name, plugin in self.plugins.items()
+                                    if getattr(plugin, 'critical', False) is True)
+
+        # Edited plugin modules are swapped in while the monitor keeps running
+        self.reloader = PluginReloader(self.plugins, self.oled, self.expansion, self.leds) if hot_reload else None
+
+        # Prometheus endpoint, disabled unless a port is given
+        self.exporter = None
+        if metrics_port is not None:
+            self.exporter = MetricsExporter(metrics_port, metrics_host)
+            self.exporter.start()
+            self.logger.info("Serving metrics on %s port %s", metrics_host or 'all interfaces', self.exporter.port)
 
         # Ensure LedControlPlugin's initial mode is set, triggering set_led_mode(1)
         if 'led_control' in self.plugins:
@@ -46,6 +98,9 @@ class Pi_Monitor:
         # Pre-allocate format strings
         self._format_strings = {
             'cpu': "CPU: {}%",
+            'cores': "CORE {}",
+            'cpu_wait': "IO{}% IRQ{}% ST{}%",
+            'process': "{} {}%",
             'mem': "MEM: {}%", 
             'disk': "DISK: {}%",
             'date': "Date: {}",
@@ -69,7 +124,7 @@ class Pi_Monitor:
         try:
             return datetime.date.today().strftime('%Y-%m-%d')
         except Exception as e:
-            self.logger.error(f"Error getting date: {e}")
+            self.logger.error("Error getting date: %s", e)
             return "1990-1-1"
 
     def get_raspberry_weekday(self):
@@ -79,7 +134,7 @@ class Pi_Monitor:
         try:
             return datetime.date.today().strftime('%A')
         except Exception as e:
-            self.logger.error(f"Error getting weekday: {e}")
+            self.logger.error("Error getting weekday: %s", e)
             return "Error"
 
     def get_raspberry_time(self):
@@ -89,40 +144,48 @@ class Pi_Monitor:
         try:
             return datetime.datetime.now().strftime('%H:%M:%S')
         except Exception as e:
-            self.logger.error(f"Error getting time: {e}")
+            self.logger.error("Error getting time: %s", e)
             return '0:0:0'
 
-    def get_computer_temperature(self):
-        # Get the computer temperature using Expansion object
+    def refresh_expansion_snapshot(self):
+        """Read all expansion board registers in one pass and cache the result"""
         try:
-            return self.expansion.get_temp()
+            self._snapshot = self.expansion.snapshot()
         except Exception as e:
-            self.logger.error(f"Error getting computer temperature: {e}")
-            return 0
+            self.logger.error("Error reading expansion board snapshot: %s", e)
+            return self._snapshot
+        for field in self.SNAPSHOT_METRICS:
+            self.metrics.record(f"expansion.{field}", getattr(self._snapshot, field), self._snapshot.timestamp)
+        return self._snapshot
+
+    def get_expansion_snapshot(self, max_age=None):
+        """Return the cached expansion board snapshot, re-reading it only if older than max_age seconds"""
+        if max_age is None:
+            max_age = self.snapshot_max_age
+        snapshot = self._snapshot
+        if snapshot is None or time.monotonic() - snapshot.timestamp > max_age:
+            snapshot = self.refresh_expansion_snapshot()
+        return snapshot
+
+    def get_computer_temperature(self):
+        # Get the computer temperature from the expansion board snapshot
+        snapshot = self.get_expansion_snapshot()
+        return snapshot.temp if snapshot else 0
 
     def get_computer_fan_mode(self):
-        # Get the computer fan mode using Expansion object
-        try:
-            return self.expansion.get_fan_mode()
-        except Exception as e:
-            self.logger.error(f"Error getting fan mode: {e}")
-            return 0
+        # Get the computer fan mode from the expansion board snapshot
+        snapshot = self.get_expansion_snapshot()
+        return snapshot.fan_mode if snapshot else 0
 
     def get_computer_fan_duty(self):
-        # Get the computer fan duty cycle using Expansion object
-        try:
-            return self.expansion.get_fan0_duty()
-        except Exception as e:
-            self.logger.error(f"Error getting fan duty: {e}")
-            return 0
+        # Get the computer fan duty cycle from the expansion board snapshot
+        snapshot = self.get_expansion_snapshot()
+        return snapshot.fan0_duty if snapshot else 0
 
     def get_computer_led_mode(self):
-        # Get the computer LED mode using Expansion object
-        try:
-            return self.expansion.get_led_mode()
-        except Exception as e:
-            self.logger.error(f"Error getting led mode: {e}")
-            return 0
+        # Get the computer LED mode from the expansion board snapshot
+        snapshot = self.get_expansion_snapshot()
+        return snapshot.led_mode if snapshot else 0
 
     def cleanup(self):
         # Perform cleanup operations
@@ -130,68 +193,328 @@ class Pi_Monitor:
             return
         self.cleanup_done = True
         self.logger.info("Cleaning up and shutting down.")
+        if self.reloader is not None:
+            self.reloader.close()
+        try:
+            self.sampler.close()
+        except Exception as e:
+            self.logger.error("Error closing sampler: %s", e)
+        try:
+            if self.exporter:
+                self.exporter.stop()
+        except Exception as e:
+            self.logger.error("Error stopping metrics exporter: %s", e)
+        try:
+            if self.expansion:
+                stats = self.expansion.cache_stats()
+                self.logger.info("Register cache: %s writes skipped, %s writes sent.", stats['hits'], stats['misses'])
+        except Exception as e:
+            self.logger.error("Error reading register cache stats: %s", e)
         try:
             if self.oled:
                 self.oled.close()
         except Exception as e:
-            self.logger.error(f"Error closing OLED: {e}")
+            self.logger.error("Error closing OLED: %s", e)
         try:
             if self.expansion:
                 self.expansion.set_led_mode(1)
         except Exception as e:
-            self.logger.error(f"Error setting LED mode during cleanup: {e}")
+            self.logger.error("Error setting LED mode during cleanup: %s", e)
         try:
             if self.expansion:
                 self.expansion.set_all_led_color(0, 0, 0)
         except Exception as e:
-            self.logger.error(f"Error setting LED color during cleanup: {e}")
+            self.logger.error("Error setting LED color during cleanup: %s", e)
         try:
             if self.expansion:
                 self.expansion.set_fan_mode(0)
         except Exception as e:
-            self.logger.error(f"Error setting fan mode during cleanup: {e}")
+            self.logger.error("Error setting fan mode during cleanup: %s", e)
         try:
             if self.expansion:
                 self.expansion.set_fan_frequency(50)
         except Exception as e:
-            self.logger.error(f"Error setting fan frequency during cleanup: {e}")
+            self.logger.error("Error setting fan frequency during cleanup: %s", e)
         try:
             if self.expansion:
                 self.expansion.set_fan_duty(0, 0)
         except Exception as e:
-            self.logger.error(f"Error setting fan duty during cleanup: {e}")
+            self.logger.error("Error setting fan duty during cleanup: %s", e)
         try:
             if self.expansion:
                 self.expansion.end()
         except Exception as e:
-            self.logger.error(f"Error closing expansion board: {e}")
+            self.logger.error("Error closing expansion board: %s", e)
 
     def handle_signal(self, signum, frame):
         # Handle signal to stop the application
-        self.logger.info(f"Received signal {signum}, shutting down.")
+        self.logger.info("Received signal %s, shutting down.", signum)
         self.stop_event.set()
         self.cleanup()
         sys.exit(0)
 
+    def plugin_period(self, plugin):
+        """Return the update period declared by a plugin, falling back to DEFAULT_PERIOD"""
+        period = getattr(plugin, 'period', None)
+        if isinstance(period, bool) or not isinstance(period, (int, float)) or period <= 0:
+            return self.DEFAULT_PERIOD
+        return period
+
+    def plugin_levels(self):
+        """
+        Return the dependency level of every plugin.
+
+        A plugin's level is one more than the highest level among the plugins
+        producing data it consumes, so producers always sit below their
+        consumers. Raises ValueError for a cycle.
+        """
+        def declared(plugin, attr):
+            names = getattr(plugin, attr, ())
+            return tuple(names) if isinstance(names, (tuple, list)) else ()
+
+        producers = {}
+        for name, plugin in self.plugins.items():
+            for data in declared(plugin, 'produces'):
+                producers.setdefault(data, []).append(name)
+        depends = {name: {producer for data in declared(plugin, 'consumes')
+                          for producer in producers.get(data, ()) if producer != name}
+                   for name, plugin in self.plugins.items()}
+
+        levels = {}
+        def level(name, chain):
+            if name in levels:
+                return levels[name]
+            if name in chain:
+                raise ValueError(f"Plugin data cycle: {' -> '.join(chain + (name,))}")
+            levels[name] = max((level(dependency, chain + (name,)) + 1 for dependency in depends[name]), default=0)
+            return levels[name]
+
+        for name in self.plugins:
+            level(name, ())
+        return levels
+
+    def record_plugin_metrics(self, name, plugin):
+        """Append the attributes a plugin lists in `metrics` to the metrics history"""
+        now = time.monotonic()
+        for attr in plugin.metrics:
+            self.metrics.record(f"{name}.{attr}", getattr(plugin, attr, None), now)
+
+    def run_plugin(self, name, plugin):
+        """Update a plugin, timing it, and record its metrics. Ticks the watchdog skips do nothing"""
+        if self.profiler.measure(name, self.plugin_period(plugin), lambda: plugin.update(self)):
+            self.record_plugin_metrics(name, plugin)
+
+    async def run_plugin_async(self, name, plugin):
+        """Asyncio counterpart of run_plugin"""
+        with self._update_gate:
+            if self._reloading:
+                return  # Plugins are being replaced; the next period runs the new instance
+            self._updates_in_flight += 1
+            plugin = self.plugins.get(name, plugin)  # May have been replaced since the task looked it up
+        try:
+            if not self.profiler.should_run(name):
+                return
+            # The update may run in an executor thread, so only wall time is known here
+            start = time.perf_counter()
+            try:
+                await plugin.update_async(self)
+            finally:
+                self.profiler.record(name, self.plugin_period(plugin), time.perf_counter() - start)
+            self.record_plugin_metrics(name, plugin)
+        finally:
+            with self._update_gate:
+                self._updates_in_flight -= 1
+                self._update_gate.notify_all()
+
+    def log_profile_summary(self):
+        """Log the per-plugin timing summary and the register cache counters"""
+        line = f"Plugin timing (mean/p95): {self.profiler.summary()}"
+        try:
+            stats = self.expansion.cache_stats()
+            line += f"; register cache {stats['hit_rate']:.0%} hits ({stats['misses']} writes sent)"
+        except Exception:
+            pass
+        self.logger.info(line)
+
+    def request_update(self, name):
+        """Run a plugin as soon as possible instead of at its next period. Safe to call from plugin threads."""
+        wakeup = self._wakeups.get(name)
+        if wakeup is not None:
+            self._loop.call_soon_threadsafe(wakeup.set)
+            return True
+        return self.scheduler.trigger(name)
+
+    @contextlib.contextmanager
+    def paused_updates(self, timeout=None):
+        """Hold new async plugin updates off and yield whether the running ones finished within `timeout`"""
+        with self._update_gate:
+            self._reloading = True
+            idle = self._update_gate.wait_for(lambda: not self._updates_in_flight,
+                                              self.RELOAD_WAIT if timeout is None else timeout)
+        try:
+            yield idle
+        finally:
+            with self._update_gate:
+                self._reloading = False
+
+    def reload_plugins(self):
+        """Reload the plugin modules edited since the last check"""
+        # The sync scheduler runs this job before the plugin levels, but the
+        # async runtime runs it alongside plugin updates
+        replaced = self.reloader.check(pause=self.paused_updates)
+        if replaced:
+            self.logger.info("Reloaded plugins: %s", ', '.join(replaced))
+        return replaced
+
+    def export_metrics(self):
+        """Render the metrics page from the values gathered this tick and hand it to the exporter"""
+        security = self.plugins.get('security_status')
+        labeled = []
+        cpu_monitor = self.plugins.get('cpu_monitor')
+        if cpu_monitor is not None:
+            for core, usage in enumerate(cpu_monitor.per_core_usage):
+                labeled.append(('cpu_core_usage', {'core': core}, usage))
+            for pid, name, percent in cpu_monitor.top_processes:
+                labeled.append(('process_cpu_usage', {'pid': pid, 'name': name}, percent))
+        disk_monitor = self.plugins.get('disk_monitor')
+        if disk_monitor is not None:
+            for mountpoint, usage in disk_monitor.mount_usage.items():
+                labeled.append(('filesystem_usage', {'mountpoint': mountpoint}, usage))
+            for field in ('read_bytes', 'write_bytes', 'iops', 'service_time'):
+                for device, rates in disk_monitor.disk_io.items():
+                    labeled.append((f'disk_{field}', {'device': device}, rates[field]))
+        throttle_monitor = self.plugins.get('throttle_monitor')
+        if throttle_monitor is not None:
+            for policy, mhz in throttle_monitor.clocks.items():
+                labeled.append(('cpu_clock_mhz', {'policy': policy}, mhz))
+            for zone, temperature in throttle_monitor.zone_temperatures.items():
+                labeled.append(('thermal_zone_temperature', {'zone': zone}, temperature))
+        self.exporter.publish(render_metrics(self.metrics, self.profiler,
+                                             security.current_mode if security is not None else None,
+                                             status_channel.MODES, labeled))
+
+    def log_status(self):
+        # Use single print statement to reduce I/O
+        self.logger.debug("CPU TEMP: %sC, FAN PWM: %s", self.plugins['cpu_temp'].cpu_temperature, self.plugins['fan_pwm'].fan_pwm)
+
+    def housekeeping_jobs(self):
+        """Return the (name, callback, period, after_plugins) jobs the monitor runs besides its plugins"""
+        jobs = [('_expansion_snapshot', self.refresh_expansion_snapshot, self.SNAPSHOT_PERIOD, False)]
+        if self.reloader is not None:
+            jobs.append(('_plugin_reload', self.reload_plugins, self.RELOAD_CHECK_PERIOD, False))
+        jobs.append(('_led_render', self.leds.render, self.LED_FRAME_PERIOD, True))
+        jobs.append(('_profile_summary', self.log_profile_summary, self.PROFILE_SUMMARY_PERIOD, True))
+        if self.exporter is not None:
+            jobs.append(('_metrics_export', self.export_metrics, self.EXPORT_PERIOD, True))
+        if 'cpu_temp' in self.plugins and 'fan_pwm' in self.plugins:
+            jobs.append(('_status_log', self.log_status, self.STATUS_LOG_PERIOD, True))
+        return jobs
+
+    def build_schedule(self):
+        """
+        Register every plugin and housekeeping job with the scheduler at its own period.
+
+        Plugins are scheduled at their dependency level; housekeeping jobs run
+        before or after all plugins. Returns the largest number of plugins
+        sharing a level.
+        """
+        levels = self.plugin_levels()
+        top = max(levels.values(), default=0)
+        jobs = self.housekeeping_jobs()
+        for name, callback, period, after_plugins in jobs:
+            if not after_plugins:
+                self.scheduler.add(name, callback, period, level=-1)
+        for name, plugin in self.plugins.items():
+            # Looked up on every run so a hot-reloaded plugin takes over
+            self.scheduler.add(name, lambda name=name: self.run_plugin(name, self.plugins[name]),
+                               self.plugin_period(plugin), level=levels[name])
+        for name, callback, period, after_plugins in jobs:
+            if after_plugins:
+                self.scheduler.add(name, callback, period, level=top + 1)
+        return max(Counter(levels.values()).values(), default=1)
+
     def run_monitor_loop(self):
-        """Main monitoring loop - single-threaded infinite loop for both OLED display and fan control"""
+        """Main monitoring loop - deadline scheduler running independent plugins of a level in parallel"""
         self.logger.info("Starting monitor loop.")
+        width = self.build_schedule()
+        # Producers due in the same tick (sysfs, I2C reads) overlap
+        # their waits; their consumers run once all of them returned.
+        with ThreadPoolExecutor(max_workers=max(width, 1), thread_name_prefix='plugin') as executor:
+            self.scheduler.executor = executor
+            try:
+                # Sleeps only until the next plugin is due
+                self.scheduler.run(self.stop_event)
+            finally:
+                self.scheduler.executor = None
+
+    async def _run_periodic_async(self, job, period, wakeup=None):
+        """Await `job()` every `period` seconds, or early when `wakeup` is set, until the stop event is set"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
         while not self.stop_event.is_set():
-            # Update all loaded plugins
-            for plugin in self.plugins.values():
-                plugin.update(self)
+            await job()
+            now = loop.time()
+            deadline = advance_deadline(deadline, period, now)
+            if wakeup is None:
+                await asyncio.sleep(deadline - now)
+                continue
+            try:
+                await asyncio.wait_for(wakeup.wait(), deadline - now)
+                deadline = loop.time()  # Woken early; the cadence restarts from here
+            except asyncio.TimeoutError:
+                pass
+            wakeup.clear()
+
+    async def run_monitor_loop_async(self):
+        """Asyncio monitoring loop - every plugin runs as its own task so a blocked plugin cannot stall the others"""
+        self.logger.info("Starting asyncio monitor loop.")
+        loop = asyncio.get_running_loop()
+        # One worker per job so a stuck sensor only ever holds its own thread,
+        # plus one worker that waits for the stop event.
+        executor = ThreadPoolExecutor(max_workers=len(self.plugins) + len(self.housekeeping_jobs()) + 1, thread_name_prefix='plugin')
+        loop.set_default_executor(executor)
+        self._loop = loop
+        self._wakeups = {name: asyncio.Event() for name in self.plugins}
 
-            # Use single print statement to reduce I/O
-            self.logger.debug(f"CPU TEMP: {self.plugins['cpu_temp'].cpu_temperature}C, FAN PWM: {self.plugins['fan_pwm'].fan_pwm}")
-            
-            time.sleep(1)  # Base interval of 1 second
+        tasks = []
+        for name, plugin in self.plugins.items():
+            job = lambda name=name: self.run_plugin_async(name, self.plugins[name])
+            tasks.append(asyncio.create_task(self._run_periodic_async(job, self.plugin_period(plugin), self._wakeups[name]), name=name))
+        for name, callback, period, _ in self.housekeeping_jobs():
+            job = lambda callback=callback: loop.run_in_executor(None, callback)
+            tasks.append(asyncio.create_task(self._run_periodic_async(job, period), name=name))
+
+        stop_waiter = loop.run_in_executor(None, self.stop_event.wait)
+        try:
+            # Returns as soon as the monitor is stopped or a plugin raised
+            done, _ = await asyncio.wait(tasks + [stop_waiter], return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                task.result()
+        finally:
+            self.stop_event.set()  # Releases the stop waiter
+            for task in tasks:
+                task.cancel()
+            self._wakeups = {}
+            executor.shutdown(wait=False)
 
 import argparse
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Pi Monitor")
-    parser.add_argument('--led_mode', type=str, default='rainbow_fade', choices=['rainbow_fade', 'rgb_strobe', 'off'],
-                        help='Set the LED mode. Available modes: rainbow_fade, rgb_strobe, off')
+    parser.add_argument('--led_mode', type=str, default='rainbow_fade', choices=['rainbow_fade', 'rgb_strobe', 'chase', 'cpu_meter', 'off'],
+                        help='Set the LED mode. Available modes: rainbow_fade, rgb_strobe, chase, cpu_meter (one LED per core), off')
+    parser.add_argument('--runtime', type=str, default='sync', choices=['sync', 'async'],
+                        help='Plugin runtime. sync: single-threaded scheduler, async: asyncio tasks with blocking work in an executor')
+    parser.add_argument('--snapshot_max_age', type=float, default=5.0,
+                        help='Maximum age in seconds of the cached expansion board readings shown on the OLED')
+    parser.add_argument('--plugins', type=str, default=None,
+                        help='Comma-separated plugins to enable (default: all). Required plugins are enabled automatically')
+    parser.add_argument('--hot_reload', action='store_true',
+                        help='Reload edited plugin modules without restarting the monitor')
+    parser.add_argument('--metrics_port', type=int, default=None,
+                        help='Serve Prometheus metrics on this port (default: disabled)')
+    parser.add_argument('--metrics_host', type=str, default=DEFAULT_HOST,
+                        help='Address the metrics endpoint binds to (default: %(default)s, use 0.0.0.0 for every interface)')
     args = parser.parse_args()
 
     pi_monitor = None
@@ -203,19 +526,25 @@ if __name__ == "__main__":
 
         oled = OLED()
         expansion = Expansion()
-        pi_monitor = Pi_Monitor(oled, expansion)
+        enabled_plugins = [name.strip() for name in args.plugins.split(',') if name.strip()] if args.plugins else None
+        pi_monitor = Pi_Monitor(oled, expansion, snapshot_max_age=args.snapshot_max_age, enabled_plugins=enabled_plugins,
+                                hot_reload=args.hot_reload, metrics_port=args.metrics_port,
+                                metrics_host=args.metrics_host)
         
         # Set the LED mode from the command line argument
         if 'led_control' in pi_monitor.plugins:
             pi_monitor.plugins['led_control'].set_mode(args.led_mode)
         
-        # Use simple infinite loop instead of threading
-        pi_monitor.run_monitor_loop()
+        if args.runtime == 'async':
+            asyncio.run(pi_monitor.run_monitor_loop_async())
+        else:
+            # Use simple infinite loop instead of threading
+            pi_monitor.run_monitor_loop()
 
     except KeyboardInterrupt:
         logger.info("Shutdown requested by user (Ctrl+C).")
     except Exception as e:
-        logger.error(f"Unexpected error: {e}", exc_info=True)
+        logger.error("Unexpected error: %s", e, exc_info=True)
     finally:
         if pi_monitor is not None:
             pi_monitor.stop_event.set()
@@ -0,0 +1,220 @@
+"""
+Asset Cache Module
+
+Persistent on-disk cache of OLED images and animations that have already been
+scaled and dithered to 1 bit. Entries are keyed by a hash of the source file
+and the target size, stored in a compact packed-bit format and read back with
+a single memory-mapped read. The cache directory is kept under a size budget
+by evicting the least recently used entries.
+
+Recently used entries are also kept in memory, so drawing the same image on
+every frame does not touch the file system. Use times are tracked in memory
+and only written to the entries' mtimes when the cache evicts, or when an
+entry read from disk was last marked more than TOUCH_INTERVAL ago, so reads
+do not turn into SD card writes.
+
+Entry format (little endian):
+    header  : magic b'CDAC', version (B), layout (B), width (H), height (H), frames (H)
+    delays  : one uint16 per frame, in milliseconds
+    frames  : the packed frames, back to back
+
+Layout 0 stores PIL row-packed '1' images (used for still images), layout 1
+stores SSD1306 page-packed frames (used for animations).
+"""
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import time
+from collections import OrderedDict
+from PIL import Image
+from animation import Animation, decode_gif
+from framebuffer import unpack_pages
+
+DEFAULT_CACHE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'cache', 'assets'))
+
+MAGIC = b'CDAC'
+VERSION = 1
+LAYOUT_ROWS = 0
+LAYOUT_PAGES = 1
+_HEADER = struct.Struct('<4sBBHHH')
+
+MEMORY_ENTRIES = 32      # Entries kept in memory
+TOUCH_INTERVAL = 3600    # Seconds before a read entry's mtime is refreshed
+
+
+class AssetCache:
+    """
+    Stores compiled OLED assets in `cache_dir`, limited to `max_bytes` in total.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=8 * 1024 * 1024, memory_entries=MEMORY_ENTRIES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self._hashes = {}  # path -> (mtime_ns, size, digest)
+        self._memory = OrderedDict()  # entry path -> (delays, frames), least recently used first
+        self._used = {}    # entry path -> time of last use not yet written to its mtime
+        self.hits = 0
+        self.misses = 0
+
+    def source_hash(self, path):
+        """Returns the SHA-1 of a source file, re-hashing only when it changed on disk."""
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        cached = self._hashes.get(path)
+        if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+            return cached[2]
+        digest = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(65536), b''):
+                digest.update(chunk)
+        self._hashes[path] = (st.st_mtime_ns, st.st_size, digest.hexdigest())
+        return digest.hexdigest()
+
+    def _entry_path(self, path, kind, *params):
+        name = '-'.join([self.source_hash(path), kind] + ['x'.join(map(str, p)) for p in params])
+        return os.path.join(self.cache_dir, name + '.bin')
+
+    def load_image(self, path, size):
+        """
+        Returns the image at `path` scaled and dithered to `size` as a 1-bit image.
+
+        Parameters
+        ----------
+        path : str
+            Source image (any format PIL can open).
+        size : tuple
+            Target (width, height).
+        """
+        size = tuple(size)
+        entry_path = self._entry_path(path, 'img', size)
+        entry = self._read(entry_path)
+        if entry is not None:
+            return Image.frombytes('1', size, entry[1][0])
+        with Image.open(path) as source:
+            image = source.convert('L').resize(size, Image.LANCZOS).convert('1')
+        self._write(entry_path, LAYOUT_ROWS, size, [image.tobytes()], [0])
+        return image
+
+    def load_animation(self, path, size, resize=None, position=(0, 0)):
+        """
+        Returns the GIF at `path` as an Animation, decoding it only on a cache miss.
+
+        The parameters match animation.decode_gif().
+        """
+        size = tuple(size)
+        entry_path = self._entry_path(path, 'gif', size, tuple(resize or size), tuple(position))
+        entry = self._read(entry_path)
+        if entry is not None:
+            delays, frames = entry
+            return Animation(frames, delays, unpack_pages(frames[-1], size[0], size[1]))
+        animation = decode_gif(path, size, resize, position)
+        delays_ms = [min(int(round(delay * 1000)), 0xFFFF) for delay in animation.delays]
+        self._write(entry_path, LAYOUT_PAGES, size, animation.frames, delays_ms)
+        return animation
+
+    def _read(self, entry_path):
+        # Returns (delays, frames) for a valid entry, None on a miss
+        entry = self._memory.get(entry_path)
+        if entry is not None:
+            self._memory.move_to_end(entry_path)
+            self._used[entry_path] = time.time()
+            self.hits += 1
+            return entry
+        try:
+            with open(entry_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                mtime = os.fstat(f.fileno()).st_mtime
+                magic, version, layout, width, height, count = _HEADER.unpack_from(data, 0)
+                if magic != MAGIC or version != VERSION or count == 0:
+                    raise ValueError("bad header")
+                if layout == LAYOUT_PAGES:
+                    frame_size = width * height // 8
+                else:
+                    frame_size = (width + 7) // 8 * height
+                offset = _HEADER.size
+                delays = tuple(ms / 1000.0 for ms in struct.unpack_from(f'<{count}H', data, offset))
+                offset += 2 * count
+                if len(data) != offset + count * frame_size:
+                    raise ValueError("truncated entry")
+                frames = tuple(data[offset + i * frame_size:offset + (i + 1) * frame_size] for i in range(count))
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError, struct.error):
+            self.misses += 1
+            self._remove(entry_path)
+            return None
+        self.hits += 1
+        now = time.time()
+        if now - mtime >= TOUCH_INTERVAL:
+            self._touch(entry_path, now)  # Survives a restart without writing on every read
+        else:
+            self._used[entry_path] = now
+        self._remember(entry_path, (delays, frames))
+        return delays, frames
+
+    def _remember(self, entry_path, entry):
+        self._memory[entry_path] = entry
+        self._memory.move_to_end(entry_path)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _touch(self, entry_path, used):
+        self._used.pop(entry_path, None)
+        try:
+            os.utime(entry_path, (used, used))
+        except OSError:
+            pass
+
+    def _write(self, entry_path, layout, size, frames, delays_ms):
+        tmp_path = None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            header = _HEADER.pack(MAGIC, VERSION, layout, size[0], size[1], len(frames))
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(header)
+                f.write(struct.pack(f'<{len(delays_ms)}H', *delays_ms))
+                for frame in frames:
+                    f.write(frame)
+            os.replace(tmp_path, entry_path)  # Readers never see a partial entry
+        except OSError as e:
+            print(f"Error writing asset cache entry {entry_path}: {e}")
+            if tmp_path is not None:
+                self._remove(tmp_path)
+            return
+        self.evict()
+
+    def evict(self):
+        """
+        Removes least recently used entries until the cache fits in max_bytes.
+
+        Use times tracked in memory count as well, and are written to the
+        mtimes of the entries that stay.
+        """
+        try:
+            entries = []
+            for entry in os.scandir(self.cache_dir):
+                if entry.name.endswith('.bin'):
+                    st = entry.stat()
+                    entries.append((max(st.st_mtime, self._used.get(entry.path, 0.0)), st.st_size, entry.path))
+        except OSError:
+            return
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+        for path, used in list(self._used.items()):
+            self._touch(path, used)
+
+    def _remove(self, path):
+        self._memory.pop(path, None)
+        self._used.pop(path, None)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -1,6 +1,14 @@
 # -*- coding: utf-8 -*-
 import smbus
 import time
+import threading
+from collections import namedtuple
+
+# Immutable record of every readable status register, taken in one pass.
+# timestamp is a time.monotonic() value.
+ExpansionSnapshot = namedtuple('ExpansionSnapshot', [
+    'timestamp', 'temp', 'fan_mode', 'fan0_duty', 'fan1_duty',
+    'fan_frequency', 'fan_threshold', 'led_mode'])
 
 class Expansion:
     IIC_ADDRESS = 0x21
@@ -28,28 +36,101 @@ class Expansion:
     REG_BRAND = 0xfd              # Read brand
     REG_VERSION = 0xfe            # Read version
 
-    def __init__(self, bus_number=1, address=IIC_ADDRESS):
+    LED_COUNT = 4
+    # Seconds after which the shadow registers are forgotten, so a board that
+    # reset or browned out without a bus error is rewritten
+    SHADOW_MAX_AGE = 30.0
+    # Registers that hold their last written value, so repeating it is a no-op
+    CACHED_REGISTERS = (REG_LED_SPECIFIED, REG_LED_ALL, REG_LED_MODE, REG_FAN_MODE,
+                        REG_FAN_FREQUENCY, REG_FAN_DUTY, REG_FAN_THRESHOLD)
+
+    def __init__(self, bus_number=1, address=IIC_ADDRESS, cache_writes=True, shadow_max_age=SHADOW_MAX_AGE):
         # Initialize I2C bus and address
         self.bus_number = bus_number
         self.bus = smbus.SMBus(self.bus_number)
         self.address = address
+        # Serializes bus transactions when plugins run in worker threads
+        self.lock = threading.RLock()
+        # Shadow registers: last value successfully written to each register
+        self.cache_writes = cache_writes
+        self._shadow = {}
+        self.shadow_max_age = shadow_max_age
+        self._shadow_since = time.monotonic()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def _shadow_key(self, reg, values):
+        # LED_SPECIFIED is shadowed per LED; a 1-byte write only selects the LED to read back
+        if reg == self.REG_LED_SPECIFIED:
+            if isinstance(values, list) and len(values) == 4:
+                return (reg, values[0])
+            return None
+        if reg in self.CACHED_REGISTERS:
+            return reg
+        return None
+
+    def _update_shadow(self, reg, key, value):
+        self._shadow[key] = value
+        if reg == self.REG_LED_ALL:
+            # Setting all LEDs also sets every individual LED
+            for led_id in range(self.LED_COUNT):
+                self._shadow[(self.REG_LED_SPECIFIED, led_id)] = (led_id,) + value
+        elif reg == self.REG_LED_SPECIFIED:
+            self._shadow.pop(self.REG_LED_ALL, None)
+
+    def write(self, reg, values, force=False):
+        # Write data to I2C register, skipping writes that would not change it
+        key = self._shadow_key(reg, values) if self.cache_writes else None
+        value = tuple(values) if isinstance(values, list) else values
+        with self.lock:
+            if key is not None:
+                if time.monotonic() - self._shadow_since >= self.shadow_max_age:
+                    self.invalidate()
+                if not force and self._shadow.get(key) == value:
+                    self.cache_hits += 1
+                    return
+                self.cache_misses += 1
+            try:
+                if isinstance(values, list):
+                    self.bus.write_i2c_block_data(self.address, reg, values)
+                else:
+                    self.bus.write_byte_data(self.address, reg, values)
+            except IOError as e:
+                print("Error writing to I2C bus:", e)
+                # The register content is unknown after a failed write, and
+                # the error may come from a board that reset and lost the rest
+                self.invalidate()
+                return
+            if key is not None:
+                self._update_shadow(reg, key, value)
 
-    def write(self, reg, values):
-        # Write data to I2C register
-        try:
-            if isinstance(values, list):
-                self.bus.write_i2c_block_data(self.address, reg, values)
-            else:
-                self.bus.write_byte_data(self.address, reg, values)
-        except IOError as e:
-            print("Error writing to I2C bus:", e)
+    def invalidate(self):
+        # Forget all shadow registers, e.g. after the board was reset
+        with self.lock:
+            self._shadow.clear()
+            self._shadow_since = time.monotonic()
+
+    def cache_stats(self):
+        # Get register cache hit/miss counters
+        with self.lock:
+            total = self.cache_hits + self.cache_misses
+            return {
+                'hits': self.cache_hits,
+                'misses': self.cache_misses,
+                'hit_rate': self.cache_hits / total if total else 0.0,
+            }
 
     def read(self, reg, length=1):
         # Read data from I2C register
-        if length == 1:
-            return self.bus.read_byte_data(self.address, reg)
-        else:
-            return self.bus.read_i2c_block_data(self.address, reg, length)
+        with self.lock:
+            try:
+                if length == 1:
+                    return self.bus.read_byte_data(self.address, reg)
+                else:
+                    return self.bus.read_i2c_block_data(self.address, reg, length)
+            except IOError:
+                self.invalidate()  # The board may have reset; rewrite everything next time
+                raise
 
     def end(self):
         # Close I2C bus
@@ -59,6 +140,7 @@ class Expansion:
         # Set I2C address
         self.address = addr
         self.write(self.REG_I2C_ADDRESS, addr)
+        self.invalidate()
 
     def set_led_color(self, led_id, r, g, b):
         # Set color for specified LED
@@ -70,6 +152,28 @@ class Expansion:
         cmd = [r, g, b]
         self.write(self.REG_LED_ALL, cmd)
 
+    def set_led_colors(self, colors):
+        # Set every LED from a list of (r, g, b) in one bus session,
+        # writing only the LEDs whose color changed
+        with self.lock:
+            if self.cache_writes and time.monotonic() - self._shadow_since >= self.shadow_max_age:
+                self.invalidate()
+            changed = [led_id for led_id, color in enumerate(colors)
+                       if not self.cache_writes
+                       or self._shadow.get((self.REG_LED_SPECIFIED, led_id)) != (led_id,) + tuple(color)]
+            if self.cache_writes:
+                self.cache_hits += len(colors) - len(changed)  # One per skipped LED write, like write()
+            if not changed:
+                return 0
+            if len(changed) > 1 and len(colors) == self.LED_COUNT and len(set(map(tuple, colors))) == 1:
+                # One LED_ALL write is cheaper than several per-LED writes
+                self.set_all_led_color(*colors[0])
+                return 1
+            for led_id in changed:
+                r, g, b = colors[led_id]
+                self.write(self.REG_LED_SPECIFIED, [led_id, r, g, b], force=True)
+            return len(changed)
+
     def set_led_mode(self, mode):
         # Set LED running mode
         self.write(self.REG_LED_MODE, mode)
@@ -113,8 +217,9 @@ class Expansion:
     def get_led_color(self, led_id):
         # Get color for specified LED
         cmd = [led_id]
-        self.write(self.REG_LED_SPECIFIED, cmd)
-        return self.read(self.REG_LED_SPECIFIED_READ, 3)
+        with self.lock:  # Select and read back as one transaction
+            self.write(self.REG_LED_SPECIFIED, cmd)
+            return self.read(self.REG_LED_SPECIFIED_READ, 3)
 
     def get_all_led_color(self):
         # Get color for all LEDs
@@ -150,6 +255,19 @@ class Expansion:
         # Get temperature value
         return self.read(self.REG_TEMP_READ)
 
+    def snapshot(self):
+        # Read all status registers back to back while holding the bus
+        with self.lock:
+            return ExpansionSnapshot(
+                timestamp=time.monotonic(),
+                temp=self.get_temp(),
+                fan_mode=self.get_fan_mode(),
+                fan0_duty=self.get_fan0_duty(),
+                fan1_duty=self.get_fan1_duty(),
+                fan_frequency=self.get_fan_frequency(),
+                fan_threshold=tuple(self.get_fan_threshold()),
+                led_mode=self.get_led_mode())
+
     def get_brand(self):
         # Get brand information
         brand_bytes = self.read(self.REG_BRAND, 9)
@@ -0,0 +1,146 @@
+"""
+File Watcher Module
+
+Tells whether a file was written since the last check without opening it.
+On Linux the parent directory is watched with inotify, so a check is a single
+non-blocking read of the inotify descriptor that returns immediately when
+nothing happened. Where inotify is unavailable the watcher falls back to
+comparing the file's mtime, size and inode from os.stat().
+
+The parent directory is watched rather than the file itself so files that are
+created later, deleted, or replaced with an atomic rename are still seen.
+"""
+import ctypes
+import ctypes.util
+import os
+import struct
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+# struct inotify_event: wd, mask, cookie, len, followed by a NUL padded name
+_EVENT = struct.Struct('iIII')
+
+_libc = None
+
+
+def _load_libc():
+    global _libc
+    if _libc is None:
+        _libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+    return _libc
+
+
+class InotifyBackend:
+    """Watches a file's directory with inotify. Raises OSError when inotify is unavailable."""
+
+    def __init__(self, path):
+        self.directory, self.name = os.path.split(os.path.abspath(path))
+        self.name = os.fsencode(self.name)
+        libc = _load_libc()
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        if libc.inotify_add_watch(self.fd, os.fsencode(self.directory), WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, os.strerror(errno), self.directory)
+
+    def changed(self):
+        """Drains pending events and returns True if any of them concerned the file."""
+        changed = False
+        while True:
+            try:
+                data = os.read(self.fd, 4096)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset < len(data):
+                _, mask, _, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = data[offset:offset + length].rstrip(b'\0')
+                offset += length
+                if mask & IN_Q_OVERFLOW or name == self.name:
+                    changed = True
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class StatBackend:
+    """Detects changes by comparing os.stat() results between checks."""
+
+    def __init__(self, path):
+        self.path = path
+        self._signature = self._stat()
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def changed(self):
+        signature = self._stat()
+        if signature == self._signature:
+            return False
+        self._signature = signature
+        return True
+
+    def close(self):
+        pass
+
+
+class FileWatcher:
+    """
+    Reports whether a file changed since the previous call to changed().
+
+    The first call always returns True so the caller reads the initial
+    contents. Pass use_inotify=False to force the stat backend.
+    """
+
+    def __init__(self, path, use_inotify=True):
+        self.path = str(path)
+        self.backend = None
+        if use_inotify:
+            try:
+                self.backend = InotifyBackend(self.path)
+            except (OSError, AttributeError):
+                self.backend = None  # No inotify (non-Linux or missing directory)
+        if self.backend is None:
+            self.backend = StatBackend(self.path)
+        self._primed = False
+
+    @property
+    def uses_inotify(self):
+        return isinstance(self.backend, InotifyBackend)
+
+    def changed(self):
+        """Returns True if the file was written, created, replaced or removed since the last check."""
+        changed = self.backend.changed()
+        if not self._primed:
+            self._primed = True
+            return True
+        return changed
+
+    def close(self):
+        """Releases the inotify descriptor, if any."""
+        self.backend.close()
+
+    def __del__(self):
+        backend = getattr(self, 'backend', None)
+        if backend is not None:
+            backend.close()
@@ -0,0 +1,100 @@
+"""
+Framebuffer Module
+
+Helpers that convert 1-bit PIL images into the SSD1306 page layout and find
+the part of the screen that changed between two frames. A page is a band of
+8 pixel rows; every byte holds one column of a page with the top pixel in the
+least significant bit, which is exactly what the controller expects on the bus.
+"""
+from PIL import Image
+
+# Maps every byte to the same byte with its bit order reversed
+_BIT_REVERSE = bytes(int(f'{i:08b}'[::-1], 2) for i in range(256))
+
+
+def pack_pages(image):
+    """
+    Packs a 1-bit image into SSD1306 page-major bytes.
+
+    Parameters
+    ----------
+    image : PIL.Image.Image
+        The image to pack. Its height must be a multiple of 8.
+
+    Returns
+    -------
+    bytes
+        width * height / 8 bytes; byte `page * width + x` holds column x of
+        that page.
+    """
+    if image.mode != '1':
+        image = image.convert('1')
+    pages = image.height // 8
+    # Transposing turns every pixel column into a packed row (MSB = top pixel),
+    # so the page bytes only need their bit order reversed and de-interleaving.
+    columns = image.transpose(Image.Transpose.TRANSPOSE).tobytes().translate(_BIT_REVERSE)
+    return b''.join(columns[page::pages] for page in range(pages))
+
+
+def unpack_pages(frame, width, height):
+    """Converts page-major bytes produced by pack_pages() back into a 1-bit image."""
+    pages = height // 8
+    columns = bytearray(len(frame))
+    for page in range(pages):
+        columns[page::pages] = frame[page * width:(page + 1) * width]
+    image = Image.frombytes('1', (height, width), bytes(columns.translate(_BIT_REVERSE)))
+    return image.transpose(Image.Transpose.TRANSPOSE)
+
+
+def dirty_window(previous, current, width):
+    """
+    Finds the smallest page/column window containing every changed byte.
+
+    Parameters
+    ----------
+    previous : bytes or None
+        The frame currently on the display, or None if unknown.
+    current : bytes
+        The frame to display.
+    width : int
+        Display width in pixels (bytes per page).
+
+    Returns
+    -------
+    tuple or None
+        (first_page, last_page, first_column, last_column), inclusive, or
+        None when the frames are identical.
+    """
+    if previous == current:
+        return None
+    pages = len(current) // width
+    if previous is None or len(previous) != len(current):
+        return 0, pages - 1, 0, width - 1
+
+    first_page = last_page = None
+    first_col, last_col = width, -1
+    for page in range(pages):
+        start = page * width
+        old = previous[start:start + width]
+        new = current[start:start + width]
+        if old == new:
+            continue
+        if first_page is None:
+            first_page = page
+        last_page = page
+        lo = 0
+        while old[lo] == new[lo]:
+            lo += 1
+        hi = width - 1
+        while old[hi] == new[hi]:
+            hi -= 1
+        first_col = min(first_col, lo)
+        last_col = max(last_col, hi)
+    return first_page, last_page, first_col, last_col
+
+
+def window_bytes(frame, width, window):
+    """Returns the bytes of `frame` inside `window`, in the order the controller expects them."""
+    first_page, last_page, first_col, last_col = window
+    return b''.join(frame[page * width + first_col:page * width + last_col + 1]
+                    for page in range(first_page, last_page + 1))
@@ -0,0 +1,90 @@
+"""
+LED Compositor Module
+
+Single owner of the expansion board LEDs. Plugins no longer write colors
+themselves; they submit an effect on a named layer and the compositor draws
+the highest-priority layer once per frame. The visible color no longer
+depends on the order plugins run in. A frame with one color on every LED
+costs at most one set_all_led_color; a per-LED frame rewrites only the LEDs
+that changed, in a single bus session. Unchanged frames cost no bus traffic
+thanks to the register cache.
+
+Layers:
+    base    → the user's LED mode (LedControlPlugin)
+    status  → security operation in progress (SecurityStatusPlugin)
+    alert   → errors and critical events
+"""
+import threading
+import time
+from led_effects import LedEffect, solid
+
+LAYER_PRIORITIES = {'base': 0, 'status': 10, 'alert': 20}
+
+OFF = LedEffect(solid(0, 0, 0), 1.0)
+
+
+class LedCompositor:
+    """
+    Resolves effect layers by priority and writes the result to the LEDs.
+
+    Layers may be submitted from any plugin thread; render() is called once
+    per frame by the monitor loop.
+    """
+
+    def __init__(self, expansion):
+        self.expansion = expansion
+        self._layers = {}  # name -> (priority, effect, start time)
+        self._lock = threading.Lock()
+        self.frames = 0
+
+    def set_layer(self, name, effect, priority=None):
+        """
+        Shows `effect` on layer `name`, restarting its animation.
+
+        Parameters
+        ----------
+        name : str
+            Layer name; 'base', 'status' and 'alert' have default priorities.
+        effect : LedEffect, LedFrames, ProgressBar or LoadMeter
+            The animation to show; anything with a frame(elapsed) method.
+        priority : int, optional
+            Overrides the layer's priority. Higher wins.
+        """
+        if priority is None:
+            priority = LAYER_PRIORITIES.get(name, 0)
+        with self._lock:
+            self._layers[name] = (priority, effect, time.monotonic())
+
+    def clear_layer(self, name):
+        """Removes a layer, revealing the one below it."""
+        with self._lock:
+            self._layers.pop(name, None)
+
+    def active_layer(self):
+        """Returns the name of the layer currently shown, or None."""
+        with self._lock:
+            if not self._layers:
+                return None
+            return max(self._layers, key=lambda name: self._layers[name][0])
+
+    def render(self):
+        """
+        Draws the top layer's current frame. Does nothing while no layer is set.
+
+        Returns
+        -------
+        tuple or None
+            The (r, g, b) color of every LED written.
+        """
+        with self._lock:
+            if not self._layers:
+                return None
+            priority, effect, start = max(self._layers.values(), key=lambda layer: layer[0])
+        frame = effect.frame(time.monotonic() - start)
+        first = frame[0]
+        if all(color == first for color in frame):
+            self.expansion.set_all_led_color(*first)
+        else:
+            self.expansion.set_led_colors(frame)
+        self.frames += 1
+        return frame
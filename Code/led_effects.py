@@ -0,0 +1,217 @@
+"""
+LED Effects Module
+
+Lookup-table LED animations. Every effect is a color table and a brightness
+table, each holding one period of its waveform as bytes, computed once at
+import. Rendering a frame is two table lookups and three integer multiplies:
+no trigonometry, no HSV conversion and no allocation beyond the result tuple.
+
+Both tables are indexed by the phase of the elapsed time within their own
+period, so effects whose hue and brightness periods are not multiples of each
+other (like the rainbow fade) still loop seamlessly.
+
+Every effect returns whole frames from frame(elapsed): one (r, g, b) tuple
+per LED. LedEffect shows the same color on every LED; LedFrames, ProgressBar
+and LoadMeter address the LEDs individually.
+"""
+import colorsys
+import math
+
+FRAME_RATE = 30          # LED frames per second
+LED_COUNT = 4            # LEDs on the expansion board (Expansion.LED_COUNT)
+HUE_STEPS = 360          # Entries in a full hue cycle
+BRIGHTNESS_STEPS = 256   # Entries in one brightness period
+
+
+def hue_table(steps=HUE_STEPS):
+    """Returns a full-saturation hue cycle as `steps` packed RGB triplets."""
+    table = bytearray()
+    for i in range(steps):
+        r, g, b = colorsys.hsv_to_rgb(i / steps, 1.0, 1.0)
+        table += bytes((int(r * 255), int(g * 255), int(b * 255)))
+    return bytes(table)
+
+
+def breathing_table(floor=0.0, steps=BRIGHTNESS_STEPS):
+    """
+    Returns one period of a sine breathing curve as brightness bytes.
+
+    Entry i is (sin(2*pi*i/steps) + 1) / 2 scaled into [floor, 1.0], matching
+    the phase of the analytic curve at elapsed time 0.
+    """
+    span = 1.0 - floor
+    return bytes(int(((math.sin(2 * math.pi * i / steps) + 1) / 2 * span + floor) * 255)
+                 for i in range(steps))
+
+
+def square_table(high=1.0, low=0.0):
+    """Returns a square wave as brightness bytes: `high` for the first half of the period, `low` after."""
+    return bytes((int(high * 255), int(low * 255)))
+
+
+def solid(r, g, b):
+    """Returns a constant color table."""
+    return bytes((r, g, b))
+
+
+FULL = b'\xff'  # Constant full brightness
+
+
+class LedEffect:
+    """
+    An animation defined by a color table and a brightness table.
+
+    Parameters
+    ----------
+    colors : bytes
+        Packed RGB triplets covering one color period.
+    color_period : float
+        Seconds per color cycle (ignored for a single color).
+    brightness : bytes
+        Brightness values (0-255) covering one brightness period.
+    brightness_period : float
+        Seconds per brightness cycle (ignored for a single value).
+    """
+    __slots__ = ['colors', 'color_period', 'brightness', 'brightness_period',
+                 '_color_steps', '_brightness_steps']
+
+    def __init__(self, colors, color_period, brightness=FULL, brightness_period=1.0):
+        if not colors or len(colors) % 3:
+            raise ValueError("Color table must hold whole RGB triplets")
+        if not brightness:
+            raise ValueError("Brightness table must not be empty")
+        self.colors = colors
+        self.color_period = color_period
+        self.brightness = brightness
+        self.brightness_period = brightness_period
+        self._color_steps = len(colors) // 3
+        self._brightness_steps = len(brightness)
+
+    def color_at(self, elapsed):
+        """Returns the (r, g, b) color `elapsed` seconds into the effect."""
+        i = int(elapsed / self.color_period * self._color_steps) % self._color_steps * 3
+        level = self.brightness[int(elapsed / self.brightness_period * self._brightness_steps) % self._brightness_steps]
+        colors = self.colors
+        return colors[i] * level // 255, colors[i + 1] * level // 255, colors[i + 2] * level // 255
+
+    def frame(self, elapsed, count=LED_COUNT):
+        """Returns the colors of all LEDs `elapsed` seconds into the effect."""
+        return (self.color_at(elapsed),) * count
+
+
+class LedFrames:
+    """
+    Per-LED animation stored as a table of whole frames.
+
+    Parameters
+    ----------
+    table : bytes
+        Frames back to back, `count` packed RGB triplets each.
+    period : float
+        Seconds per loop of the table.
+    count : int, optional
+        LEDs per frame (default is LED_COUNT).
+    """
+    __slots__ = ['table', 'period', 'count', '_steps']
+
+    def __init__(self, table, period, count=LED_COUNT):
+        if not table or len(table) % (count * 3):
+            raise ValueError("Frame table must hold whole frames")
+        self.table = table
+        self.period = period
+        self.count = count
+        self._steps = len(table) // (count * 3)
+
+    def frame(self, elapsed):
+        """Returns the colors of all LEDs `elapsed` seconds into the animation."""
+        table = self.table
+        start = int(elapsed / self.period * self._steps) % self._steps * self.count * 3
+        return tuple((table[i], table[i + 1], table[i + 2]) for i in range(start, start + self.count * 3, 3))
+
+
+def chase_table(color, count=LED_COUNT, steps_per_led=8, tail=1.5):
+    """
+    Returns a LedFrames table of a light running around the LEDs.
+
+    The head moves one LED every `steps_per_led` frames and LEDs fade out
+    linearly over `tail` LEDs behind it.
+    """
+    r, g, b = color
+    steps = count * steps_per_led
+    table = bytearray()
+    for step in range(steps):
+        head = step / steps_per_led
+        for led in range(count):
+            distance = (head - led) % count  # How far the head has passed this LED
+            level = max(0.0, 1.0 - distance / tail) if tail > 0 else float(distance < 1)
+            table += bytes((int(r * level), int(g * level), int(b * level)))
+    return bytes(table)
+
+
+class ProgressBar:
+    """
+    Lights the LEDs in proportion to a progress fraction.
+
+    `source` returns the fraction (0.0-1.0) to show; the partially reached
+    LED is dimmed proportionally. Lit LEDs show `effect`, so the bar keeps the
+    animation of the mode it belongs to.
+    """
+    __slots__ = ['effect', 'source', 'count']
+
+    def __init__(self, effect, source, count=LED_COUNT):
+        self.effect = effect
+        self.source = source
+        self.count = count
+
+    def frame(self, elapsed):
+        fraction = self.source() or 0.0
+        lit = min(max(fraction, 0.0), 1.0) * self.count
+        r, g, b = self.effect.color_at(elapsed)
+        frame = []
+        for led in range(self.count):
+            level = min(max(lit - led, 0.0), 1.0)
+            frame.append((int(r * level), int(g * level), int(b * level)))
+        return tuple(frame)
+
+
+def load_gradient(steps=101):
+    """Returns a green to yellow to red gradient as packed RGB triplets, indexed by load percent."""
+    table = bytearray()
+    for i in range(steps):
+        load = i / (steps - 1)
+        table += bytes((int(min(1.0, load * 2) * 255), int(min(1.0, (1.0 - load) * 2) * 255), 0))
+    return bytes(table)
+
+
+class LoadMeter:
+    """
+    Shows a set of loads (0-100) as one colored LED each, green to red.
+
+    `source` returns the loads, e.g. per-core CPU usage. With more loads than
+    LEDs, consecutive loads share an LED, which shows the busiest of them.
+    """
+    __slots__ = ['source', 'count', 'gradient']
+
+    def __init__(self, source, count=LED_COUNT, gradient=None):
+        self.source = source
+        self.count = count
+        self.gradient = gradient or LOAD_GRADIENT
+
+    def frame(self, elapsed):
+        loads = self.source() or ()
+        n = len(loads)
+        if not n:
+            return ((0, 0, 0),) * self.count
+        gradient = self.gradient
+        steps = len(gradient) // 3
+        frame = []
+        for led in range(self.count):
+            first = led * n // self.count
+            load = max(loads[first:max(first + 1, (led + 1) * n // self.count)])
+            i = int(min(max(load, 0.0), 100.0) / 100.0 * (steps - 1)) * 3
+            frame.append((gradient[i], gradient[i + 1], gradient[i + 2]))
+        return tuple(frame)
+
+
+HUE_CYCLE = hue_table()
+LOAD_GRADIENT = load_gradient()
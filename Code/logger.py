@@ -6,22 +6,213 @@ It configures a logger with dynamic log file naming based on the calling script,
 and optionally writes logs to a master log file in the project root. The setup
 ensures that handlers are not duplicated across multiple calls.
 
+Loggers never write to the console or disk themselves. Every logger puts its
+records on one queue, and a single background QueueListener thread writes them
+to the console, the module log file and the master log file. File writes are
+batched and the files are rotated by size and age, so logging costs the
+control loop a queue put and the logs directory stays bounded.
+
+Levels are set per logger. The CYBERDECK_LOG_LEVELS environment variable
+takes a comma-separated list such as "fan_control_plugin=DEBUG,*=WARNING",
+where '*' sets the default (INFO). Log with %-style arguments, e.g.
+logger.debug("Duty %s", duty), so disabled messages are never formatted.
+
 Author: John Firnschild
 Adapted for this project by Gemini
 """
+import atexit
 import logging
+import logging.handlers
 import os
 import inspect
-import sys
+import queue
+import threading
+import time
+
+LOGS_DIR = os.path.join(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')), 'logs')
+LOG_LEVELS_ENV = 'CYBERDECK_LOG_LEVELS'
+DEFAULT_LEVEL = logging.INFO
+
+MAX_BYTES = 1024 * 1024       # Size at which a log file is rotated
+BACKUP_COUNT = 3              # Rotated files kept per log
+ROTATE_INTERVAL = 24 * 3600   # Age in seconds at which a log file is rotated
+BATCH_SIZE = 64               # Records written before the file is flushed
+FLUSH_INTERVAL = 2.0          # Seconds after which pending records are flushed
+
+
+class BatchingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    Rotating file handler that flushes in batches.
+
+    Records are flushed once BATCH_SIZE of them are pending, when a record
+    arrives FLUSH_INTERVAL seconds after the last flush, for every WARNING or
+    worse, and on close. BatchingQueueListener also flushes pending records
+    once FLUSH_INTERVAL has passed without new ones. Besides the size limit,
+    the file is rotated once it is `rotate_interval` seconds old.
+    """
+
+    def __init__(self, filename, max_bytes=MAX_BYTES, backup_count=BACKUP_COUNT,
+                 rotate_interval=ROTATE_INTERVAL, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, delay=True)
+        self.rotate_interval = rotate_interval
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending = 0
+        self._urgent = False
+        self._size = 0
+        self._last_flush = time.monotonic()
+        self._opened_at = time.time()
+
+    def _open(self):
+        stream = super()._open()
+        self._size = os.fstat(stream.fileno()).st_size
+        return stream
+
+    def shouldRollover(self, record):
+        # Uses the tracked size; seeking the stream like the base class would flush it
+        if self.rotate_interval and time.time() - self._opened_at >= self.rotate_interval:
+            return True
+        return self.maxBytes > 0 and self._size >= self.maxBytes
+
+    def doRollover(self):
+        super().doRollover()
+        self._size = 0
+        self._opened_at = time.time()
+
+    def emit(self, record):
+        try:
+            if self.shouldRollover(record):
+                self.doRollover()
+            if self.stream is None:
+                self.stream = self._open()
+            msg = self.format(record) + self.terminator
+            self.stream.write(msg)
+            self._size += len(msg.encode(self.encoding or 'utf-8'))  # maxBytes is in bytes
+            self._pending += 1
+            self._urgent = self._urgent or record.levelno >= logging.WARNING
+            self.flush()  # Only writes out full batches
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def flush(self, force=False):
+        if not (force or self._urgent or self._pending >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.flush_interval):
+            return
+        super().flush()
+        self._pending = 0
+        self._urgent = False
+        self._last_flush = time.monotonic()
+
+    def flush_idle(self):
+        # Writes out pending records once they are flush_interval old, without a new record
+        if self._pending:
+            self.flush()
+
+    def close(self):
+        self.flush(force=True)
+        super().close()
+
+
+class BatchingQueueListener(logging.handlers.QueueListener):
+    """
+    Queue listener that flushes its BatchingFileHandlers while the queue is idle.
+
+    Without it, a burst smaller than the batch size would stay buffered until
+    the next record arrived, and be lost if the process were killed.
+    """
+
+    def __init__(self, queue, *handlers, respect_handler_level=False, idle_interval=FLUSH_INTERVAL):
+        super().__init__(queue, *handlers, respect_handler_level=respect_handler_level)
+        self.idle_interval = idle_interval
+
+    def dequeue(self, block):
+        while True:
+            try:
+                return self.queue.get(block, self.idle_interval)
+            except queue.Empty:
+                if not block:
+                    raise
+            for handler in self.handlers:
+                if isinstance(handler, BatchingFileHandler):
+                    handler.flush_idle()
+
+
+_queue = queue.SimpleQueue()
+_queue_handler = logging.handlers.QueueHandler(_queue)
+_lock = threading.Lock()
+_listener = None
+_console_handler = None
+_master_handler = None
+_file_handlers = {}    # logger name -> BatchingFileHandler
+_no_master = set()     # Loggers kept out of the master log
+_levels = None         # Parsed CYBERDECK_LOG_LEVELS
+
+
+def _configured_levels():
+    global _levels
+    if _levels is None:
+        _levels = {}
+        for entry in os.environ.get(LOG_LEVELS_ENV, '').split(','):
+            name, _, level = entry.partition('=')
+            if level.strip():
+                _levels[name.strip()] = level.strip().upper()
+    return _levels
+
+
+def get_log_level(logger_name):
+    """Returns the configured level of a logger, falling back to the '*' entry and DEFAULT_LEVEL."""
+    levels = _configured_levels()
+    level = levels.get(logger_name, levels.get('*', DEFAULT_LEVEL))
+    return logging.getLevelName(level) if isinstance(level, str) else level
+
+
+def set_log_level(logger_name, level):
+    """Changes the level of a logger at runtime, e.g. set_log_level('fan_control_plugin', 'DEBUG')."""
+    _configured_levels()[logger_name] = level.upper() if isinstance(level, str) else level
+    logging.getLogger(logger_name).setLevel(get_log_level(logger_name))
+
+
+def _start_listener():
+    # Called with _lock held
+    global _listener, _console_handler, _master_handler
+    if _console_handler is None:
+        _console_handler = logging.StreamHandler()
+        _console_handler.setFormatter(logging.Formatter('%(name)s - %(levelname)s: %(message)s'))
+    if _master_handler is None:
+        _master_handler = BatchingFileHandler(os.path.join(LOGS_DIR, '_master_log.log'))
+        _master_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - [%(name)s] - %(message)s'))
+        _master_handler.addFilter(lambda record: record.name not in _no_master)
+    _listener = BatchingQueueListener(
+        _queue, _console_handler, _master_handler, *_file_handlers.values(), respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging():
+    """Writes out every queued record and stops the background writer, e.g. at exit."""
+    global _listener
+    with _lock:
+        if _listener is None:
+            return
+        _listener.stop()  # Drains the queue first
+        _listener = None
+        for handler in (_master_handler, *_file_handlers.values()):
+            handler.close()
+
+
+atexit.register(shutdown_logging)
+
 
 def setup_logger(logger_name: str = None, log_to_master: bool = True):
     """
     Sets up and configures a logger instance.
 
     This function creates a logger with a specified name (or derives it from the
-    calling script). It adds handlers for console output, a module-specific
-    log file, and an optional master log file in the project root. It prevents
-    the addition of duplicate handlers if called multiple times for the same logger.
+    calling script). Its records go to the console, a module-specific log file
+    and an optional master log file, all written by the background listener.
+    It prevents the addition of duplicate handlers if called multiple times
+    for the same logger.
 
     Parameters
     ----------
@@ -37,7 +228,7 @@ def setup_logger(logger_name: str = None, log_to_master: bool = True):
     logging.Logger
         A configured logger instance.
     """
-    
+
     # Get the name of the script or use provided logger_name
     if logger_name is None:
         caller_frame = inspect.stack()[1]
@@ -49,41 +240,28 @@ def setup_logger(logger_name: str = None, log_to_master: bool = True):
 
     # Avoid adding handlers again if logger is already configured
     if not new_logger.hasHandlers():
-        new_logger.setLevel(logging.DEBUG)  # Set the minimum level of messages to log
+        new_logger.setLevel(get_log_level(logger_name))
         new_logger.propagate = False  # Avoid log messages propagating to the root logger
-        
-        # Debug: Logger is being set up for the first time
-        new_logger.debug(f"Setting up new logger for: {logger_name}")
-
-        # --- Console Handler ---
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.DEBUG)
-        console_formatter = logging.Formatter('%(name)s - %(levelname)s: %(message)s')
-        console_handler.setFormatter(console_formatter)
-        new_logger.addHandler(console_handler)
-        new_logger.debug("Console handler added.")
-
-        # --- Module-Specific Log File ---
-        project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-        logs_dir = os.path.join(project_root, 'logs')
-        
-        log_filename = f'{logger_name}.log'
-        module_log_path = os.path.join(logs_dir, log_filename)
-        file_handler = logging.FileHandler(module_log_path)
-        file_handler.setLevel(logging.DEBUG)
-        file_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        file_handler.setFormatter(file_formatter)
-        new_logger.addHandler(file_handler)
-        new_logger.debug(f"File handler added for: {module_log_path}")
-
-        # --- Master Log File in Project Root ---
-        if log_to_master:
-            master_log_path = os.path.join(logs_dir, '_master_log.log')
-            master_file_handler = logging.FileHandler(master_log_path)
-            master_file_handler.setLevel(logging.DEBUG)
-            master_file_formatter = logging.Formatter('%(asctime)s - %(levelname)s - [%(name)s] - %(message)s')
-            master_file_handler.setFormatter(master_file_formatter)
-            new_logger.addHandler(master_file_handler)
-            new_logger.debug(f"Master log handler added at: {master_log_path}")
+
+        with _lock:
+            os.makedirs(LOGS_DIR, exist_ok=True)
+
+            # --- Module-Specific Log File ---
+            file_handler = BatchingFileHandler(os.path.join(LOGS_DIR, f'{logger_name}.log'))
+            file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+            file_handler.addFilter(logging.Filter(logger_name))
+            _file_handlers[logger_name] = file_handler
+
+            # --- Master Log File in Project Root ---
+            if not log_to_master:
+                _no_master.add(logger_name)
+
+            if _listener is None:
+                _start_listener()  # First logger, or logging was shut down
+            else:
+                _listener.handlers += (file_handler,)
+
+        new_logger.addHandler(_queue_handler)
+        new_logger.debug("Logger set up, writing to %s", file_handler.baseFilename)
 
     return new_logger
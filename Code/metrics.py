@@ -0,0 +1,150 @@
+"""
+Metrics Module
+
+Fixed-size, array-backed history of the values gathered by the monitor
+plugins. Every metric is a ring buffer of (timestamp, value) pairs stored in
+two preallocated arrays, so appending is O(1), allocates no Python objects
+and memory use stays flat no matter how long the monitor runs. Windowed
+aggregates walk the samples of the last N seconds backwards from the newest.
+"""
+import math
+import time
+from array import array
+
+
+class RingBuffer:
+    """
+    Fixed-capacity history of a single metric.
+
+    Timestamps are time.monotonic() values stored as doubles, values are stored
+    as single-precision floats.
+    """
+
+    def __init__(self, capacity=3600):
+        if capacity <= 0:
+            raise ValueError(f"Capacity must be positive, got {capacity}")
+        self.capacity = capacity
+        self._times = array('d', bytes(8 * capacity))
+        self._values = array('f', bytes(4 * capacity))
+        self._next = 0   # Index the next sample is written to
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, value, timestamp=None):
+        """Records a sample, overwriting the oldest one once the buffer is full."""
+        self._times[self._next] = time.monotonic() if timestamp is None else timestamp
+        self._values[self._next] = value
+        self._next = (self._next + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+
+    def latest(self):
+        """Returns the newest (timestamp, value) pair, or None if empty."""
+        if not self._count:
+            return None
+        i = (self._next - 1) % self.capacity
+        return self._times[i], self._values[i]
+
+    def _window_indices(self, seconds, now):
+        # Yields indices of samples newer than now - seconds, newest first
+        cutoff = (time.monotonic() if now is None else now) - seconds
+        i = self._next
+        for _ in range(self._count):
+            i = (i - 1) % self.capacity
+            if self._times[i] < cutoff:
+                return
+            yield i
+
+    def values(self, seconds=None, now=None):
+        """Returns the values of the last `seconds` (all samples if None), oldest first."""
+        if seconds is None:
+            seconds = math.inf
+        values = [self._values[i] for i in self._window_indices(seconds, now)]
+        values.reverse()
+        return values
+
+    def stats(self, seconds, now=None):
+        """
+        Computes min/max/mean over the last `seconds` in a single pass.
+
+        Returns
+        -------
+        dict or None
+            {'count', 'min', 'max', 'mean'}, or None if the window is empty.
+        """
+        count = 0
+        total = 0.0
+        low = math.inf
+        high = -math.inf
+        values = self._values
+        for i in self._window_indices(seconds, now):
+            v = values[i]
+            count += 1
+            total += v
+            if v < low:
+                low = v
+            if v > high:
+                high = v
+        if not count:
+            return None
+        return {'count': count, 'min': low, 'max': high, 'mean': total / count}
+
+    def percentile(self, seconds, q, now=None):
+        """Returns the q-th percentile (0-100, linear interpolation) of the last `seconds`, or None."""
+        values = sorted(self.values(seconds, now))
+        if not values:
+            return None
+        rank = (len(values) - 1) * min(max(q, 0.0), 100.0) / 100.0
+        lower = int(rank)
+        upper = min(lower + 1, len(values) - 1)
+        return values[lower] + (values[upper] - values[lower]) * (rank - lower)
+
+
+class MetricsStore:
+    """
+    Named ring buffers, created on first use.
+
+    Metric names follow '<plugin>.<attribute>', e.g. 'cpu_temp.cpu_temperature'.
+    """
+
+    def __init__(self, capacity=3600):
+        self.capacity = capacity
+        self._series = {}
+
+    def __contains__(self, name):
+        return name in self._series
+
+    def names(self):
+        """Returns the names of all recorded metrics."""
+        return list(self._series)
+
+    def series(self, name):
+        """Returns the ring buffer of a metric, creating it if needed."""
+        series = self._series.get(name)
+        if series is None:
+            series = self._series[name] = RingBuffer(self.capacity)
+        return series
+
+    def record(self, name, value, timestamp=None):
+        """Appends a sample to a metric. Non-numeric values are ignored."""
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return
+        self.series(name).append(value, timestamp)
+
+    def latest(self, name):
+        """Returns the newest value of a metric, or None."""
+        series = self._series.get(name)
+        sample = series.latest() if series is not None else None
+        return sample[1] if sample is not None else None
+
+    def stats(self, name, seconds, now=None):
+        """Returns min/max/mean of a metric over the last `seconds`, or None."""
+        series = self._series.get(name)
+        return series.stats(seconds, now) if series is not None else None
+
+    def percentile(self, name, seconds, q, now=None):
+        """Returns the q-th percentile of a metric over the last `seconds`, or None."""
+        series = self._series.get(name)
+        return series.percentile(seconds, q, now) if series is not None else None
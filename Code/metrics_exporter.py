@@ -0,0 +1,172 @@
+"""
+Metrics Exporter Module
+
+Serves the monitor's readings in the Prometheus text exposition format at
+http://<host>:<port>/metrics. The page is rendered once per monitor tick by
+render_metrics() and published as bytes; the HTTP threads only send the
+latest published bytes, so a scrape never reads I2C or sysfs and any number
+of scrapers cannot slow down the control loop.
+
+The exporter listens on localhost unless another address is configured, and
+serves one scrape at a time from a single thread; a client that stalls is
+dropped after REQUEST_TIMEOUT seconds.
+
+Exported series:
+    cyberdeck_<plugin>_<attribute>      → latest value of every recorded metric,
+                                          e.g. cyberdeck_cpu_temp_cpu_temperature
+    cyberdeck_expansion_<field>         → case temperature, fan mode/duty, LED mode
+    cyberdeck_security_mode{mode=...}   → 1 for the current security mode, 0 otherwise
+    cyberdeck_cpu_core_usage{core=..}   → busy percentage of every core
+    cyberdeck_process_cpu_usage{pid=..} → the busiest processes, percent of one core
+    cyberdeck_filesystem_usage{mountpoint=..} → used percentage of every mount
+    cyberdeck_disk_<rate>{device=..}    → read_bytes, write_bytes (per second), iops
+                                          and service_time (ms) of every mounted device
+    cyberdeck_cpu_clock_mhz{policy=..}  → current clock of every cpufreq policy
+    cyberdeck_thermal_zone_temperature{zone=..} → every thermal zone (C)
+    cyberdeck_plugin_*_total{plugin=..} → update, overrun and skip counters
+"""
+import math
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+PREFIX = 'cyberdeck_'
+DEFAULT_HOST = '127.0.0.1'
+REQUEST_TIMEOUT = 5.0  # Seconds a scrape may take before the connection is dropped
+
+_INVALID = re.compile(r'[^a-zA-Z0-9_]')
+
+
+def metric_name(name):
+    """Turns a MetricsStore name such as 'cpu_temp.cpu_temperature' into a Prometheus name."""
+    return PREFIX + _INVALID.sub('_', name)
+
+
+def format_value(value):
+    """Formats a sample value, using the exposition format's NaN, +Inf and -Inf spellings."""
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return f"{value:g}"
+
+
+def _label_value(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_metrics(metrics, profiler=None, security_mode=None, modes=(), labeled=()):
+    """
+    Renders the exposition page.
+
+    Parameters
+    ----------
+    metrics : MetricsStore
+        Every metric's latest value is exported as a gauge.
+    profiler : Profiler, optional
+        Adds per-plugin update, overrun and skip counters.
+    security_mode : str, optional
+        Current security mode, exported as a state set over `modes`.
+    modes : tuple of str, optional
+        Every security mode, so inactive modes are exported as 0.
+    labeled : iterable, optional
+        (name, labels, value) gauges, e.g. ('cpu_core_usage', {'core': 0}, 12.5).
+        Samples of one name must be consecutive.
+
+    Returns
+    -------
+    bytes
+        The page, ready to be published.
+    """
+    lines = []
+    for name in sorted(metrics.names()):
+        value = metrics.latest(name)
+        if value is None:
+            continue
+        exported = metric_name(name)
+        lines.append(f"# TYPE {exported} gauge")
+        lines.append(f"{exported} {format_value(value)}")
+
+    if security_mode is not None:
+        lines.append(f"# TYPE {PREFIX}security_mode gauge")
+        states = modes if security_mode in modes else (*modes, security_mode)
+        for mode in states:
+            lines.append(f'{PREFIX}security_mode{{mode="{mode}"}} {int(mode == security_mode)}')
+
+    previous = None
+    for name, labels, value in labeled:
+        exported = PREFIX + name
+        if exported != previous:
+            lines.append(f"# TYPE {exported} gauge")
+            previous = exported
+        label_text = ','.join(f'{key}="{_label_value(label)}"' for key, label in labels.items())
+        lines.append(f"{exported}{{{label_text}}} {format_value(value)}")
+
+    if profiler is not None:
+        stats = profiler.stats()
+        for counter, key in (('updates', 'runs'), ('overruns', 'overruns'), ('skipped', 'skipped')):
+            lines.append(f"# TYPE {PREFIX}plugin_{counter}_total counter")
+            for plugin in sorted(stats):
+                lines.append(f'{PREFIX}plugin_{counter}_total{{plugin="{plugin}"}} {stats[plugin][key]}')
+
+    lines.append('')
+    return '\n'.join(lines).encode('utf-8')
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    timeout = REQUEST_TIMEOUT
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = self.server.exporter.payload
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # One line per scrape would flood the logs
+
+
+class MetricsExporter:
+    """
+    HTTP server publishing the latest rendered metrics page from a background thread.
+
+    Parameters
+    ----------
+    port : int
+        TCP port to listen on; 0 picks a free port (see `port`).
+    host : str, optional
+        Address to bind (default is DEFAULT_HOST, i.e. localhost only; ''
+        binds every interface).
+    """
+
+    def __init__(self, port, host=DEFAULT_HOST):
+        self.payload = b''
+        self.server = HTTPServer((host, port), _MetricsHandler)
+        self.server.exporter = self
+        self._thread = None
+
+    @property
+    def port(self):
+        return self.server.server_address[1]
+
+    def start(self):
+        """Starts serving in a daemon thread."""
+        self._thread = threading.Thread(target=self.server.serve_forever, name='metrics-exporter', daemon=True)
+        self._thread.start()
+
+    def publish(self, payload):
+        """Replaces the page served to scrapers. A reference swap, so it never waits for a scrape."""
+        self.payload = payload
+
+    def stop(self):
+        """Stops serving and closes the socket."""
+        if self._thread is not None:
+            self.server.shutdown()
+            self._thread = None
+        self.server.server_close()
@@ -1,12 +1,21 @@
 from luma.core.interface.serial import i2c
 from luma.oled.device import ssd1306
-from PIL import Image, ImageDraw, ImageFont, ImageSequence
+from PIL import Image, ImageDraw, ImageFont
 import time
-import os
-import shutil
+from collections import OrderedDict
+from framebuffer import pack_pages, unpack_pages, dirty_window, window_bytes
+from animation import AnimationCache, play
+from asset_cache import AssetCache
 
 class OLED:
-    def __init__(self, bus_number=1, i2c_address=0x3C):
+    # SSD1306 addressing commands used to send a partial frame
+    CMD_COLUMN_ADDR = 0x21
+    CMD_PAGE_ADDR = 0x22
+    FONT_CACHE_SIZE = 8     # Loaded TrueType fonts, keyed by (path, size)
+    GLYPH_CACHE_SIZE = 512  # Rendered characters, keyed by font and character
+    TEXT_CACHE_SIZE = 128   # Text masks composed from glyphs, keyed by font and string
+
+    def __init__(self, bus_number=1, i2c_address=0x3C, asset_cache=None):
         # Initialize I2C interface and OLED display
         self.bus_number = bus_number
         self.i2c_address = i2c_address
@@ -18,15 +27,63 @@ class OLED:
         self.default_font_path = "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf" 
         self.default_font_size = 16
         self.font = ImageFont.load_default()
+        self._fonts = OrderedDict()
+        self._glyphs = OrderedDict()
+        self._text_masks = OrderedDict()
+        # Pre-dithered images and animations persist across runs on disk
+        self.assets = asset_cache if asset_cache is not None else AssetCache()
+        self.animations = AnimationCache(decoder=self.assets.load_animation)
+        self.preload_fonts([self.default_font_size])
+
+        # Page-packed copy of what is currently on the panel, None if unknown
+        self._last_frame = None
+        self.frames_sent = 0
+        self.frames_partial = 0
+        self.frames_skipped = 0
 
     def clear(self):
         # Clear the content in the buffer
         self.buffer = Image.new('1', (self.device.width, self.device.height))
         self.draw = ImageDraw.Draw(self.buffer)
 
-    def show(self):
+    def show(self, force=False):
         # Display the content in the buffer on the OLED screen
-        self.device.display(self.buffer)
+        if self.rotated:
+            self._display_rotated(self.buffer)
+            return
+        self.push_frame(pack_pages(self.buffer), force=force)
+
+    @property
+    def rotated(self):
+        # Rotation is applied by luma, so the buffer layout differs from the panel's
+        return getattr(self.device, 'rotate', 0) != 0
+
+    def _display_rotated(self, image):
+        # Send an image through luma, which rotates it for the panel
+        self.device.display(image)
+        self.frames_sent += 1
+
+    def push_frame(self, frame, force=False):
+        # Send a page-packed frame, skipping it if unchanged or sending only the changed window
+        width = self.device.width
+        window = dirty_window(None if force else self._last_frame, frame, width)
+        if window is None:
+            self.frames_skipped += 1
+            return
+        first_page, last_page, first_col, last_col = window
+        colstart = getattr(self.device, '_colstart', 0)
+        self.device.command(
+            self.CMD_COLUMN_ADDR, colstart + first_col, colstart + last_col,
+            self.CMD_PAGE_ADDR, first_page, last_page)
+        self.device.data(list(window_bytes(frame, width, window)))
+        self._last_frame = frame
+        self.frames_sent += 1
+        if window != (0, len(frame) // width - 1, 0, width - 1):
+            self.frames_partial += 1
+
+    def invalidate(self):
+        # Forget what is on the panel so the next show() sends a full frame
+        self._last_frame = None
 
     def close(self):
         # Close the I2C bus
@@ -60,22 +117,108 @@ class OLED:
         # Draw a polygon in the buffer
         self.draw.polygon(xy, outline=outline, fill=fill)
 
-    def draw_text(self, text, position=(0, 0), font_size=None):
-        # Display text in the buffer
+    def get_font(self, font_size=None, font_path=None):
+        # Get a font from the cache, parsing the font file only on first use
         if font_size is None:
-            font = self.font
+            return self.font
+        key = (font_path or self.default_font_path, font_size)
+        font = self._fonts.get(key)
+        if font is None:
+            font = ImageFont.truetype(key[0], font_size)
+            self._fonts[key] = font
+            if len(self._fonts) > self.FONT_CACHE_SIZE:
+                self._fonts.popitem(last=False)
+        else:
+            self._fonts.move_to_end(key)
+        return font
+
+    def preload_fonts(self, sizes, font_path=None):
+        # Load the given font sizes ahead of the first draw_text call
+        for size in sizes:
+            try:
+                self.get_font(size, font_path)
+            except OSError as e:
+                print(f"Error loading font {font_path or self.default_font_path} ({size}px): {e}")
+
+    def _glyph(self, char, font_size=None):
+        # Get the cached (mask, top offset, advance) of one character; the mask is None for
+        # glyphs overhanging their origin, which shift PIL's layout of the whole string
+        key = (font_size, char)
+        entry = self._glyphs.get(key)
+        if entry is not None:
+            self._glyphs.move_to_end(key)
+            return entry
+        font = self.get_font(font_size)
+        left, top, right, bottom = self.draw.textbbox((0, 0), char, font=font)
+        mask = None
+        if left >= 0:
+            top = min(top, 0)
+            mask = Image.new('1', (max(right, 1), max(bottom - top, 1)))
+            ImageDraw.Draw(mask).text((0, -top), char, font=font, fill=1)
+        entry = (mask, top, int(font.getlength(char, mode='1')))
+        self._glyphs[key] = entry
+        if len(self._glyphs) > self.GLYPH_CACHE_SIZE:
+            self._glyphs.popitem(last=False)
+        return entry
+
+    def _render_text(self, text, font_size=None):
+        # Rasterize `text` as a whole, for strings that cannot be composed from glyphs
+        font = self.get_font(font_size)
+        left, top, right, bottom = self.draw.textbbox((0, 0), text, font=font)
+        offset = (min(left, 0), min(top, 0))
+        mask = Image.new('1', (max(right - offset[0], 1), max(bottom - offset[1], 1)))
+        ImageDraw.Draw(mask).text((-offset[0], -offset[1]), text, font=font, fill=1)
+        return mask, offset
+
+    def _text_mask(self, text, font_size=None):
+        # Get the cached 1-bit rendering of `text` and its offset from the text origin.
+        # With the basic layout, strings are pasted together from cached glyphs at their hinted
+        # advances, which is how PIL lays them out, so a changing value only rasterizes the
+        # characters not seen yet. Other layouts (Raqm) apply kerning and ligatures, so their
+        # strings are rendered whole.
+        key = (font_size, text)
+        entry = self._text_masks.get(key)
+        if entry is not None:
+            self._text_masks.move_to_end(key)
+            return entry
+        basic = getattr(self.get_font(font_size), 'layout_engine', None) == ImageFont.Layout.BASIC
+        glyphs = [self._glyph(char, font_size) for char in text] if basic and '\n' not in text else []
+        if glyphs and all(mask is not None for mask, _, _ in glyphs):
+            top = min(glyph_top for _, glyph_top, _ in glyphs)
+            placed = []
+            x = width = height = 0
+            for mask, glyph_top, advance in glyphs:
+                placed.append((mask, (x, glyph_top - top)))
+                width = max(width, x + mask.width)
+                height = max(height, glyph_top - top + mask.height)
+                x += advance
+            mask = Image.new('1', (width, height))
+            for glyph, position in placed:
+                mask.paste(1, position, glyph)
+            entry = (mask, (0, top))
         else:
-            font = ImageFont.truetype(self.default_font_path, font_size)
-        self.draw.text(position, text, font=font, fill="white")
+            entry = self._render_text(text, font_size)
+        self._text_masks[key] = entry
+        if len(self._text_masks) > self.TEXT_CACHE_SIZE:
+            self._text_masks.popitem(last=False)
+        return entry
+
+    def text_size(self, text, font_size=None):
+        # Get the (width, height) `text` covers from its origin, measured once per string
+        mask, offset = self._text_mask(text, font_size)
+        return mask.size[0] + offset[0], mask.size[1] + offset[1]
+
+    def draw_text(self, text, position=(0, 0), font_size=None):
+        # Display text in the buffer
+        if not text:
+            return
+        mask, offset = self._text_mask(text, font_size)
+        self.buffer.paste(1, (position[0] + offset[0], position[1] + offset[1]), mask)
 
     def draw_image(self, image_path, position=(0, 0), resize=None):
         # Display an image in the buffer
         try:
-            image = Image.open(image_path).convert('1')
-            if resize is not None:
-                image = image.resize(resize, Image.LANCZOS)
-            else:
-                image = image.resize((self.device.width, self.device.height), Image.LANCZOS)
+            image = self.assets.load_image(image_path, resize or (self.device.width, self.device.height))
             self.buffer.paste(image, position)
         except FileNotFoundError:
             print(f"Error: File not found - {image_path}")
@@ -83,50 +226,21 @@ class OLED:
             print(f"Error displaying image: {e}")
    
     def draw_gif(self, gif_path, position=(0, 0), resize=None):
-        # Display a GIF animation
-        temp_folder = "temp"
-        if not os.path.exists(temp_folder):
-            os.makedirs(temp_folder)
+        # Display a GIF animation from frames decoded once and kept in memory
         try:
-            gif = Image.open(gif_path)
-            frames = []
-            frame_delays = []
-            for frame in ImageSequence.Iterator(gif):
-                delay = frame.info.get('duration', 100) / 1000.0
-                frame_delays.append(delay)
-                width, height = frame.size
-                target_height = height
-                target_width = height * 2
-                if width < target_width:
-                    new_image = Image.new('L', (target_width, target_height), 0)
-                    x_offset = (target_width - width) // 2
-                    new_image.paste(frame, (x_offset, 0))
-                else:
-                    new_image = Image.new('L', (width, target_height), 0)
-                    y_offset = (target_height - height) // 2
-                    new_image.paste(frame, (0, y_offset))
-                    target_width = width
-                new_image = new_image.convert('1')
-                if resize is not None:
-                    new_image = new_image.resize(resize, Image.LANCZOS)
-                else:   
-                    new_image = new_image.resize((self.device.width, self.device.height), Image.LANCZOS)
-                new_image = new_image.resize((self.device.width, self.device.height), Image.LANCZOS)
-                frame_path = os.path.join(temp_folder, f"frame_{len(frames)}.png")
-                new_image.save(frame_path)
-                frames.append(frame_path)
-            for frame_path, delay in zip(frames, frame_delays):
-                self.draw_image(frame_path, position = position, resize = resize)
-                self.show()
-                if delay > 0.17:
-                    time.sleep(delay - 0.17)
+            animation = self.animations.get(gif_path, (self.device.width, self.device.height), resize, position)
+            if self.rotated:
+                width, height = self.device.width, self.device.height
+                play(animation, lambda frame: self._display_rotated(unpack_pages(frame, width, height)))
+            else:
+                play(animation, self.push_frame)
+            # Leave the last frame in the buffer, as if it had been drawn
+            self.buffer = animation.last_image.copy()
+            self.draw = ImageDraw.Draw(self.buffer)
         except FileNotFoundError:
             print(f"Error: File not found - {gif_path}")
         except Exception as e:
             print(f"Error displaying GIF: {e}")
-        finally:
-            if os.path.exists(temp_folder):
-                shutil.rmtree(temp_folder)
 
     def save_buffer_to_image(self, image_path="saved_image.png"):
         # Save the content in the buffer as an image file
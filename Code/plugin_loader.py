@@ -1,44 +1,226 @@
-import os
+import contextlib
 import importlib
-import inspect
-from plugins.base_plugin import BasePlugin
+import sys
+from plugins.manifest import REGISTRY
+from file_watcher import FileWatcher
 
-def load_plugins(oled=None, expansion=None):
+def resolve_order(names, registry=None):
     """
-    Loads all plugins from the 'plugins' directory.
+    Returns the plugins to load for `names`, dependencies first.
+
+    Required plugins that are not in `names` are added. Raises KeyError for a
+    plugin missing from the registry and ValueError for a dependency cycle.
+    """
+    registry = REGISTRY if registry is None else registry
+    order = []
+    state = {}  # name -> 'visiting' or 'done'
+
+    def visit(name, chain):
+        if state.get(name) == 'done':
+            return
+        if state.get(name) == 'visiting':
+            raise ValueError(f"Plugin dependency cycle: {' -> '.join(chain + [name])}")
+        if name not in registry:
+            raise KeyError(f"Unknown plugin '{name}'" + (f" required by '{chain[-1]}'" if chain else ''))
+        state[name] = 'visiting'
+        for dependency in registry[name].requires:
+            visit(dependency, chain + [name])
+        state[name] = 'done'
+        order.append(name)
+
+    for name in names:
+        visit(name, [])
+    return order
+
+def load_plugins(oled=None, expansion=None, compositor=None, enabled=None, registry=None):
+    """
+    Loads the enabled plugins listed in the plugin manifest.
+
+    Plugins are built in dependency order and their modules are only imported
+    when the plugin is enabled or required by an enabled plugin. `enabled`
+    defaults to every registered plugin.
+
+    `compositor` is the shared LedCompositor LED plugins draw on. Without it
+    the LED plugins share a private compositor rendered by LedControlPlugin.
     """
+    registry = REGISTRY if registry is None else registry
+    resources = {'oled': oled, 'expansion': expansion, 'compositor': compositor}
     plugins = {}
-    plugins_path = os.path.abspath(os.path.join(os.path.dirname(__file__), 'plugins'))
 
-    # First pass: load all non-security plugins
-    for filename in os.listdir(plugins_path):
-        if filename.endswith('.py') and not filename.startswith('__'):
-            module_name = f"plugins.{filename[:-3]}"
-            try:
-                module = importlib.import_module(module_name)
-                for name, cls in inspect.getmembers(module, inspect.isclass):
-                    if issubclass(cls, BasePlugin) and cls is not BasePlugin:
-                        plugin_name = filename[:-10]  # remove _plugin.py
-                        # Skip security_status for now (needs led_control reference)
-                        if plugin_name == 'security_status':
-                            continue
-                        if plugin_name == 'oled_display':
-                            plugins[plugin_name] = cls(oled)
-                        elif plugin_name == 'fan_control':
-                            plugins[plugin_name] = cls(expansion)
-                        elif plugin_name == 'led_control':
-                            plugins[plugin_name] = cls(expansion)
-                        else:
-                            plugins[plugin_name] = cls()
-            except ImportError as e:
-                print(f"Error importing plugin {module_name}: {e}")
-
-    # Second pass: load security_status with led_control reference
     try:
-        from plugins.security_status_plugin import SecurityStatusPlugin
-        led_control = plugins.get('led_control')
-        plugins['security_status'] = SecurityStatusPlugin(expansion, led_control)
-    except ImportError as e:
-        print(f"Error importing security_status_plugin: {e}")
+        order = resolve_order(list(registry) if enabled is None else enabled, registry)
+    except (KeyError, ValueError) as e:
+        print(f"Error resolving plugins: {e}")
+        return plugins
+
+    for name in order:
+        spec = registry[name]
+        missing = [dependency for dependency in spec.requires if dependency not in plugins]
+        if missing:
+            print(f"Skipping plugin {name}: missing {', '.join(missing)}")
+            continue
+        try:
+            module = importlib.import_module(spec.module)
+            cls = getattr(module, spec.cls)
+        except (ImportError, AttributeError) as e:
+            print(f"Error importing plugin {spec.module}: {e}")
+            continue
+        plugins[name] = _construct(cls, spec, plugins, resources)
 
     return plugins
+
+def _construct(cls, spec, plugins, resources):
+    """Builds a plugin of class `cls` with the constructor arguments listed in its spec."""
+    args = [plugins[resource[7:]] if resource.startswith('plugin:') else resources[resource]
+            for resource in spec.resources]
+    plugin = cls(*args)
+    if spec.period is not None:
+        plugin.period = spec.period
+    return plugin
+
+class PluginReloader:
+    """
+    Reloads plugin modules whose source changed, without restarting the monitor.
+
+    Every loaded plugin's module file is watched. When one changes, check()
+    reloads that module alone and replaces its plugins in `plugins` (the dict
+    the monitor runs from), carrying their state over with the optional
+    export_state()/import_state() hooks. Plugins holding a replaced plugin
+    ('plugin:<name>' resources) are rebuilt as well so they see the new one.
+
+    If the module fails to import or a new plugin fails to build, the module
+    and the previous plugins are restored and the running version stays.
+
+    Plugins must not be updating while they are replaced. check() takes a
+    `pause` context manager that stops updates and yields whether they have
+    all finished; if not, the changed modules are retried at the next check.
+    """
+
+    def __init__(self, plugins, oled=None, expansion=None, compositor=None, registry=None):
+        self.plugins = plugins
+        self.registry = REGISTRY if registry is None else registry
+        self.resources = {'oled': oled, 'expansion': expansion, 'compositor': compositor}
+        self.reloads = 0
+        self.failures = 0
+        self._watchers = {}  # module name -> FileWatcher of its source
+        self._pending = set()  # Changed modules whose reload was deferred
+        for name in plugins:
+            module_name = self.registry[name].module
+            path = getattr(sys.modules.get(module_name), '__file__', None)
+            if path is None or module_name in self._watchers:
+                continue
+            watcher = FileWatcher(path)
+            watcher.changed()  # The loaded version is current
+            self._watchers[module_name] = watcher
+
+    def check(self, pause=None):
+        """
+        Reloads the modules changed since the last check. Returns the names of the replaced plugins.
+
+        `pause`, if given, is called only when a module changed and must return
+        a context manager that holds plugin updates off and yields True once
+        none is running, or False if they did not finish in time.
+        """
+        changed = [module_name for module_name, watcher in self._watchers.items()
+                   if watcher.changed() or module_name in self._pending]
+        if not changed:
+            return []
+        replaced = []
+        with pause() if pause is not None else contextlib.nullcontext(True) as idle:
+            if not idle:
+                self._pending.update(changed)  # Retried at the next check
+                return replaced
+            self._pending.clear()
+            for module_name in changed:
+                replaced += self.reload_module(module_name)
+        return replaced
+
+    def reload_module(self, module_name):
+        """
+        Reloads `module_name` and replaces the plugins built from it.
+
+        Returns the names of the replaced plugins, or an empty list when the
+        reload failed and the previous version was kept.
+        """
+        module = sys.modules[module_name]
+        saved = dict(module.__dict__)
+        try:
+            importlib.reload(module)
+            cls_names = {spec.cls for spec in self.registry.values() if spec.module == module_name}
+            for cls_name in cls_names:
+                getattr(module, cls_name)
+        except Exception as e:
+            self._restore(module, saved)
+            print(f"Error reloading plugin module {module_name}, keeping the running version: {e}")
+            self.failures += 1
+            return []
+
+        names = self._affected(module_name)
+        old = {name: self.plugins[name] for name in names}
+        states = {name: _call(old[name], 'export_state') for name in names}
+        for name in names:
+            _call(old[name], 'close')  # Frees sockets and devices for the new instance
+
+        built = dict(self.plugins)
+        constructed = []
+        try:
+            for name in names:
+                spec = self.registry[name]
+                built[name] = _construct(getattr(importlib.import_module(spec.module), spec.cls),
+                                         spec, built, self.resources)
+                constructed.append(name)
+                _call(built[name], 'import_state', states[name])
+        except Exception as e:
+            for name in constructed:
+                # Frees what the new instances opened before the previous ones are rebuilt
+                try:
+                    _call(built[name], 'close')
+                except Exception as close_error:
+                    print(f"Error closing plugin {name}: {close_error}")
+            self._restore(module, saved)
+            print(f"Error rebuilding plugins from {module_name}, keeping the running version: {e}")
+            self.failures += 1
+            self._rebuild_previous(old, states)
+            return []
+
+        self.plugins.update((name, built[name]) for name in names)
+        self.reloads += 1
+        return names
+
+    def _affected(self, module_name):
+        """Plugins built from `module_name` and the plugins holding them, in load order."""
+        affected = []
+        for name in self.plugins:
+            spec = self.registry[name]
+            if spec.module == module_name or any(resource[7:] in affected for resource in spec.resources
+                                                  if resource.startswith('plugin:')):
+                affected.append(name)
+        return affected
+
+    def _rebuild_previous(self, old, states):
+        # The previous instances were closed; bring them back from their own classes
+        restored = dict(self.plugins)
+        for name, plugin in old.items():
+            try:
+                restored[name] = _construct(type(plugin), self.registry[name], restored, self.resources)
+                _call(restored[name], 'import_state', states[name])
+            except Exception as e:
+                print(f"Error restoring plugin {name}: {e}")
+                restored[name] = plugin
+        self.plugins.update((name, restored[name]) for name in old)
+
+    @staticmethod
+    def _restore(module, saved):
+        module.__dict__.clear()
+        module.__dict__.update(saved)
+
+    def close(self):
+        """Releases the file watchers."""
+        for watcher in self._watchers.values():
+            watcher.close()
+        self._watchers = {}
+
+def _call(plugin, hook, *args):
+    # Hooks are optional for plugins that do not derive from BasePlugin
+    method = getattr(plugin, hook, None)
+    return method(*args) if method is not None else None
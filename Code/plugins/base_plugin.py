@@ -1,7 +1,25 @@
+import asyncio
+
+
 class BasePlugin:
     """
     The base class for all plugins.
     """
+    # Interval between two update() calls, in seconds. Plugins override this
+    # to run faster (animations) or slower (expensive sensors).
+    period = 1.0
+    # Names of numeric attributes the monitor records into its metrics
+    # history after every update()
+    metrics = ()
+    # Names of the data this plugin provides and the data its update() reads.
+    # The monitor runs every producer before the plugins consuming its data;
+    # plugins with no dependency between them update concurrently.
+    produces = ()
+    consumes = ()
+    # Safety-critical plugins keep running at their period even when their
+    # updates overrun; the monitor's watchdog demotes any other plugin
+    critical = False
+
     def __init__(self):
         pass
 
@@ -11,3 +29,32 @@ class BasePlugin:
         Each plugin should implement this method to perform its specific task.
         """
         raise NotImplementedError("Each plugin must implement the 'update' method.")
+
+    def export_state(self):
+        """
+        Returns the state to carry over when the plugin is hot-reloaded.
+        The new instance receives it in import_state(). The default keeps
+        nothing, which suits plugins that re-read everything on update().
+        """
+        return None
+
+    def import_state(self, state):
+        """Restores the state returned by the previous instance's export_state()."""
+        pass
+
+    def close(self):
+        """
+        Releases sockets, devices and other resources before the plugin is
+        replaced by a reloaded version.
+        """
+        pass
+
+    async def update_async(self, pi_monitor=None):
+        """
+        Called by the asyncio runtime instead of update().
+        The default runs the blocking update() in the loop's executor so a slow
+        sensor or bus transfer does not stall other plugins. Plugins with real
+        asynchronous work can override this coroutine.
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.update, pi_monitor)
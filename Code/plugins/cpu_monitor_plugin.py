@@ -1,10 +1,41 @@
-import psutil
 from plugins.base_plugin import BasePlugin
+from sampler import get_sampler
 
 class CpuMonitorPlugin(BasePlugin):
+    metrics = ('cpu_usage', 'max_core_usage', 'iowait', 'irq', 'steal')
+    produces = ('cpu_usage', 'per_core_usage', 'max_core_usage', 'cpu_breakdown', 'top_processes')
+
     def __init__(self):
         super().__init__()
         self.cpu_usage = 0
+        self.per_core_usage = ()  # Busy percentage of every core since the previous sample
+        self.max_core_usage = 0   # Busiest core; a pegged core is invisible in the average
+        self.iowait = 0.0
+        self.irq = 0.0
+        self.steal = 0.0
+        self.top_processes = ()   # (pid, name, percent of one core), busiest first
+
+    def export_state(self):
+        return {'cpu_usage': self.cpu_usage, 'per_core_usage': self.per_core_usage,
+                'top_processes': self.top_processes}
+
+    def import_state(self, state):
+        if state:
+            self.cpu_usage = state['cpu_usage']
+            self.per_core_usage = state['per_core_usage']
+            self.max_core_usage = max(self.per_core_usage, default=0)
+            self.top_processes = state['top_processes']
 
     def update(self, pi_monitor=None):
-        self.cpu_usage = psutil.cpu_percent(interval=0)
+        # Usage is measured by the shared sampler between two /proc/stat reads
+        sampler = get_sampler(pi_monitor)
+        snapshot = sampler.snapshot()
+        self.cpu_usage = snapshot.cpu_usage
+        self.per_core_usage = snapshot.per_core_usage
+        self.max_core_usage = max(snapshot.per_core_usage, default=0)
+        breakdown = snapshot.cpu_breakdown
+        self.iowait = breakdown.get('iowait', 0.0)
+        self.irq = breakdown.get('irq', 0.0)
+        self.steal = breakdown.get('steal', 0.0)
+        # Rate limited by the sampler; usually returns the previous result
+        self.top_processes = sampler.top_processes()
@@ -1,15 +1,14 @@
 from plugins.base_plugin import BasePlugin
-import os
+from sampler import get_sampler
 
 class CpuTempPlugin(BasePlugin):
+    metrics = ('cpu_temperature',)
+    produces = ('cpu_temperature',)
+
     def __init__(self):
         super().__init__()
         self.cpu_temperature = 0
 
     def update(self, pi_monitor):
-        try:
-            with open('/sys/devices/virtual/thermal/thermal_zone0/temp', 'r') as f:
-                temp_raw = int(f.read().strip())
-                self.cpu_temperature = temp_raw / 1000.0
-        except Exception:
-            self.cpu_temperature = 0
+        # The thermal zone stays open in the shared sampler; 0 when it cannot be read
+        self.cpu_temperature = get_sampler(pi_monitor).snapshot().cpu_temperature
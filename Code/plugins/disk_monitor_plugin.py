@@ -1,12 +1,114 @@
-import psutil
+"""
+disk_monitor_plugin.py
+
+File system usage of every mounted block device, and read/write throughput,
+IOPS and service time of the devices behind them.
+
+I/O rates come from the difference between two /proc/diskstats readings,
+one per update, so they are averages over the plugin's period. Usage is
+queried with statvfs() through the shared sampler, which caches it for
+STATVFS_TTL seconds.
+
+A device that keeps writing faster than `write_alert_rate` for
+`write_alert_after` seconds (a logging or capture write storm wearing out
+the SD card) raises a write alert: a warning is logged and the
+`on_write_alert(device, bytes_per_second)` hook, if set, is called once
+until the rate drops again.
+"""
+
+import os
 from plugins.base_plugin import BasePlugin
+from logger import setup_logger
+from sampler import get_sampler, io_rates
+
+
+WRITE_ALERT_RATE = 4 * 1024 * 1024  # Bytes written per second considered a write storm
+WRITE_ALERT_AFTER = 60.0            # Seconds the rate must be sustained before alerting
+
 
 class DiskMonitorPlugin(BasePlugin):
-    def __init__(self, path='/'):
+    """
+    Reports disk usage per mount point and I/O rates per mounted device.
+    """
+    period = 5.0  # I/O rates are averaged over the period; usage is cached by the sampler
+    metrics = ('disk_usage', 'read_bytes_per_sec', 'write_bytes_per_sec', 'iops')
+    produces = ('disk_usage', 'mount_usage', 'disk_io')
+
+    def __init__(self, path='/', write_alert_rate=WRITE_ALERT_RATE, write_alert_after=WRITE_ALERT_AFTER,
+                 on_write_alert=None):
         super().__init__()
         self.path = path
+        self.write_alert_rate = write_alert_rate
+        self.write_alert_after = write_alert_after
+        self.on_write_alert = on_write_alert
+        self.logger = setup_logger('disk_monitor_plugin')
+
         self.disk_usage = 0
+        self.mount_usage = {}         # mount point -> used percentage
+        self.disk_io = {}             # device -> io_rates() since the previous update
+        self.read_bytes_per_sec = 0.0
+        self.write_bytes_per_sec = 0.0
+        self.iops = 0.0
+        self._previous = None         # (timestamp, parse_diskstats() result)
+        self._storm_start = {}        # device -> time its write rate went above the alert rate
+        self._alerted = set()         # Devices alerted for the current storm
+
+    def export_state(self):
+        return {'previous': self._previous, 'storm_start': self._storm_start, 'alerted': self._alerted}
+
+    def import_state(self, state):
+        # Rates continue from the previous reading instead of skipping an update
+        if state:
+            self._previous = state['previous']
+            self._storm_start = state['storm_start']
+            self._alerted = state['alerted']
 
     def update(self, pi_monitor=None):
-        disk_usage = psutil.disk_usage(self.path)
-        self.disk_usage = disk_usage.percent
+        sampler = get_sampler(pi_monitor)
+        self.disk_usage = sampler.disk_usage(self.path)
+
+        mounts = sampler.mounts()
+        usage = {}
+        devices = set()
+        for device, mountpoint in mounts:
+            try:
+                usage[mountpoint] = sampler.disk_usage(mountpoint)
+                # By major:minor, since /dev/root is not always a symlink to the real device
+                name = sampler.block_device(mountpoint)
+            except OSError:
+                continue  # Unmounted since /proc/mounts was read
+            devices.add(name or os.path.basename(os.path.realpath(device)))
+        self.mount_usage = usage
+
+        now, stats = sampler.diskstats()
+        rates = {}
+        if self._previous is not None and now > self._previous[0]:
+            elapsed = now - self._previous[0]
+            previous = self._previous[1]
+            for device in devices:
+                if device in stats and device in previous:
+                    rates[device] = io_rates(previous[device], stats[device], elapsed)
+        self._previous = (now, stats)
+
+        self.disk_io = rates
+        self.read_bytes_per_sec = sum(rate['read_bytes'] for rate in rates.values())
+        self.write_bytes_per_sec = sum(rate['write_bytes'] for rate in rates.values())
+        self.iops = sum(rate['iops'] for rate in rates.values())
+        self._check_write_rates(now)
+
+    def _check_write_rates(self, now):
+        for device, rate in self.disk_io.items():
+            if rate['write_bytes'] < self.write_alert_rate:
+                self._storm_start.pop(device, None)
+                self._alerted.discard(device)
+                continue
+            start = self._storm_start.setdefault(device, now)
+            if now - start >= self.write_alert_after and device not in self._alerted:
+                self._alerted.add(device)
+                self.logger.warning("Sustained writes on %s: %.1f MB/s for %.0fs",
+                                    device, rate['write_bytes'] / 1e6, now - start)
+                if self.on_write_alert is not None:
+                    try:
+                        self.on_write_alert(device, rate['write_bytes'])
+                    except Exception as e:
+                        self.logger.error("Error in write alert hook: %s", e)
@@ -1,27 +1,231 @@
+"""
+fan_control_plugin.py
+
+Closed-loop control of the case fans from the Raspberry Pi's SoC temperature.
+
+The duty written to the expansion board is a PID term on the distance to the
+curve's setpoint plus a feed-forward term proportional to CPU load, so the
+fans spin up as soon as load rises instead of waiting for the heat to show
+up. While ThrottleMonitorPlugin reports thermal throttling the target is
+full speed, whatever the temperature reading says. The result is
+rate-limited (slew) and only written when it moved by more than the
+deadband, which keeps the fans quiet and the I2C bus idle when the
+temperature is steady.
+
+Fan curves:
+    quiet        → higher setpoint, gentle gains
+    balanced     → default
+    performance  → low setpoint, aggressive gains
+
+A unit can override the curve and any of its parameters in
+/etc/cyberdeck/fan_curve.json, e.g. {"curve": "quiet", "setpoint": 62}.
+"""
+
+import json
+import math
+import time
+from pathlib import Path
 from plugins.base_plugin import BasePlugin
+from logger import setup_logger
+
+
+FAN_CURVE_FILE = Path('/etc/cyberdeck/fan_curve.json')
+INTEGER_FIELDS = ('min_duty', 'max_duty', 'deadband')  # Duties; every other field is a float
+
+
+class FanCurve:
+    """Tuning parameters of the fan controller."""
+    __slots__ = ['setpoint', 'kp', 'ki', 'kd', 'kff', 'min_duty', 'max_duty',
+                 'slew_rate', 'deadband', 'critical_temp']
+
+    def __init__(self, setpoint=60.0, kp=10.0, ki=0.5, kd=15.0, kff=0.8,
+                 min_duty=0, max_duty=255, slew_rate=40.0, deadband=4, critical_temp=80.0):
+        self.setpoint = setpoint            # Target SoC temperature (C)
+        self.kp = kp                        # Duty per C above setpoint
+        self.ki = ki                        # Duty per C*s of accumulated error
+        self.kd = kd                        # Duty per C/s of temperature rise
+        self.kff = kff                      # Duty per % of CPU load
+        self.min_duty = min_duty
+        self.max_duty = max_duty
+        self.slew_rate = slew_rate          # Max duty change per second
+        self.deadband = deadband            # Min duty change worth a bus write
+        self.critical_temp = critical_temp  # Full speed immediately above this (C)
+
+    def replace(self, **overrides):
+        """Return a copy of the curve with some parameters changed."""
+        params = {name: getattr(self, name) for name in self.__slots__}
+        for name, value in overrides.items():
+            if name not in params:
+                raise ValueError(f"Unknown fan curve parameter: {name}")
+            params[name] = value
+        return FanCurve(**params)
+
+
+FAN_CURVES = {
+    'quiet': FanCurve(setpoint=65.0, kp=6.0, ki=0.3, kd=10.0, kff=0.4, slew_rate=20.0, deadband=6),
+    'balanced': FanCurve(),
+    'performance': FanCurve(setpoint=55.0, kp=16.0, ki=0.8, kd=20.0, kff=1.5, slew_rate=80.0, deadband=3),
+}
+
+
+def load_fan_curve(path=FAN_CURVE_FILE, default='balanced'):
+    """
+    Build the fan curve for this unit.
+
+    The optional JSON file may name a preset in "curve" and override any
+    FanCurve parameter. Values are converted to numbers here, so a bad file
+    is reported once instead of failing in the control loop. A missing or
+    invalid file yields the default preset, an invalid override the named one.
+    """
+    try:
+        with open(path, 'r') as f:
+            overrides = json.load(f)
+    except OSError:
+        return FAN_CURVES[default]
+    except ValueError as e:
+        setup_logger('fan_control_plugin').warning("Ignoring invalid fan curve file %s: %s", path, e)
+        return FAN_CURVES[default]
+    if not isinstance(overrides, dict):
+        setup_logger('fan_control_plugin').warning("Ignoring fan curve file %s: not a JSON object", path)
+        return FAN_CURVES[default]
+    preset = overrides.pop('curve', default)
+    base = FAN_CURVES.get(preset, FAN_CURVES[default]) if isinstance(preset, str) else FAN_CURVES[default]
+    if not overrides:
+        return base
+    try:
+        return base.replace(**{name: _curve_value(name, value) for name, value in overrides.items()})
+    except (TypeError, ValueError) as e:
+        setup_logger('fan_control_plugin').warning("Ignoring fan curve overrides in %s: %s", path, e)
+        return base
+
+
+def _curve_value(name, value):
+    # JSON gives strings, null and booleans as easily as numbers
+    if value is None or isinstance(value, bool):
+        raise TypeError(f"{name} must be a number, not {value!r}")
+    number = int(value) if name in INTEGER_FIELDS else float(value)
+    if not math.isfinite(number):
+        raise ValueError(f"{name} must be finite, not {value!r}")
+    return number
+
 
 class FanControlPlugin(BasePlugin):
-    def __init__(self, expansion):
+    """
+    PID + feed-forward controller of the expansion board fans.
+    """
+    metrics = ('fan_duty',)
+    produces = ('fan_duty',)
+    consumes = ('cpu_temperature', 'cpu_usage', 'max_core_usage', 'throttle_state')
+    critical = True  # Never slowed down by the overrun watchdog
+
+    def __init__(self, expansion, curve=None):
         super().__init__()
         self.expansion = expansion
-        self.last_fan_pwm = 0
-        self.last_fan_pwm_limit = 0
-        self.temp_threshold_high = 170
-        self.temp_threshold_low = 130
-        self.max_pwm = 255
-        self.min_pwm = 0
+        self.logger = setup_logger('fan_control_plugin')
+        if curve is None:
+            curve = load_fan_curve()
+        elif isinstance(curve, str):
+            curve = FAN_CURVES[curve]
+        self.curve = curve
+
+        self.fan_duty = 0.0       # Controller output after slew limiting
+        self.last_fan_pwm = 0     # Duty last written to the board
+        self._integral = 0.0
+        self._last_temp = None
+        self._last_time = None
         self.expansion.set_fan_mode(1)
 
+    def set_curve(self, curve):
+        """Switch to another curve (preset name or FanCurve) and restart the integrator."""
+        self.curve = FAN_CURVES[curve] if isinstance(curve, str) else curve
+        self._integral = 0.0
+
+    def export_state(self):
+        return {'curve': self.curve, 'fan_duty': self.fan_duty, 'last_fan_pwm': self.last_fan_pwm,
+                'integral': self._integral, 'last_temp': self._last_temp, 'last_time': self._last_time}
+
+    def import_state(self, state):
+        # Keeps the fans where they are instead of ramping from zero
+        if state:
+            self.curve = state['curve']
+            self.fan_duty = state['fan_duty']
+            self.last_fan_pwm = state['last_fan_pwm']
+            self._integral = state['integral']
+            self._last_temp = state['last_temp']
+            self._last_time = state['last_time']
+
     def update(self, pi_monitor):
         current_cpu_temp = pi_monitor.plugins['cpu_temp'].cpu_temperature
-        current_fan_pwm = pi_monitor.plugins['fan_pwm'].fan_pwm
-        
-        if current_fan_pwm != -1:
-            if self.last_fan_pwm_limit == 0 and current_cpu_temp > self.temp_threshold_high:
-                self.last_fan_pwm = self.max_pwm
-                self.expansion.set_fan_duty(self.last_fan_pwm, self.last_fan_pwm)
-                self.last_fan_pwm_limit = 1
-            elif self.last_fan_pwm_limit == 1 and current_cpu_temp < self.temp_threshold_low:
-                self.last_fan_pwm = self.min_pwm
-                self.expansion.set_fan_duty(self.last_fan_pwm, self.last_fan_pwm)
-                self.last_fan_pwm_limit = 0
+        cpu_monitor = pi_monitor.plugins.get('cpu_monitor')
+        cpu_load = self.load(cpu_monitor)
+
+        if current_cpu_temp <= 0:
+            # Temperature read failed; hold the current duty
+            return
+
+        now = time.monotonic()
+        dt = now - self._last_time if self._last_time is not None else self.period
+        dt = max(dt, 1e-3)
+        self._last_time = now
+        target = self.compute_duty(current_cpu_temp, cpu_load, dt)
+        if self.throttled(pi_monitor.plugins.get('throttle_monitor')):
+            # The SoC is already losing clock speed, so cooling is behind
+            target = self.curve.max_duty
+        self.set_duty(target, dt)
+
+    @staticmethod
+    def load(cpu_monitor):
+        """CPU load (%) used for the feed-forward term."""
+        if cpu_monitor is None:
+            return 0.0
+        # A single pegged core runs at full clock and heats the SoC more than
+        # its share of the average suggests, so it counts for at least half
+        peak = getattr(cpu_monitor, 'max_core_usage', 0)
+        if not isinstance(peak, (int, float)):
+            peak = 0
+        return max(cpu_monitor.cpu_usage, peak / 2)
+
+    @staticmethod
+    def throttled(throttle_monitor):
+        """True while the SoC is throttled for thermal reasons. Under-voltage alone does not count."""
+        return getattr(throttle_monitor, 'thermal_throttled', False) is True
+
+    def compute_duty(self, temp, cpu_load, dt):
+        """Return the target duty (before slew limiting) for a temperature (C) and CPU load (%)."""
+        curve = self.curve
+        if temp >= curve.critical_temp:
+            self._last_temp = temp
+            return curve.max_duty
+
+        error = temp - curve.setpoint
+        derivative = 0.0 if self._last_temp is None else (temp - self._last_temp) / dt
+        self._last_temp = temp
+
+        feed_forward = curve.kff * cpu_load
+        output = feed_forward + curve.kp * error + curve.ki * self._integral + curve.kd * derivative
+
+        # Anti-windup: only integrate while the output is not pushing past a limit
+        if not ((output >= curve.max_duty and error > 0) or (output <= curve.min_duty and error < 0)):
+            self._integral += error * dt
+            # Keep the integral within what the fans can actually deliver
+            if curve.ki > 0:
+                limit = curve.max_duty / curve.ki
+                self._integral = max(-limit, min(limit, self._integral))
+
+        return max(curve.min_duty, min(curve.max_duty, output))
+
+    def set_duty(self, target, dt):
+        """Move the output toward `target` within the slew limit and write it if it changed enough."""
+        curve = self.curve
+        if self._last_temp is not None and self._last_temp >= curve.critical_temp:
+            self.fan_duty = float(curve.max_duty)  # No slew limit when overheating
+        else:
+            step = curve.slew_rate * dt
+            self.fan_duty = max(self.fan_duty - step, min(self.fan_duty + step, target))
+
+        duty = int(round(self.fan_duty))
+        at_limit = duty in (curve.min_duty, curve.max_duty)
+        if duty != self.last_fan_pwm and (abs(duty - self.last_fan_pwm) >= curve.deadband or at_limit):
+            self.expansion.set_fan_duty(duty, duty)
+            self.last_fan_pwm = duty
+            self.logger.debug("Fan duty set to %d (%.1fC)", duty, self._last_temp)
@@ -1,68 +1,67 @@
 from plugins.base_plugin import BasePlugin
 import math
-import time
 from logger import setup_logger
+from led_effects import (LedEffect, LedFrames, LoadMeter, HUE_CYCLE, FRAME_RATE,
+                         breathing_table, chase_table)
+from led_compositor import LedCompositor, OFF
 
 class LedControlPlugin(BasePlugin):
-    def __init__(self, expansion):
+    period = 1.0 / FRAME_RATE
+    consumes = ('per_core_usage',)
+
+    # Lookup-table effects; periods match the former analytic curves
+    EFFECTS = {
+        'rainbow_fade': LedEffect(HUE_CYCLE, 1 / 0.02, breathing_table(), 2 * math.pi),
+        'rgb_strobe': LedEffect(HUE_CYCLE, 1 / 0.5, breathing_table(), 2 * math.pi / 5),
+        'chase': LedFrames(chase_table((0, 120, 255)), 1.2),
+    }
+
+    def __init__(self, expansion, compositor=None):
         super().__init__()
         self.expansion = expansion
         self.mode = 'rainbow_fade' # Default mode
-        self.start_time = time.time()
         # Initial setup of set_led_mode(1) moved to set_mode
         self.logger = setup_logger('led_control_plugin')
+        # The mode is drawn on the compositor's base layer. A shared compositor is
+        # rendered by the monitor loop; a private one is rendered by update().
+        self.owns_compositor = compositor is None
+        self.compositor = compositor if compositor is not None else LedCompositor(expansion)
+        self.compositor.set_layer('base', self.EFFECTS[self.mode])
+        # One LED per core (or group of cores) in 'cpu_meter' mode
+        self.core_loads = ()
+        self.cpu_meter = LoadMeter(lambda: self.core_loads)
 
     def set_mode(self, mode):
         # Set to manual RGB control if not already
         if mode != 'off':
             self.expansion.set_led_mode(1)
         
-        # Cleanup for previous mode if necessary (e.g., turning off LEDs)
-        if self.mode != 'off' and mode == 'off':
+        # Cleanup for previous mode if necessary (e.g., turning off LEDs),
+        # unless a higher layer is currently shown
+        if self.mode != 'off' and mode == 'off' and self.compositor.active_layer() == 'base':
             self.expansion.set_all_led_color(0, 0, 0)
         
         self.mode = mode
-        self.start_time = time.time() # Reset time for new mode animation
+        if mode == 'cpu_meter':
+            self.compositor.set_layer('base', self.cpu_meter)
+        else:
+            self.compositor.set_layer('base', self.EFFECTS.get(mode, OFF))
 
-    def update(self, pi_monitor):
-        if self.mode == 'rainbow_fade':
-            self.rainbow_fade()
-        elif self.mode == 'rgb_strobe':
-            self.rgb_strobe()
-        elif self.mode == 'off':
-            self.expansion.set_all_led_color(0, 0, 0) # Ensure off
+    def export_state(self):
+        return {'mode': self.mode, 'core_loads': self.core_loads}
 
-    def rainbow_fade(self):
-        # Breathing effect
-        brightness = (math.sin(time.time() - self.start_time) + 1) / 2
-        
-        # Smooth rainbow effect
-        hue = (time.time() - self.start_time) * 0.02 # Slower transition for smooth fade
-        r, g, b = self.hsv_to_rgb(hue, 1, 1)
-        
-        # Combine
-        r = int(r * brightness)
-        g = int(g * brightness)
-        b = int(b * brightness)
-        
-        self.logger.debug(f"Rainbow Fade - Setting LED color to: r={r}, g={g}, b={b}")
-        self.expansion.set_all_led_color(r, g, b)
+    def import_state(self, state):
+        if state:
+            self.core_loads = state['core_loads']
+            self.set_mode(state['mode'])
 
-    def rgb_strobe(self):
-        # Breathing effect (faster for strobe)
-        brightness = (math.sin((time.time() - self.start_time) * 5) + 1) / 2 # Faster breathing
-        
-        # Rainbow effect (faster for strobe)
-        hue = (time.time() - self.start_time) * 0.5 # Faster hue change
-        r, g, b = self.hsv_to_rgb(hue, 1, 1)
-        
-        # Combine
-        r = int(r * brightness)
-        g = int(g * brightness)
-        b = int(b * brightness)
-        
-        self.logger.debug(f"RGB Strobe - Setting LED color to: r={r}, g={g}, b={b}")
-        self.expansion.set_all_led_color(r, g, b)
+    def update(self, pi_monitor):
+        if self.mode == 'cpu_meter':
+            cpu_monitor = pi_monitor.plugins.get('cpu_monitor')
+            self.core_loads = cpu_monitor.per_core_usage if cpu_monitor is not None else ()
+        # Unchanged colors are skipped by the expansion board's register cache
+        if self.owns_compositor:
+            self.compositor.render()
 
     def hsv_to_rgb(self, h, s, v):
         h = h % 1.0
@@ -0,0 +1,47 @@
+"""
+manifest.py
+
+Registry of the monitor's plugins. Every plugin is described by a PluginSpec
+so the loader can build it without importing modules it does not need:
+
+    name       → key of the plugin in Pi_Monitor.plugins
+    module     → module imported when the plugin is enabled
+    cls        → plugin class in that module
+    requires   → plugins that must be loaded before this one
+    resources  → constructor arguments, in order: a loader resource
+                 ('oled', 'expansion', 'compositor') or 'plugin:<name>'
+    period     → update period override, None keeps the class's period
+
+Plugins living outside this file are added with register().
+"""
+from collections import namedtuple
+
+PluginSpec = namedtuple('PluginSpec', ['name', 'module', 'cls', 'requires', 'resources', 'period'])
+PluginSpec.__new__.__defaults__ = ((), (), None)
+
+REGISTRY = {}
+
+
+def register(spec):
+    """Adds a plugin to the registry, replacing any plugin of the same name."""
+    REGISTRY[spec.name] = spec
+    return spec
+
+
+for _spec in (
+    PluginSpec('cpu_monitor', 'plugins.cpu_monitor_plugin', 'CpuMonitorPlugin'),
+    PluginSpec('memory_monitor', 'plugins.memory_monitor_plugin', 'MemoryMonitorPlugin'),
+    PluginSpec('disk_monitor', 'plugins.disk_monitor_plugin', 'DiskMonitorPlugin'),
+    PluginSpec('cpu_temp', 'plugins.cpu_temp_plugin', 'CpuTempPlugin'),
+    PluginSpec('fan_pwm', 'plugins.fan_pwm_plugin', 'FanPwmPlugin'),
+    PluginSpec('throttle_monitor', 'plugins.throttle_monitor_plugin', 'ThrottleMonitorPlugin'),
+    PluginSpec('fan_control', 'plugins.fan_control_plugin', 'FanControlPlugin',
+               requires=('cpu_temp', 'cpu_monitor'), resources=('expansion',)),
+    PluginSpec('led_control', 'plugins.led_control_plugin', 'LedControlPlugin',
+               requires=('cpu_monitor',), resources=('expansion', 'compositor')),
+    PluginSpec('security_status', 'plugins.security_status_plugin', 'SecurityStatusPlugin',
+               requires=('led_control',), resources=('expansion', 'plugin:led_control', 'compositor')),
+    PluginSpec('oled_display', 'plugins.oled_display_plugin', 'OledDisplayPlugin',
+               requires=('cpu_monitor', 'memory_monitor', 'disk_monitor', 'cpu_temp'), resources=('oled',)),
+):
+    register(_spec)
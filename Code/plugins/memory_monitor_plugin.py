@@ -1,11 +1,14 @@
-import psutil
 from plugins.base_plugin import BasePlugin
+from sampler import get_sampler
 
 class MemoryMonitorPlugin(BasePlugin):
+    period = 2.0
+    metrics = ('memory_usage',)
+    produces = ('memory_usage',)
+
     def __init__(self):
         super().__init__()
         self.memory_usage = 0
 
     def update(self, pi_monitor=None):
-        memory = psutil.virtual_memory()
-        self.memory_usage = memory.percent
+        self.memory_usage = get_sampler(pi_monitor).snapshot().memory_usage
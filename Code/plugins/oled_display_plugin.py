@@ -1,56 +1,124 @@
+import time
 from plugins.base_plugin import BasePlugin
 
+ROTATION_DUE = 0.9  # Fraction of the period after which the next run shows the next screen
+
 class OledDisplayPlugin(BasePlugin):
+    period = 3.0  # Each screen stays up for 3 seconds
+    consumes = ('cpu_usage', 'per_core_usage', 'cpu_breakdown', 'top_processes',
+                'memory_usage', 'disk_usage', 'cpu_temperature', 'security_status', 'throttle_state')
+
     def __init__(self, oled):
         super().__init__()
         self.oled = oled
         self.font_size = 12
-        self.oled_counter = 0
-        self.oled_screen = 0
+        self.oled_screen = 0            # Screen shown at the next rotation
+        self.oled.preload_fonts([self.font_size])
+        self._last_lines = None  # Lines currently on the display
+        self._shown_screen = None       # Screen shown since the last rotation
+        self._rotated_at = None         # time.monotonic() of the last rotation
+
+    def export_state(self):
+        return {'oled_screen': self.oled_screen, 'last_lines': self._last_lines,
+                'shown_screen': self._shown_screen, 'rotated_at': self._rotated_at}
+
+    def import_state(self, state):
+        # The display keeps its screen and is not redrawn if nothing changed
+        if state:
+            self.oled_screen = state['oled_screen']
+            self._last_lines = state['last_lines']
+            self._shown_screen = state.get('shown_screen')
+            self._rotated_at = state.get('rotated_at')
 
     def update(self, pi_monitor):
-        if self.oled_counter % 3 == 0:
-            self.oled.clear()
+        # Check if security mode is active - if so, show security screen
+        security_plugin = pi_monitor.plugins.get('security_status')
+        security_active = (
+            security_plugin and
+            security_plugin.current_mode != 'idle'
+        )
 
-            # Check if security mode is active - if so, show security screen
-            security_plugin = pi_monitor.plugins.get('security_status')
-            security_active = (
-                security_plugin and
-                security_plugin.current_mode != 'idle'
-            )
-
-            if security_active:
-                # Security screen takes over when active
-                self._draw_security_screen(pi_monitor, security_plugin)
-            elif self.oled_screen == 0:
-                # Screen 1: System Parameters
-                self.oled.draw_text("PI Parameters", position=(0, 0), font_size=self.font_size)
-                self.oled.draw_text(pi_monitor._format_strings['cpu'].format(pi_monitor.plugins['cpu_monitor'].cpu_usage), position=(0, 16), font_size=self.font_size)
-                self.oled.draw_text(pi_monitor._format_strings['mem'].format(pi_monitor.plugins['memory_monitor'].memory_usage), position=(0, 32), font_size=self.font_size)
-                self.oled.draw_text(pi_monitor._format_strings['disk'].format(pi_monitor.plugins['disk_monitor'].disk_usage), position=(0, 48), font_size=self.font_size)
-            elif self.oled_screen == 1:
-                # Screen 2: Date/Time/LED
-                self.oled.draw_text(pi_monitor._format_strings['date'].format(pi_monitor.get_raspberry_date()), position=(0, 0), font_size=self.font_size)
-                self.oled.draw_text(pi_monitor._format_strings['week'].format(pi_monitor.get_raspberry_weekday()), position=(0, 16), font_size=self.font_size)
-                self.oled.draw_text(pi_monitor._format_strings['time'].format(pi_monitor.get_raspberry_time()), position=(0, 32), font_size=self.font_size)
-                self.oled.draw_text(pi_monitor._format_strings['led_mode'].format(pi_monitor.get_computer_led_mode()), position=(0, 48), font_size=self.font_size)
-            else:  # oled_screen == 2
-                # Screen 3: Temperature/Fan
-                self.oled.draw_text(pi_monitor._format_strings['pi_temp'].format(pi_monitor.plugins['cpu_temp'].cpu_temperature), position=(0, 0), font_size=self.font_size)
-                self.oled.draw_text(pi_monitor._format_strings['pc_temp'].format(pi_monitor.get_computer_temperature()), position=(0, 16), font_size=self.font_size)
-                self.oled.draw_text(pi_monitor._format_strings['fan_mode'].format(pi_monitor.get_computer_fan_mode()), position=(0, 32), font_size=self.font_size)
-                self.oled.draw_text(pi_monitor._format_strings['fan_duty'].format(int(float(pi_monitor.get_computer_fan_duty()/255.0)*100)), position=(0, 48), font_size=self.font_size)
+        # The CPU core screen joins the rotation once per-core readings exist
+        cpu_monitor = pi_monitor.plugins.get('cpu_monitor')
+        cores = getattr(cpu_monitor, 'per_core_usage', ())
+        screens = 4 if isinstance(cores, tuple) and cores else 3
 
+        # Runs requested between scheduled ones (e.g. on a security status change)
+        # refresh the screen that is up instead of skipping to the next one
+        now = time.monotonic()
+        rotate = (self._rotated_at is None or self._shown_screen is None
+                  or now - self._rotated_at >= self.period * ROTATION_DUE)
+        screen = self.oled_screen if rotate else self._shown_screen
+        if screen >= screens:
+            screen = 0
+
+        if security_active:
+            # Security screen takes over when active
+            lines = self._security_screen_lines(pi_monitor, security_plugin)
+        elif screen == 0:
+            # Screen 1: System Parameters
+            lines = [
+                (self._throttle_alert(pi_monitor) or "PI Parameters", (0, 0)),
+                (pi_monitor._format_strings['cpu'].format(pi_monitor.plugins['cpu_monitor'].cpu_usage), (0, 16)),
+                (pi_monitor._format_strings['mem'].format(pi_monitor.plugins['memory_monitor'].memory_usage), (0, 32)),
+                (pi_monitor._format_strings['disk'].format(pi_monitor.plugins['disk_monitor'].disk_usage), (0, 48)),
+            ]
+        elif screen == 1:
+            # Screen 2: Date/Time/LED
+            lines = [
+                (pi_monitor._format_strings['date'].format(pi_monitor.get_raspberry_date()), (0, 0)),
+                (pi_monitor._format_strings['week'].format(pi_monitor.get_raspberry_weekday()), (0, 16)),
+                (pi_monitor._format_strings['time'].format(pi_monitor.get_raspberry_time()), (0, 32)),
+                (pi_monitor._format_strings['led_mode'].format(pi_monitor.get_computer_led_mode()), (0, 48)),
+            ]
+        elif screen == 3:
+            # Screen 4: Per-core load, CPU time breakdown and busiest processes
+            lines = self._cpu_screen_lines(pi_monitor, cpu_monitor)
+        else:  # screen == 2
+            # Screen 3: Temperature/Fan
+            lines = [
+                (pi_monitor._format_strings['pi_temp'].format(pi_monitor.plugins['cpu_temp'].cpu_temperature), (0, 0)),
+                (pi_monitor._format_strings['pc_temp'].format(pi_monitor.get_computer_temperature()), (0, 16)),
+                (pi_monitor._format_strings['fan_mode'].format(pi_monitor.get_computer_fan_mode()), (0, 32)),
+                (pi_monitor._format_strings['fan_duty'].format(int(float(pi_monitor.get_computer_fan_duty()/255.0)*100)), (0, 48)),
+            ]
+
+        # Only redraw when the text differs from what is already shown
+        if lines != self._last_lines:
+            self.oled.clear()
+            for text, position in lines:
+                self.oled.draw_text(text, position=position, font_size=self.font_size)
             self.oled.show()
+            self._last_lines = lines
+
+        # Only rotate screens when not in security mode
+        if rotate and not security_active:
+            self._shown_screen = screen
+            self._rotated_at = now
+            self.oled_screen = (screen + 1) % screens
 
-            # Only rotate screens when not in security mode
-            if not security_active:
-                self.oled_screen = (self.oled_screen + 1) % 3
+    def _throttle_alert(self, pi_monitor):
+        """Title replacing the screen 1 header while the SoC is throttled or under-volted."""
+        throttle_monitor = pi_monitor.plugins.get('throttle_monitor')
+        if getattr(throttle_monitor, 'under_voltage', False) is True:
+            return "! UNDER-VOLTAGE"
+        if getattr(throttle_monitor, 'thermal_throttled', False) is True:
+            return f"! THROTTLED {throttle_monitor.cpu_freq}MHz"
+        return None
 
-        self.oled_counter += 1
+    def _cpu_screen_lines(self, pi_monitor, cpu_monitor):
+        """Build the CPU core screen."""
+        formats = pi_monitor._format_strings
+        lines = [
+            (formats['cores'].format(' '.join(str(int(usage)) for usage in cpu_monitor.per_core_usage)), (0, 0)),
+            (formats['cpu_wait'].format(int(cpu_monitor.iowait), int(cpu_monitor.irq), int(cpu_monitor.steal)), (0, 16)),
+        ]
+        for row, (pid, name, percent) in enumerate(cpu_monitor.top_processes[:2]):
+            lines.append((formats['process'].format(name[:10], int(percent)), (0, 32 + 16 * row)))
+        return lines
 
-    def _draw_security_screen(self, pi_monitor, security_plugin):
-        """Draw security operation status screen."""
+    def _security_screen_lines(self, pi_monitor, security_plugin):
+        """Build the security operation status screen."""
         mode = security_plugin.current_mode.upper()
         phase = security_plugin.current_phase or mode
         target = security_plugin.current_target or ''
@@ -58,29 +126,27 @@ class OledDisplayPlugin(BasePlugin):
         progress = security_plugin.current_progress
 
         # Line 1: Mode/Phase header
-        header = f"[{phase[:18]}]"
-        self.oled.draw_text(header, position=(0, 0), font_size=self.font_size)
+        lines = [(f"[{phase[:18]}]", (0, 0))]
 
         # Line 2: Target
         if target:
-            target_line = f"TGT: {target[:16]}"
-            self.oled.draw_text(target_line, position=(0, 16), font_size=self.font_size)
+            lines.append((f"TGT: {target[:16]}", (0, 16)))
 
         # Line 3: Progress bar (if available)
         if progress is not None:
             bar = security_plugin.get_progress_bar(14)
             pct = int((progress / (security_plugin.progress_max or 100)) * 100)
-            progress_line = f"{bar} {pct}%"
-            self.oled.draw_text(progress_line, position=(0, 32), font_size=self.font_size)
+            lines.append((f"{bar} {pct}%", (0, 32)))
         elif message:
             # Show message on line 3 if no progress
-            self.oled.draw_text(message[:20], position=(0, 32), font_size=self.font_size)
+            lines.append((message[:20], (0, 32)))
 
         # Line 4: Message or details
         if progress is not None and message:
-            self.oled.draw_text(message[:20], position=(0, 48), font_size=self.font_size)
+            lines.append((message[:20], (0, 48)))
         else:
             # Show channel info for wifi scanning
             details = security_plugin.details
             if 'channel' in details:
-                self.oled.draw_text(f"CH: {details['channel']}", position=(0, 48), font_size=self.font_size)
+                lines.append((f"CH: {details['channel']}", (0, 48)))
+        return lines
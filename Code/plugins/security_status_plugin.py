@@ -1,8 +1,9 @@
 """
 security_status_plugin.py
 
-Plugin that reads security tool status from /tmp/cyberdeck_status.json
-and controls LEDs accordingly. Also provides data for OLED display.
+Plugin that receives security tool status over the status channel socket
+(/tmp/cyberdeck_status.sock) or from /tmp/cyberdeck_status.json and controls
+LEDs accordingly. Also provides data for OLED display.
 
 Works with Security_Research/13-Utils/hardware_bridge.py
 
@@ -23,15 +24,22 @@ import time
 from pathlib import Path
 from plugins.base_plugin import BasePlugin
 from logger import setup_logger
+from file_watcher import FileWatcher
+from led_effects import LedEffect, ProgressBar, FRAME_RATE, breathing_table, square_table, solid
+from led_compositor import LedCompositor
+import status_channel
 
 
-STATUS_FILE = Path('/tmp/cyberdeck_status.json')
+STATUS_FILE = Path(status_channel.STATUS_FILE)
 
 
 class SecurityStatusPlugin(BasePlugin):
     """
     Reads security operation status and controls LEDs based on mode.
     """
+    # Runs at the LED animation rate so it can override LedControlPlugin
+    period = 1.0 / FRAME_RATE
+    produces = ('security_status',)
 
     # LED color definitions (R, G, B)
     MODE_COLORS = {
@@ -45,12 +53,27 @@ class SecurityStatusPlugin(BasePlugin):
         'safe': (0, 255, 0),            # Green
     }
 
-    def __init__(self, expansion, led_control_plugin=None):
+    # Precomputed animations per mode (color, brightness curve, period)
+    MODE_EFFECTS = {
+        'wifi_scan': LedEffect(solid(*MODE_COLORS['wifi_scan']), 1.0, breathing_table(0.5), 2 * math.pi / 2),    # Slow breathing
+        'monitor': LedEffect(solid(*MODE_COLORS['monitor']), 1.0, breathing_table(0.4), 2 * math.pi / 3),        # Pulse
+        'recon': LedEffect(solid(*MODE_COLORS['recon']), 1.0, breathing_table(0.3), 2 * math.pi / 1.5),          # Breathing
+        'scanning': LedEffect(solid(*MODE_COLORS['scanning']), 1.0, breathing_table(0.4), 2 * math.pi / 2.5),    # Pulse
+        'exploit': LedEffect(solid(*MODE_COLORS['exploit']), 1.0, breathing_table(), 2 * math.pi / 5),           # Strobe
+        'alert': LedEffect(solid(*MODE_COLORS['alert']), 1.0, square_table(1.0, 0.2), 0.5),                     # Fast flash
+        'safe': LedEffect(solid(*MODE_COLORS['safe']), 1.0, breathing_table(0.8), 2 * math.pi / 0.5),            # Slight breathing
+    }
+
+    def __init__(self, expansion, led_control_plugin=None, compositor=None):
         super().__init__()
         self.expansion = expansion
         self.led_control_plugin = led_control_plugin
+        # Modes are drawn on the status/alert layers above LedControlPlugin's base layer
+        if compositor is None and led_control_plugin is not None:
+            compositor = led_control_plugin.compositor
+        self.owns_compositor = compositor is None
+        self.compositor = compositor if compositor is not None else LedCompositor(expansion)
         self.logger = setup_logger('security_status_plugin')
-        self.start_time = time.time()
 
         # Current status cache
         self.status = {
@@ -66,107 +89,113 @@ class SecurityStatusPlugin(BasePlugin):
 
         # Track mode changes
         self._last_mode = 'idle'
-        self._mode_start_time = time.time()
+        self._led_state = ('idle', False)  # (mode, progress shown on the LEDs)
+        self._mode_start_time = time.monotonic()
+
+        # Only re-read the status file after it was written
+        self._watcher = FileWatcher(STATUS_FILE)
+
+        # Binary status records pushed by producers; the file stays as a fallback
+        try:
+            self.channel = status_channel.StatusChannel(status_channel.SOCKET_PATH)
+        except OSError as e:
+            self.logger.warning('Status channel unavailable, using status file only: %s', e)
+            self.channel = None
 
     def _read_status_file(self):
-        """Read status from shared file."""
+        """Read status from shared file. Returns True if the status changed."""
+        if not self._watcher.changed():
+            return False
         try:
-            if STATUS_FILE.exists():
-                with open(STATUS_FILE, 'r') as f:
-                    data = json.load(f)
-                    # Validate and update
-                    if isinstance(data, dict):
-                        self.status.update(data)
-                        return True
+            with open(STATUS_FILE, 'r') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return False
         except (json.JSONDecodeError, IOError) as e:
-            self.logger.debug(f'Error reading status file: {e}')
-        return False
+            # Usually a partial write; the watcher reports the completed write
+            self.logger.debug('Error reading status file: %s', e)
+            return False
+        # Validate and update
+        if not isinstance(data, dict):
+            return False
+        previous = dict(self.status)
+        self.status.update(data)
+        return self.status != previous
+
+    def _read_status_channel(self):
+        """Apply every record queued on the status channel. Returns True if the status changed."""
+        if self.channel is None:
+            return False
+        records = self.channel.drain()
+        if not records:
+            return False
+        previous = dict(self.status)
+        for record in records:
+            record.pop('seq', None)
+            self.status.update(record)
+        return self.status != previous
 
     def update(self, pi_monitor):
-        """Called every loop iteration (~1 second)."""
-        # Read latest status
-        self._read_status_file()
+        """Called every `period` seconds by the scheduler."""
+        # Read latest status (both sources are always drained)
+        if self._read_status_file() | self._read_status_channel():
+            # Show the new status now instead of at the display's next period
+            pi_monitor.request_update('oled_display')
 
         mode = self.status.get('mode', 'idle')
 
         # Detect mode change
         if mode != self._last_mode:
-            self._mode_start_time = time.time()
+            self._mode_start_time = time.monotonic()
             self._last_mode = mode
-            self.logger.info(f'Security mode changed to: {mode}')
-
-            # If switching to idle, restore normal LED behavior
-            if mode == 'idle' and self.led_control_plugin:
-                self.led_control_plugin.set_mode('rainbow_fade')
-                return
-
-        # Handle non-idle modes (take over LED control)
-        if mode != 'idle':
-            self._update_leds(mode)
-
-    def _update_leds(self, mode: str):
-        """Update LED colors based on security mode."""
-        color = self.MODE_COLORS.get(mode)
-        if not color:
+            self.logger.info('Security mode changed to: %s', mode)
+
+        # Progress bar appears on the LEDs while a progress value is reported
+        led_state = (mode, self.current_progress is not None and mode != 'alert')
+        if led_state != self._led_state:
+            self._led_state = led_state
+            self._update_leds(*led_state)
+
+        if self.owns_compositor:
+            self.compositor.render()
+
+    def export_state(self):
+        return {'status': dict(self.status), 'last_mode': self._last_mode,
+                'mode_start_time': self._mode_start_time}
+
+    def import_state(self, state):
+        # The LEDs are re-applied on the next update since _led_state starts idle
+        if state:
+            self.status.update(state['status'])
+            self._last_mode = state['last_mode']
+            self._mode_start_time = state['mode_start_time']
+
+    def close(self):
+        """Closes the status channel so a reloaded instance can bind it."""
+        if self.channel is not None:
+            self.channel.close()
+            self.channel = None
+        self._watcher.close()
+
+    def _update_leds(self, mode: str, show_progress: bool = False):
+        """Show the security mode's effect above the normal LED mode (idle reveals it again)."""
+        effect = self.MODE_EFFECTS.get(mode)
+        layer = 'alert' if mode == 'alert' else 'status'
+        self.compositor.clear_layer('alert' if layer == 'status' else 'status')
+        if effect is None:
+            self.compositor.clear_layer(layer)
             return
-
-        r, g, b = color
-        elapsed = time.time() - self._mode_start_time
-
-        # Apply effects based on mode
-        if mode == 'wifi_scan':
-            # Red with slow breathing
-            brightness = (math.sin(elapsed * 2) + 1) / 2 * 0.5 + 0.5  # 50-100%
-            r = int(r * brightness)
-            g = int(g * brightness)
-            b = int(b * brightness)
-
-        elif mode == 'monitor':
-            # Purple pulse
-            brightness = (math.sin(elapsed * 3) + 1) / 2 * 0.6 + 0.4
-            r = int(r * brightness)
-            g = int(g * brightness)
-            b = int(b * brightness)
-
-        elif mode == 'recon':
-            # Yellow breathing
-            brightness = (math.sin(elapsed * 1.5) + 1) / 2 * 0.7 + 0.3
-            r = int(r * brightness)
-            g = int(g * brightness)
-            b = int(b * brightness)
-
-        elif mode == 'scanning':
-            # Blue pulse
-            brightness = (math.sin(elapsed * 2.5) + 1) / 2 * 0.6 + 0.4
-            r = int(r * brightness)
-            g = int(g * brightness)
-            b = int(b * brightness)
-
-        elif mode == 'exploit':
-            # Orange strobe
-            brightness = (math.sin(elapsed * 5) + 1) / 2
-            r = int(r * brightness)
-            g = int(g * brightness)
-            b = int(b * brightness)
-
-        elif mode == 'alert':
-            # Fast red flash
-            brightness = 1.0 if int(elapsed * 4) % 2 == 0 else 0.2
-            r = int(r * brightness)
-            g = int(g * brightness)
-            b = int(b * brightness)
-
-        elif mode == 'safe':
-            # Solid green (slight breathing)
-            brightness = (math.sin(elapsed * 0.5) + 1) / 2 * 0.2 + 0.8
-            r = int(r * brightness)
-            g = int(g * brightness)
-            b = int(b * brightness)
-
-        # Set the LED color
+        if show_progress:
+            effect = ProgressBar(effect, self.progress_fraction)
         self.expansion.set_led_mode(1)  # Manual RGB control
-        self.expansion.set_all_led_color(r, g, b)
-        self.logger.debug(f'LED: mode={mode}, rgb=({r},{g},{b})')
+        self.compositor.set_layer(layer, effect)
+
+    def progress_fraction(self):
+        """Current progress as a fraction of progress_max, or None."""
+        progress = self.current_progress
+        if progress is None:
+            return None
+        return progress / (self.progress_max or 100)
 
     # Properties for OLED display access
     @property
@@ -0,0 +1,212 @@
+"""
+throttle_monitor_plugin.py
+
+Reports whether the SoC is actually being slowed down, not just how warm it
+is: the current clock of every cpufreq policy, the temperature of every
+thermal zone and the firmware's throttle and under-voltage state.
+
+Sources (discovered once, then kept open through sampler.Source):
+    cpufreq/policy*/scaling_cur_freq  → current clock of each policy
+    cpufreq/policy*/scaling_max_freq  → lowered below cpuinfo_max_freq while
+                                        the thermal governor caps the clock;
+                                        only read without get_throttled
+    thermal_zone*/temp                → every thermal zone, named by its type
+    soc:firmware/get_throttled        → Raspberry Pi firmware flags
+    hwmon rpi_volt/in0_lcrit_alarm    → under-voltage where get_throttled
+                                        is not available
+
+The firmware also sets the capped and throttled bits while the supply voltage
+is low, so those count as thermal throttling only with under-voltage clear
+and a thermal zone at `throttle_temperature` or above; the soft temperature
+limit always does.
+
+Every change of a throttle condition is appended to a bounded event log as
+(timestamp, condition, active), so the history since start-up stays small.
+"""
+
+import glob
+import os
+import time
+from collections import deque, namedtuple
+from plugins.base_plugin import BasePlugin
+from logger import setup_logger
+from sampler import Source
+
+
+CPUFREQ_BASE = '/sys/devices/system/cpu/cpufreq'
+THERMAL_BASE = '/sys/class/thermal'
+HWMON_CLASS = '/sys/class/hwmon'
+THROTTLED_PATTERNS = (
+    '/sys/devices/platform/soc/soc:firmware/get_throttled',
+    '/sys/devices/platform/soc@*/soc@*:firmware/get_throttled',  # Pi 5
+)
+EVENT_LOG_SIZE = 64
+THROTTLE_TEMPERATURE = 80.0  # C at which the firmware starts capping the ARM clock
+
+# get_throttled bits of the conditions active right now
+UNDER_VOLTAGE = 0x1
+FREQ_CAPPED = 0x2
+THROTTLED = 0x4
+SOFT_TEMP_LIMIT = 0x8
+
+CONDITIONS = (
+    ('under_voltage', UNDER_VOLTAGE),
+    ('freq_capped', FREQ_CAPPED),
+    ('throttled', THROTTLED),
+    ('soft_temp_limit', SOFT_TEMP_LIMIT),
+)
+
+ThrottleEvent = namedtuple('ThrottleEvent', ['time', 'condition', 'active'])
+
+
+def _read_int(source, base=10):
+    try:
+        return int(bytes(source.read()).strip(), base)
+    except (OSError, ValueError):
+        return None
+
+
+def _read_text(path):
+    try:
+        with open(path, 'r') as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+class ThrottleMonitorPlugin(BasePlugin):
+    """
+    Samples CPU clocks, thermal zones and throttle flags and logs throttle transitions.
+    """
+    metrics = ('cpu_freq', 'max_zone_temperature', 'throttle_flags')
+    produces = ('cpu_freq', 'thermal_zones', 'throttle_state', 'throttle_events')
+    critical = True  # The fan controller relies on its throttle state
+
+    def __init__(self, cpufreq_base=CPUFREQ_BASE, thermal_base=THERMAL_BASE,
+                 throttled_patterns=THROTTLED_PATTERNS, hwmon_class=HWMON_CLASS,
+                 throttle_temperature=THROTTLE_TEMPERATURE):
+        super().__init__()
+        self.logger = setup_logger('throttle_monitor_plugin')
+        self.throttle_temperature = throttle_temperature
+
+        self.clocks = {}              # policy -> current clock (MHz)
+        self.cpu_freq = 0             # Highest current clock (MHz)
+        self.zone_temperatures = {}   # zone type -> temperature (C)
+        self.max_zone_temperature = 0.0
+        self.throttle_flags = 0       # Active conditions as get_throttled bits
+        self.events = deque(maxlen=EVENT_LOG_SIZE)
+
+        # Per policy: (name, scaling_cur_freq, scaling_max_freq, cpuinfo_max_freq in kHz)
+        self._policies = []
+        for path in sorted(glob.glob(os.path.join(cpufreq_base, 'policy*'))):
+            hardware_max = _read_text(os.path.join(path, 'cpuinfo_max_freq'))
+            self._policies.append((os.path.basename(path),
+                                   Source(os.path.join(path, 'scaling_cur_freq'), 64),
+                                   Source(os.path.join(path, 'scaling_max_freq'), 64),
+                                   int(hardware_max) if hardware_max and hardware_max.isdigit() else None))
+
+        self._zones = []
+        for path in sorted(glob.glob(os.path.join(thermal_base, 'thermal_zone*'))):
+            name = _read_text(os.path.join(path, 'type')) or os.path.basename(path)
+            self._zones.append((name, Source(os.path.join(path, 'temp'), 64)))
+
+        self._throttled = None
+        for pattern in throttled_patterns:
+            matches = glob.glob(pattern)
+            if matches:
+                self._throttled = Source(matches[0], 64)
+                break
+
+        self._volt_alarm = None
+        if self._throttled is None:
+            for path in sorted(glob.glob(os.path.join(hwmon_class, 'hwmon*'))):
+                if _read_text(os.path.join(path, 'name')) == 'rpi_volt':
+                    self._volt_alarm = Source(os.path.join(path, 'in0_lcrit_alarm'), 64)
+                    break
+
+    @property
+    def under_voltage(self):
+        """True while the supply voltage is too low."""
+        return bool(self.throttle_flags & UNDER_VOLTAGE)
+
+    @property
+    def thermal_throttled(self):
+        """True while the clock is reduced for thermal reasons. Under-voltage alone does not count."""
+        if self.throttle_flags & SOFT_TEMP_LIMIT:
+            return True
+        return (bool(self.throttle_flags & (FREQ_CAPPED | THROTTLED))
+                and not self.throttle_flags & UNDER_VOLTAGE
+                and self.max_zone_temperature >= self.throttle_temperature)
+
+    def export_state(self):
+        return {'throttle_flags': self.throttle_flags, 'events': list(self.events)}
+
+    def import_state(self, state):
+        # Keeps the event log and does not report the active conditions again
+        if state:
+            self.throttle_flags = state['throttle_flags']
+            self.events.extend(state['events'])
+
+    def close(self):
+        for _, current, maximum, _ in self._policies:
+            current.close()
+            maximum.close()
+        for _, source in self._zones:
+            source.close()
+        for source in (self._throttled, self._volt_alarm):
+            if source is not None:
+                source.close()
+
+    def update(self, pi_monitor=None):
+        flags = 0
+        clocks = {}
+        for name, current, maximum, hardware_max in self._policies:
+            freq = _read_int(current)
+            if freq is not None:
+                clocks[name] = freq // 1000
+            if self._throttled is not None:
+                continue  # The firmware flags are authoritative; a user cap is not throttling
+            # Without them, a scaling_max_freq below the hardware maximum is
+            # taken as the cpufreq cooling device throttling
+            cap = _read_int(maximum)
+            if cap is not None and hardware_max is not None and cap < hardware_max:
+                flags |= FREQ_CAPPED
+        self.clocks = clocks
+        self.cpu_freq = max(clocks.values(), default=0)
+
+        temperatures = {}
+        for name, source in self._zones:
+            millidegrees = _read_int(source)
+            if millidegrees is not None:
+                temperatures[name] = millidegrees / 1000.0
+        self.zone_temperatures = temperatures
+        self.max_zone_temperature = max(temperatures.values(), default=0.0)
+
+        if self._throttled is not None:
+            firmware = _read_int(self._throttled, 16)
+            if firmware is not None:
+                flags |= firmware & (UNDER_VOLTAGE | FREQ_CAPPED | THROTTLED | SOFT_TEMP_LIMIT)
+        elif self._volt_alarm is not None and _read_int(self._volt_alarm):
+            flags |= UNDER_VOLTAGE
+
+        self._record(flags)
+
+    def _record(self, flags):
+        changed = flags ^ self.throttle_flags
+        self.throttle_flags = flags
+        if not changed:
+            return
+        now = time.time()
+        for condition, bit in CONDITIONS:
+            if changed & bit:
+                active = bool(flags & bit)
+                self.events.append(ThrottleEvent(now, condition, active))
+                if active:
+                    self.logger.warning("SoC %s (clock %d MHz, %.1fC)",
+                                        condition.replace('_', ' '), self.cpu_freq, self.max_zone_temperature)
+                else:
+                    self.logger.info("SoC %s cleared", condition.replace('_', ' '))
+
+    def recent_events(self, count=5):
+        """Returns the last `count` ThrottleEvents, newest first."""
+        return list(self.events)[:-count - 1:-1]
@@ -0,0 +1,210 @@
+"""
+Profiler Module
+
+Measures every plugin update: wall time, CPU time of the thread that ran it
+and overruns, i.e. updates that took longer than the plugin's period. Times
+go into fixed-bucket histograms, so recording is a bisect and an increment
+no matter how long the monitor runs.
+
+A watchdog demotes plugins that keep overrunning: a demoted plugin only runs
+on every second, fourth, ... due tick (up to MAX_SCALE) and the other ticks
+are skipped. It is promoted again after a run of on-time updates.
+Safety-critical plugins (fan control, throttle monitoring) are exempt: their
+overruns are counted but they always run, since a slow bus is most likely
+when the device is hot.
+"""
+import bisect
+import time
+
+# Upper bucket edges in seconds; the last bucket holds everything slower
+BUCKET_EDGES = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class Histogram:
+    """Counts durations into the BUCKET_EDGES buckets and keeps their sum and maximum."""
+    __slots__ = ['counts', 'count', 'total', 'max']
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_EDGES) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.counts[bisect.bisect_left(BUCKET_EDGES, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q):
+        """Returns the upper edge of the bucket holding the q-th percentile (0-100), or None if empty."""
+        if not self.count:
+            return None
+        rank = q / 100.0 * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return BUCKET_EDGES[i] if i < len(BUCKET_EDGES) else self.max
+        return self.max
+
+    def stats(self):
+        """Returns {'count', 'mean', 'max', 'p50', 'p95'} in seconds."""
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else 0.0,
+            'max': self.max,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+        }
+
+
+class PluginProfile:
+    """Measurements and watchdog state of one plugin."""
+    __slots__ = ['wall', 'cpu', 'runs', 'overruns', 'skipped', 'scale',
+                 '_late', '_on_time', '_tick']
+
+    def __init__(self):
+        self.wall = Histogram()
+        self.cpu = Histogram()
+        self.runs = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.scale = 1      # The plugin runs on every scale-th due tick
+        self._late = 0      # Consecutive overruns
+        self._on_time = 0   # Consecutive updates within the period
+        self._tick = 0
+
+
+class Profiler:
+    """
+    Collects PluginProfiles and applies the overrun watchdog.
+
+    Parameters
+    ----------
+    overrun_limit : int, optional
+        Consecutive overruns after which a plugin is demoted (default is 3).
+    recover_after : int, optional
+        Consecutive on-time updates after which a demoted plugin is promoted
+        (default is 10).
+    logger : logging.Logger, optional
+        Receives a warning on every demotion.
+    exempt : iterable of str, optional
+        Plugins the watchdog never demotes.
+    """
+    MAX_SCALE = 8
+
+    def __init__(self, overrun_limit=3, recover_after=10, logger=None, exempt=()):
+        self.overrun_limit = overrun_limit
+        self.recover_after = recover_after
+        self.logger = logger
+        self.exempt = set(exempt)
+        self.profiles = {}
+
+    def profile(self, name):
+        """Returns the profile of plugin `name`, creating it on first use."""
+        profile = self.profiles.get(name)
+        if profile is None:
+            profile = self.profiles.setdefault(name, PluginProfile())
+        return profile
+
+    def should_run(self, name):
+        """Tells whether a due plugin runs on this tick; counts the tick as skipped otherwise."""
+        profile = self.profile(name)
+        profile._tick += 1
+        if profile._tick % profile.scale:
+            profile.skipped += 1
+            return False
+        return True
+
+    def measure(self, name, period, func):
+        """
+        Runs `func` unless the watchdog skips this tick, and records its times.
+
+        Returns True if `func` ran. Exceptions from `func` propagate after the
+        run was recorded.
+        """
+        if not self.should_run(name):
+            return False
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        try:
+            func()
+        finally:
+            self.record(name, period, time.perf_counter() - wall, time.thread_time() - cpu)
+        return True
+
+    def record(self, name, period, wall, cpu=None):
+        """Adds one update's wall time (and CPU time, if known) and applies the watchdog."""
+        profile = self.profile(name)
+        profile.runs += 1
+        profile.wall.add(wall)
+        if cpu is not None:
+            profile.cpu.add(cpu)
+
+        if wall <= period:
+            profile._late = 0
+            profile._on_time += 1
+            if profile.scale > 1 and profile._on_time >= self.recover_after:
+                profile.scale //= 2
+                profile._on_time = 0
+                profile._tick = 0
+            return
+
+        profile.overruns += 1
+        profile._on_time = 0
+        profile._late += 1
+        if name in self.exempt:
+            return
+        if profile._late >= self.overrun_limit and profile.scale < self.MAX_SCALE:
+            profile.scale *= 2
+            profile._late = 0
+            profile._tick = 0  # The next due tick is the first one skipped
+            if self.logger is not None:
+                self.logger.warning("Plugin %s overran its %.3fs period %s times in a row (%.1fms), "
+                                    "now running every %s ticks",
+                                    name, period, self.overrun_limit, wall * 1000, profile.scale)
+
+    def stats(self, name=None):
+        """
+        Returns the measurements of one plugin, or of every plugin by name.
+
+        Each entry is {'runs', 'overruns', 'skipped', 'scale', 'wall', 'cpu'},
+        where 'wall' and 'cpu' are Histogram.stats() dicts in seconds.
+        """
+        if name is not None:
+            profile = self.profiles.get(name)
+            if profile is None:
+                return None
+            return {
+                'runs': profile.runs,
+                'overruns': profile.overruns,
+                'skipped': profile.skipped,
+                'scale': profile.scale,
+                'wall': profile.wall.stats(),
+                'cpu': profile.cpu.stats(),
+            }
+        return {name: self.stats(name) for name in list(self.profiles)}
+
+    def slowest(self, count=3):
+        """Returns the names of the `count` plugins with the highest mean wall time."""
+        profiles = list(self.profiles.items())
+        profiles.sort(key=lambda item: item[1].wall.total / item[1].wall.count if item[1].wall.count else 0.0,
+                      reverse=True)
+        return [name for name, _ in profiles[:count]]
+
+    def summary(self):
+        """Returns a one-line summary: mean/p95 wall time per plugin, slowest first, with overruns and demotions."""
+        parts = []
+        for name in self.slowest(len(self.profiles)):
+            profile = self.profiles[name]
+            wall = profile.wall.stats()
+            part = f"{name} {wall['mean'] * 1000:.1f}/{(wall['p95'] or 0.0) * 1000:.1f}ms"
+            if profile.overruns:
+                part += f" ({profile.overruns} overruns)"
+            if profile.scale > 1:
+                part += f" [every {profile.scale} ticks]"
+            parts.append(part)
+        return ', '.join(parts) if parts else 'no plugin updates'
@@ -0,0 +1,510 @@
+"""
+Sampler Module
+
+Reads every system value the monitor plugins need in one pass and publishes
+them as a single snapshot the plugins share.
+
+/proc/stat, /proc/meminfo, the SoC thermal zone and the cooling fan's hwmon
+pwm1 are opened once and re-read with os.preadv() at offset 0 into
+preallocated buffers. A sample therefore costs one read syscall per file
+instead of an open/read/close (or several psutil calls) per plugin, and only
+the fields the plugins use are parsed. File systems are queried with
+os.statvfs(), cached for STATVFS_TTL seconds since their usage changes slowly.
+/proc/diskstats and /proc/mounts are kept open the same way and read on
+demand by the disk monitor, which turns two diskstats readings into I/O rates
+with io_rates().
+
+Plugins running within SAMPLE_MAX_AGE of each other get the same snapshot;
+concurrent plugins wait for the one sample in progress instead of taking
+their own.
+
+ProcessSampler finds the busiest processes. It walks /proc only every
+RESCAN_INTERVAL seconds; in between it re-reads the stat files of the
+processes that were busiest at the last walk, through descriptors it keeps
+open, so leaving it on permanently costs a handful of reads every few
+seconds.
+"""
+import os
+import re
+import threading
+import time
+
+PROC_STAT = '/proc/stat'
+PROC_MEMINFO = '/proc/meminfo'
+PROC_DISKSTATS = '/proc/diskstats'
+PROC_MOUNTS = '/proc/mounts'
+SYS_DEV_BLOCK = '/sys/dev/block'
+THERMAL_ZONE = '/sys/devices/virtual/thermal/thermal_zone0/temp'
+HWMON_BASE = '/sys/devices/platform/cooling_fan/hwmon/'
+
+SAMPLE_MAX_AGE = 0.25  # Seconds a snapshot is shared before it is re-sampled
+STATVFS_TTL = 60.0     # Seconds a file system's usage is cached
+PROCESS_INTERVAL = 5.0  # Seconds between two top process samples
+RESCAN_INTERVAL = 30.0  # Seconds between two walks of every process
+CLK_TCK = os.sysconf('SC_CLK_TCK')
+SECTOR_SIZE = 512  # /proc/diskstats counts 512-byte sectors whatever the device's sector size
+
+_OCTAL_ESCAPE = re.compile(rb'\\([0-7]{3})')
+
+
+class Source:
+    """
+    A file kept open and re-read from offset 0 into a reusable buffer.
+
+    The descriptor is reopened on the next read after an error, so a sensor
+    that disappears and comes back (e.g. a re-enumerated hwmon) recovers.
+    """
+    __slots__ = ['path', 'fd', 'buffer']
+
+    def __init__(self, path, size=4096):
+        self.path = path
+        self.fd = -1
+        self.buffer = bytearray(size)
+
+    def read(self):
+        """Returns the file's current contents as a memoryview into the buffer. Raises OSError."""
+        if self.fd < 0:
+            self.fd = os.open(self.path, os.O_RDONLY | os.O_CLOEXEC)
+        try:
+            while True:
+                n = os.preadv(self.fd, [self.buffer], 0)
+                if n < len(self.buffer):
+                    return memoryview(self.buffer)[:n]
+                self.buffer = bytearray(len(self.buffer) * 2)  # /proc/stat grows with the core count
+        except OSError:
+            self.close()
+            raise
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def parse_cpu_times(data):
+    """
+    Parses the cpu lines of /proc/stat.
+
+    Returns
+    -------
+    tuple
+        (aggregate, cores): the 'cpu' line's counters and a list with the
+        counters of every 'cpuN' line, each a tuple of ints in /proc/stat
+        column order (user, nice, system, idle, iowait, irq, softirq, steal, ...).
+    """
+    aggregate = ()
+    cores = []
+    for line in bytes(data).split(b'\n'):
+        if not line.startswith(b'cpu'):
+            break  # The cpu lines come first
+        fields = line.split()
+        times = tuple(map(int, fields[1:]))
+        if fields[0] == b'cpu':
+            aggregate = times
+        else:
+            cores.append(times)
+    return aggregate, cores
+
+
+def busy_percent(before, after):
+    """Share of time not spent idle or waiting for I/O between two /proc/stat counter tuples."""
+    # guest and guest_nice are already included in user and nice
+    total = sum(after[:8]) - sum(before[:8])
+    if total <= 0:
+        return 0.0
+    idle = (after[3] + after[4]) - (before[3] + before[4])
+    return round(100.0 * (total - idle) / total, 1)
+
+
+def time_breakdown(before, after):
+    """
+    Splits the time between two /proc/stat counter tuples into percentages.
+
+    Returns
+    -------
+    dict
+        {'user', 'system', 'iowait', 'irq', 'steal'}; user includes nice and
+        irq includes softirq.
+    """
+    deltas = [b - a for a, b in zip(before[:8], after[:8])]
+    deltas += [0] * (8 - len(deltas))  # Old kernels have fewer columns
+    total = sum(deltas)
+    if total <= 0:
+        return dict.fromkeys(('user', 'system', 'iowait', 'irq', 'steal'), 0.0)
+    scale = 100.0 / total
+    return {
+        'user': round((deltas[0] + deltas[1]) * scale, 1),
+        'system': round(deltas[2] * scale, 1),
+        'iowait': round(deltas[4] * scale, 1),
+        'irq': round((deltas[5] + deltas[6]) * scale, 1),
+        'steal': round(deltas[7] * scale, 1),
+    }
+
+
+def parse_meminfo(data):
+    """Returns the used memory percentage (total minus available) from /proc/meminfo."""
+    data = bytes(data)
+    total = _meminfo_field(data, b'MemTotal:')
+    available = _meminfo_field(data, b'MemAvailable:')
+    if not total:
+        return 0.0
+    return round(100.0 * (total - available) / total, 1)
+
+
+def _meminfo_field(data, key):
+    start = data.find(key)
+    if start < 0:
+        return 0
+    end = data.find(b'\n', start)
+    return int(data[start + len(key):end].split()[0])
+
+
+def parse_diskstats(data):
+    """
+    Parses /proc/diskstats.
+
+    Returns
+    -------
+    dict
+        device name -> (reads, sectors read, writes, sectors written,
+        milliseconds spent doing I/O), all cumulative since boot.
+    """
+    devices = {}
+    for line in bytes(data).split(b'\n'):
+        fields = line.split()
+        if len(fields) < 13:
+            continue
+        devices[fields[2].decode()] = (int(fields[3]), int(fields[5]), int(fields[7]), int(fields[9]),
+                                       int(fields[12]))
+    return devices
+
+
+def io_rates(before, after, elapsed):
+    """
+    Turns two parse_diskstats() entries of a device taken `elapsed` seconds apart into rates.
+
+    Returns
+    -------
+    dict
+        {'read_bytes', 'write_bytes'} per second, 'iops' and 'service_time',
+        the milliseconds the device was busy per completed request.
+    """
+    reads, read_sectors, writes, write_sectors, busy = (b - a for a, b in zip(before, after))
+    requests = reads + writes
+    return {
+        'read_bytes': read_sectors * SECTOR_SIZE / elapsed,
+        'write_bytes': write_sectors * SECTOR_SIZE / elapsed,
+        'iops': requests / elapsed,
+        'service_time': busy / requests if requests else 0.0,
+    }
+
+
+def parse_mounts(data):
+    """Returns the (device, mount point) pairs of the block devices in /proc/mounts."""
+    mounts = []
+    for line in bytes(data).split(b'\n'):
+        fields = line.split()
+        if len(fields) >= 2 and fields[0].startswith(b'/dev/'):
+            # Spaces and other special characters are octal-escaped, e.g. \040
+            mountpoint = _OCTAL_ESCAPE.sub(lambda match: bytes([int(match.group(1), 8)]), fields[1])
+            mounts.append((fields[0].decode(), mountpoint.decode(errors='replace')))
+    return mounts
+
+
+class Snapshot:
+    """Values read by one Sampler pass. Percentages are 0-100, temperature in C, fan PWM 0-255 or -1."""
+    __slots__ = ['timestamp', 'cpu_usage', 'per_core_usage', 'cpu_breakdown', 'cpu_times', 'core_times',
+                 'memory_usage', 'cpu_temperature', 'fan_pwm']
+
+    def __init__(self, timestamp, cpu_usage=0.0, per_core_usage=(), cpu_breakdown=None, cpu_times=(),
+                 core_times=(), memory_usage=0.0, cpu_temperature=0, fan_pwm=-1):
+        self.timestamp = timestamp
+        self.cpu_usage = cpu_usage
+        self.per_core_usage = per_core_usage
+        self.cpu_breakdown = cpu_breakdown or {}  # time_breakdown() of the aggregate
+        self.cpu_times = cpu_times
+        self.core_times = core_times
+        self.memory_usage = memory_usage
+        self.cpu_temperature = cpu_temperature
+        self.fan_pwm = fan_pwm
+
+
+class Sampler:
+    """
+    Shared reader of /proc and sysfs.
+
+    Parameters
+    ----------
+    max_age : float, optional
+        Seconds a snapshot is shared before snapshot() takes a new one.
+    statvfs_ttl : float, optional
+        Seconds disk_usage() caches a file system's usage.
+    """
+
+    def __init__(self, max_age=SAMPLE_MAX_AGE, statvfs_ttl=STATVFS_TTL, stat_path=PROC_STAT,
+                 meminfo_path=PROC_MEMINFO, thermal_path=THERMAL_ZONE, hwmon_base=HWMON_BASE,
+                 diskstats_path=PROC_DISKSTATS, mounts_path=PROC_MOUNTS, sys_dev_block=SYS_DEV_BLOCK):
+        self.max_age = max_age
+        self.statvfs_ttl = statvfs_ttl
+        self.hwmon_base = hwmon_base
+        self._stat = Source(stat_path)
+        self._meminfo = Source(meminfo_path)
+        self._thermal = Source(thermal_path, 16)
+        self._pwm = None  # Found on the first sample
+        self._diskstats = Source(diskstats_path)
+        self._mounts = Source(mounts_path)
+        self.sys_dev_block = sys_dev_block
+        self._block_names = {}  # st_dev -> block device name, or None
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._disks = {}  # path -> (timestamp, percent)
+        self.samples = 0
+        self.processes = ProcessSampler(proc=os.path.dirname(stat_path))
+
+    def snapshot(self, max_age=None):
+        """Returns the current snapshot, sampling first if it is older than `max_age` seconds."""
+        if max_age is None:
+            max_age = self.max_age
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - snapshot.timestamp <= max_age:
+            return snapshot
+        with self._lock:
+            # Another thread may have sampled while this one waited
+            snapshot = self._snapshot
+            if snapshot is None or time.monotonic() - snapshot.timestamp > max_age:
+                snapshot = self._snapshot = self.sample(snapshot)
+            return snapshot
+
+    def sample(self, previous=None):
+        """Reads every source once. CPU usage is measured since `previous`."""
+        snapshot = Snapshot(time.monotonic())
+        try:
+            snapshot.cpu_times, snapshot.core_times = parse_cpu_times(self._stat.read())
+        except (OSError, ValueError):
+            pass
+        if previous is not None and previous.cpu_times and snapshot.cpu_times:
+            snapshot.cpu_usage = busy_percent(previous.cpu_times, snapshot.cpu_times)
+            snapshot.cpu_breakdown = time_breakdown(previous.cpu_times, snapshot.cpu_times)
+            if len(previous.core_times) == len(snapshot.core_times):
+                snapshot.per_core_usage = tuple(busy_percent(before, after) for before, after
+                                                in zip(previous.core_times, snapshot.core_times))
+        try:
+            snapshot.memory_usage = parse_meminfo(self._meminfo.read())
+        except (OSError, ValueError, IndexError):
+            pass
+        try:
+            snapshot.cpu_temperature = int(bytes(self._thermal.read())) / 1000.0
+        except (OSError, ValueError):
+            pass
+        snapshot.fan_pwm = self._read_fan_pwm()
+        self.samples += 1
+        return snapshot
+
+    def _read_fan_pwm(self):
+        if self._pwm is None:
+            try:
+                hwmon_dirs = sorted(d for d in os.listdir(self.hwmon_base) if d.startswith('hwmon'))
+            except OSError:
+                return -1
+            if not hwmon_dirs:
+                return -1
+            self._pwm = Source(os.path.join(self.hwmon_base, hwmon_dirs[0], 'pwm1'), 16)
+        try:
+            return max(0, min(255, int(bytes(self._pwm.read()))))
+        except (OSError, ValueError):
+            self._pwm = None  # Look the hwmon directory up again next time
+            return -1
+
+    def disk_usage(self, path='/'):
+        """Returns the used percentage of the file system at `path`, as psutil.disk_usage() computes it."""
+        now = time.monotonic()
+        cached = self._disks.get(path)
+        if cached is not None and now - cached[0] < self.statvfs_ttl:
+            return cached[1]
+        st = os.statvfs(path)
+        used = (st.f_blocks - st.f_bfree) * st.f_frsize
+        available = st.f_bavail * st.f_frsize
+        percent = round(100.0 * used / (used + available), 1) if used + available else 0.0
+        self._disks[path] = (now, percent)
+        return percent
+
+    def block_device(self, path):
+        """
+        Returns the /proc/diskstats name of the block device holding `path`, or None.
+
+        The name comes from the file system's major:minor, so it is right for
+        mounts listed under aliases such as /dev/root. Raises OSError if
+        `path` cannot be stat'ed.
+        """
+        dev = os.stat(path).st_dev
+        if dev not in self._block_names:
+            try:
+                link = os.readlink(os.path.join(self.sys_dev_block, f'{os.major(dev)}:{os.minor(dev)}'))
+                self._block_names[dev] = os.path.basename(link)
+            except OSError:
+                self._block_names[dev] = None  # Not a block device, e.g. tmpfs or btrfs subvolumes
+        return self._block_names[dev]
+
+    def diskstats(self):
+        """Returns (timestamp, parse_diskstats() result); the result is empty if it cannot be read."""
+        now = time.monotonic()
+        try:
+            return now, parse_diskstats(self._diskstats.read())
+        except (OSError, ValueError, IndexError):
+            return now, {}
+
+    def mounts(self):
+        """Returns the parse_mounts() result, or [] if /proc/mounts cannot be read."""
+        try:
+            return parse_mounts(self._mounts.read())
+        except (OSError, ValueError):
+            return []
+
+    def top_processes(self):
+        """Returns the busiest processes; see ProcessSampler.top()."""
+        return self.processes.top()
+
+    def close(self):
+        """Closes the open descriptors."""
+        for source in (self._stat, self._meminfo, self._thermal, self._pwm, self._diskstats, self._mounts):
+            if source is not None:
+                source.close()
+        self.processes.close()
+
+
+def parse_process_stat(data):
+    """Returns (name, utime + stime in clock ticks) from a /proc/[pid]/stat line."""
+    data = bytes(data)
+    start = data.index(b'(')
+    end = data.rindex(b')')  # The name may contain spaces and parentheses
+    fields = data[end + 2:].split()
+    return data[start + 1:end].decode(errors='replace'), int(fields[11]) + int(fields[12])
+
+
+class ProcessSampler:
+    """
+    Rate-limited top-N process sampler.
+
+    Parameters
+    ----------
+    count : int, optional
+        Processes returned by top() (default is 3).
+    interval : float, optional
+        Minimum seconds between two samples; top() returns the previous result
+        in between (default is PROCESS_INTERVAL).
+    rescan_interval : float, optional
+        Seconds between two walks of every process (default is RESCAN_INTERVAL).
+    tracked : int, optional
+        Busiest processes of the last walk re-read between walks (default is 16).
+
+    A process that becomes busy between walks shows up at the next walk.
+    """
+
+    def __init__(self, count=3, interval=PROCESS_INTERVAL, rescan_interval=RESCAN_INTERVAL,
+                 tracked=16, proc='/proc'):
+        self.count = count
+        self.interval = interval
+        self.rescan_interval = rescan_interval
+        self.tracked = tracked
+        self.proc = proc
+        self._ticks = {}     # pid -> (cumulative ticks, time) of its last reading
+        self._sources = {}   # pid -> Source of a tracked process
+        self._last = None    # Time of the last sample
+        self._last_scan = None
+        self._top = ()
+        self.scans = 0
+
+    def top(self, now=None):
+        """
+        Returns up to `count` (pid, name, cpu percent) tuples, busiest first.
+
+        The percentage is of one core, as in top, so a process using two
+        cores fully reports 200.
+        """
+        now = time.monotonic() if now is None else now
+        if self._last is not None and now - self._last < self.interval:
+            return self._top
+        if self._last_scan is None or now - self._last_scan >= self.rescan_interval:
+            readings = self._scan()
+            self._last_scan = now
+        else:
+            readings = self._read_tracked()
+
+        usage = []
+        for pid, (name, ticks) in readings.items():
+            previous = self._ticks.get(pid)
+            # Untracked processes were last read at the previous walk
+            if previous is not None and now > previous[1]:
+                percent = 100.0 * (ticks - previous[0]) / CLK_TCK / (now - previous[1])
+                usage.append((pid, name, round(percent, 1)))
+            self._ticks[pid] = (ticks, now)
+        self._last = now
+
+        usage.sort(key=lambda entry: entry[2], reverse=True)
+        self._top = tuple(usage[:self.count])
+        return self._top
+
+    def _read(self, pid, source):
+        try:
+            return parse_process_stat(source.read())
+        except (OSError, ValueError, IndexError):
+            return None  # The process exited
+
+    def _scan(self):
+        # Walks every process, then keeps the busiest ones open until the next walk
+        readings = {}
+        for entry in os.listdir(self.proc):
+            if not entry.isdigit():
+                continue
+            pid = int(entry)
+            source = self._sources.get(pid) or Source(os.path.join(self.proc, entry, 'stat'), 1024)
+            reading = self._read(pid, source)
+            if reading is not None:
+                readings[pid] = reading
+            if pid not in self._sources:
+                source.close()
+
+        def activity(pid):
+            previous = self._ticks.get(pid)
+            return readings[pid][1] - (previous[0] if previous is not None else 0)
+
+        busiest = set(sorted(readings, key=activity, reverse=True)[:self.tracked])
+        for pid in list(self._sources):
+            if pid not in busiest:
+                self._sources.pop(pid).close()
+        for pid in busiest:
+            if pid not in self._sources:
+                self._sources[pid] = Source(os.path.join(self.proc, str(pid), 'stat'), 1024)
+        self._ticks = {pid: self._ticks[pid] for pid in readings if pid in self._ticks}
+        self.scans += 1
+        return readings
+
+    def _read_tracked(self):
+        readings = {}
+        for pid, source in list(self._sources.items()):
+            reading = self._read(pid, source)
+            if reading is None:
+                self._sources.pop(pid).close()
+                self._ticks.pop(pid, None)
+            else:
+                readings[pid] = reading
+        return readings
+
+    def close(self):
+        for source in self._sources.values():
+            source.close()
+        self._sources = {}
+
+
+_default = None
+
+
+def get_sampler(pi_monitor=None):
+    """Returns the monitor's sampler, or a process-wide one for plugins updated without a monitor."""
+    sampler = getattr(pi_monitor, 'sampler', None)
+    if isinstance(sampler, Sampler):
+        return sampler
+    global _default
+    if _default is None:
+        _default = Sampler()
+    return _default
@@ -0,0 +1,186 @@
+"""
+Deadline Scheduler Module
+
+This module provides a small deadline-based scheduler used by the monitor loop.
+Every task has its own period and the next run times are kept in a heap, so
+the loop only wakes up when the earliest task is actually due. Deadlines are
+advanced from the previous deadline rather than from the time the task
+finished, which keeps the cadence free of drift when a task runs long.
+
+Tasks can be given a level. Due tasks run level by level, lowest first, and
+with an executor the tasks of one level run concurrently.
+"""
+import heapq
+import itertools
+import time
+from concurrent.futures import wait
+
+
+def advance_deadline(deadline, period, now):
+    """
+    Returns the deadline following `deadline`.
+
+    The next deadline is anchored to the previous one so the cadence does not
+    drift. When a run overran by a whole period or more, the missed runs are
+    skipped instead of being fired back to back.
+    """
+    deadline += period
+    if deadline <= now:
+        deadline += ((now - deadline) // period + 1) * period
+    return deadline
+
+
+class Task:
+    """A periodic job registered with the scheduler."""
+    __slots__ = ['name', 'callback', 'period', 'deadline', 'seq', 'level']
+
+    def __init__(self, name, callback, period, deadline, seq, level=0):
+        self.name = name
+        self.callback = callback
+        self.period = period
+        self.deadline = deadline
+        self.seq = seq
+        self.level = level
+
+
+class Scheduler:
+    """
+    Runs periodic callbacks at their own rate using a heap of deadlines.
+
+    Tasks that become due at the same instant run in the order they were
+    added, so a consumer registered after its producer always sees fresh data.
+    Levels make that ordering explicit: a task only runs after every due task
+    of a lower level finished. Given a concurrent.futures executor, the due
+    tasks of a level run in parallel.
+    """
+
+    def __init__(self, clock=time.monotonic, executor=None):
+        self.clock = clock
+        self.executor = executor
+        self._heap = []
+        self._tasks = {}
+        self._counter = itertools.count()
+
+    def add(self, name, callback, period, delay=0.0, level=0):
+        """
+        Registers a callback to run every `period` seconds.
+
+        Parameters
+        ----------
+        name : str
+            Unique name of the task.
+        callback : callable
+            Called without arguments whenever the task is due.
+        period : float
+            Interval between two runs, in seconds.
+        delay : float, optional
+            Time to wait before the first run (default is 0.0).
+        level : int, optional
+            Due tasks of lower levels run first (default is 0).
+        """
+        if period <= 0:
+            raise ValueError(f"Period for task '{name}' must be positive, got {period}")
+        if name in self._tasks:
+            self.remove(name)
+        task = Task(name, callback, period, self.clock() + delay, next(self._counter), level)
+        self._tasks[name] = task
+        heapq.heappush(self._heap, (task.deadline, task.seq, task))
+
+    def remove(self, name):
+        """Unregisters a task. Its stale heap entry is discarded lazily."""
+        self._tasks.pop(name, None)
+
+    def trigger(self, name):
+        """
+        Makes a task due immediately. Its cadence continues from this run.
+
+        Returns
+        -------
+        bool
+            False if no task with that name is registered.
+        """
+        task = self._tasks.get(name)
+        if task is None:
+            return False
+        now = self.clock()
+        if task.deadline > now:
+            task.deadline = now
+            heapq.heappush(self._heap, (task.deadline, task.seq, task))
+        return True
+
+    def __contains__(self, name):
+        return name in self._tasks
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def time_until_next(self):
+        """Returns the number of seconds until the next task is due, or None if idle."""
+        self._discard_stale()
+        if not self._heap:
+            return None
+        return max(0.0, self._heap[0][0] - self.clock())
+
+    def run_pending(self):
+        """
+        Runs every task that is currently due and reschedules it.
+
+        Returns
+        -------
+        int
+            The number of tasks that ran.
+        """
+        now = self.clock()
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            deadline, seq, task = heapq.heappop(self._heap)
+            if self._tasks.get(task.name) is task and task.deadline == deadline:
+                due.append(task)
+        # Levels first, then registration order between tasks sharing a deadline
+        due.sort(key=lambda t: (t.level, t.deadline, t.seq))
+
+        for _, group in itertools.groupby(due, key=lambda t: t.level):
+            self._run_level(list(group))
+
+        finished = self.clock()
+        for task in due:
+            if self._tasks.get(task.name) is not task:
+                continue  # Removed while running
+            task.deadline = advance_deadline(task.deadline, task.period, finished)
+            heapq.heappush(self._heap, (task.deadline, task.seq, task))
+        return len(due)
+
+    def _run_level(self, tasks):
+        if self.executor is None or len(tasks) == 1:
+            for task in tasks:
+                task.callback()
+            return
+        futures = [self.executor.submit(task.callback) for task in tasks]
+        wait(futures)
+        for future in futures:
+            future.result()  # Re-raises the first failure
+
+    def run(self, stop_event):
+        """
+        Runs tasks until `stop_event` is set.
+
+        The loop waits on the event instead of sleeping, so setting it from a
+        signal handler or another thread ends the loop without delay.
+        """
+        while not stop_event.is_set():
+            self.run_pending()
+            if stop_event.is_set():
+                break
+            timeout = self.time_until_next()
+            if timeout is None:
+                stop_event.wait()
+            elif timeout > 0:
+                stop_event.wait(timeout)
+
+    def _discard_stale(self):
+        # Drop heap entries belonging to removed tasks
+        while self._heap:
+            deadline, seq, task = self._heap[0]
+            if self._tasks.get(task.name) is task and task.deadline == deadline:
+                return
+            heapq.heappop(self._heap)
@@ -0,0 +1,293 @@
+"""
+Status Channel Module
+
+Low-latency IPC for security tools reporting their status to the Cyberdeck.
+Producers send compact binary records as datagrams to a Unix socket owned by
+SecurityStatusPlugin. Every datagram is delivered whole or not at all, so a
+reader never sees a half-written status, and sending one costs a single
+non-blocking syscall with no file I/O. The JSON status file remains supported
+for tools that have not moved to the channel.
+
+A record only carries the fields that changed, so a progress update is a few
+bytes. Fields in a record are merged into the current status in the order
+the records arrive.
+
+Record format (little endian):
+    header   : magic b'CS', version (B), flags (B), mode (B), seq (I),
+               progress (f), progress_max (f)
+    phase    : uint8 length + UTF-8, if FLAG_PHASE
+    target   : uint8 length + UTF-8, if FLAG_TARGET
+    message  : uint8 length + UTF-8, if FLAG_MESSAGE
+    details  : uint16 length + JSON, if FLAG_DETAILS
+
+The socket is created with SOCKET_MODE (0o666) whatever the daemon's umask,
+so unprivileged tools can report to a daemon running as root, as they can
+write the JSON file. StatusChannel(mode=0o660, group='cyberdeck') limits
+senders to one group instead.
+
+Senders that outrun the reader (net.unix.max_dgram_qlen records are queued
+per socket) have their updates coalesced by StatusClient.
+
+Usage from a producer:
+    client = StatusClient()
+    client.send(mode='scanning', phase='Nmap', target='10.0.0.0/24')
+    client.send(mode='scanning', progress=42)
+"""
+import errno
+import grp
+import itertools
+import json
+import os
+import socket
+import struct
+
+SOCKET_PATH = '/tmp/cyberdeck_status.sock'
+STATUS_FILE = '/tmp/cyberdeck_status.json'
+SOCKET_MODE = 0o666  # Any local user may send; see StatusChannel's mode and group
+
+MAGIC = b'CS'
+VERSION = 1
+MAX_RECORD = 4096
+
+# Mode codes; the order is part of the wire format, append new modes only
+MODES = ('idle', 'wifi_scan', 'monitor', 'recon', 'scanning', 'exploit', 'alert', 'safe')
+_MODE_CODES = {mode: code for code, mode in enumerate(MODES)}
+
+FLAG_PROGRESS = 0x01
+FLAG_PROGRESS_MAX = 0x02
+FLAG_PHASE = 0x04
+FLAG_TARGET = 0x08
+FLAG_MESSAGE = 0x10
+FLAG_DETAILS = 0x20
+FLAG_CLEAR_PROGRESS = 0x40  # Progress is explicitly None
+
+_HEADER = struct.Struct('<2sBBBIff')
+_STRING_FIELDS = ((FLAG_PHASE, 'phase'), (FLAG_TARGET, 'target'), (FLAG_MESSAGE, 'message'))
+
+
+def encode_status(mode, seq=0, **fields):
+    """
+    Encodes a status update into a binary record.
+
+    Parameters
+    ----------
+    mode : str
+        One of MODES.
+    seq : int, optional
+        Sequence number, returned as 'seq' by decode_status().
+    **fields
+        Any of progress, progress_max, phase, target, message, details.
+        Strings are truncated to 255 bytes.
+
+    Returns
+    -------
+    bytes
+        The record.
+    """
+    code = _MODE_CODES.get(mode)
+    if code is None:
+        raise ValueError(f"Unknown status mode: {mode}")
+    unknown = set(fields) - {'progress', 'progress_max', 'phase', 'target', 'message', 'details'}
+    if unknown:
+        raise ValueError(f"Unknown status fields: {', '.join(sorted(unknown))}")
+
+    flags = 0
+    progress = fields.get('progress')
+    progress_max = fields.get('progress_max')
+    if 'progress' in fields:
+        flags |= FLAG_PROGRESS if progress is not None else FLAG_CLEAR_PROGRESS
+    if progress_max is not None:
+        flags |= FLAG_PROGRESS_MAX
+
+    body = []
+    for flag, name in _STRING_FIELDS:
+        value = fields.get(name)
+        if value is not None:
+            data = str(value).encode('utf-8')[:255]
+            flags |= flag
+            body.append(bytes((len(data),)) + data)
+    if fields.get('details') is not None:
+        data = json.dumps(fields['details'], separators=(',', ':')).encode('utf-8')
+        if len(data) > 0xFFFF:
+            raise ValueError("Status details too large")
+        flags |= FLAG_DETAILS
+        body.append(struct.pack('<H', len(data)) + data)
+
+    header = _HEADER.pack(MAGIC, VERSION, flags, code, seq & 0xFFFFFFFF,
+                          progress or 0.0, progress_max or 0.0)
+    return header + b''.join(body)
+
+
+def decode_status(record):
+    """
+    Decodes a record produced by encode_status().
+
+    Returns
+    -------
+    dict
+        'mode', 'seq' and the fields present in the record.
+
+    Raises
+    ------
+    ValueError
+        If the record is malformed.
+    """
+    try:
+        magic, version, flags, code, seq, progress, progress_max = _HEADER.unpack_from(record, 0)
+    except struct.error:
+        raise ValueError("Truncated status record")
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a status record")
+    if code >= len(MODES):
+        raise ValueError(f"Unknown status mode code: {code}")
+
+    status = {'mode': MODES[code], 'seq': seq}
+    if flags & FLAG_PROGRESS:
+        status['progress'] = progress
+    elif flags & FLAG_CLEAR_PROGRESS:
+        status['progress'] = None
+    if flags & FLAG_PROGRESS_MAX:
+        status['progress_max'] = progress_max
+
+    offset = _HEADER.size
+    try:
+        for flag, name in _STRING_FIELDS:
+            if flags & flag:
+                length = record[offset]
+                status[name] = bytes(record[offset + 1:offset + 1 + length]).decode('utf-8', 'replace')
+                offset += 1 + length
+        if flags & FLAG_DETAILS:
+            (length,) = struct.unpack_from('<H', record, offset)
+            status['details'] = json.loads(bytes(record[offset + 2:offset + 2 + length]))
+            offset += 2 + length
+    except (IndexError, struct.error, json.JSONDecodeError):
+        raise ValueError("Truncated status record")
+    if offset != len(record):
+        raise ValueError("Trailing bytes in status record")
+    return status
+
+
+class StatusChannel:
+    """
+    Receiving end of the status channel, owned by SecurityStatusPlugin.
+
+    The socket is non-blocking; drain() returns whatever records are queued.
+    Its path gets `mode` and, if set, `group` (a name or gid), so the umask
+    does not decide who may send.
+    """
+
+    def __init__(self, path=SOCKET_PATH, mode=SOCKET_MODE, group=None):
+        self.path = path
+        self.dropped = 0  # Malformed records
+        _remove_stale_socket(path)
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        try:
+            self.sock.bind(path)
+            if group is not None:
+                os.chown(path, -1, group if isinstance(group, int) else grp.getgrnam(group).gr_gid)
+            os.chmod(path, mode)
+            self.sock.setblocking(False)
+        except OSError:
+            self.sock.close()
+            raise
+
+    def fileno(self):
+        return self.sock.fileno()
+
+    def drain(self, max_records=1024):
+        """Returns the decoded records waiting on the socket, oldest first."""
+        records = []
+        for _ in range(max_records):
+            try:
+                data = self.sock.recv(MAX_RECORD)
+            except BlockingIOError:
+                break
+            try:
+                records.append(decode_status(data))
+            except ValueError:
+                self.dropped += 1
+        return records
+
+    def close(self):
+        """Closes the socket and removes its path."""
+        if self.sock.fileno() < 0:
+            return
+        self.sock.close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+def _remove_stale_socket(path):
+    # Removes a socket left behind by a previous run, refusing to steal a live one
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    try:
+        probe.connect(path)
+    except FileNotFoundError:
+        return
+    except ConnectionRefusedError:
+        os.unlink(path)
+        return
+    finally:
+        probe.close()
+    raise OSError(errno.EADDRINUSE, "Status channel already in use", path)
+
+
+class StatusClient:
+    """
+    Producer side of the status channel.
+
+    send() never blocks. When the Cyberdeck is not listening or its queue is
+    full, the fields are kept and merged into the next record, so a burst of
+    updates only loses intermediate values, never the latest one; flush()
+    retries them explicitly. With `fallback_file` set, the full status is also
+    written to the JSON status file while the channel is unreachable.
+    """
+
+    def __init__(self, path=SOCKET_PATH, fallback_file=None):
+        self.path = path
+        self.fallback_file = fallback_file
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+        self._seq = itertools.count()
+        self._pending = {}  # Fields not delivered yet
+        self._status = {}   # Everything sent so far, for the JSON fallback
+
+    def send(self, mode, **fields):
+        """Sends a status update. Returns True if it was queued on the channel."""
+        if 'seq' in fields:
+            raise ValueError("seq is assigned by the client")
+        pending = dict(self._pending, **fields)
+        pending['mode'] = mode
+        encode_status(**pending)  # Validate before keeping anything
+        self._pending = pending
+        self._status.update(pending)
+        return self.flush()
+
+    def flush(self):
+        """Sends the fields still pending. Returns True if nothing is left pending."""
+        if not self._pending:
+            return True
+        record = encode_status(seq=next(self._seq), **self._pending)
+        try:
+            self.sock.sendto(record, self.path)
+        except BlockingIOError:
+            return False  # Channel busy; retried with the next update
+        except (FileNotFoundError, ConnectionRefusedError):
+            if self.fallback_file is not None:
+                write_status_file(self._status, self.fallback_file)
+            return False
+        self._pending = {}
+        return True
+
+    def close(self):
+        self.sock.close()
+
+
+def write_status_file(status, path=STATUS_FILE):
+    """Writes the JSON compatibility status file atomically."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(status, f)
+    os.replace(tmp_path, path)
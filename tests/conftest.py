@@ -0,0 +1,22 @@
+import pytest
+import sys
+import os
+
+# Add the Code directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../Code')))
+
+import logger
+import status_channel
+
+@pytest.fixture(autouse=True)
+def private_status_paths(tmp_path, monkeypatch):
+    # Tests building SecurityStatusPlugin (directly, through load_plugins or
+    # Pi_Monitor) must not bind the running daemon's socket or read its file
+    monkeypatch.setattr(status_channel, 'SOCKET_PATH', str(tmp_path / 'cyberdeck_status.sock'))
+    monkeypatch.setattr(status_channel, 'STATUS_FILE', str(tmp_path / 'cyberdeck_status.json'))
+    monkeypatch.setattr('plugins.security_status_plugin.STATUS_FILE', tmp_path / 'cyberdeck_status.json')
+
+@pytest.fixture(autouse=True)
+def private_logs_dir(tmp_path, monkeypatch):
+    # Loggers set up by the code under test write into the test's directory, not the repo's logs/
+    monkeypatch.setattr(logger, 'LOGS_DIR', str(tmp_path / 'logs'))
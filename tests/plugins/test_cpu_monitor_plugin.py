@@ -1,19 +1,42 @@
 import pytest
-from unittest.mock import patch
+from unittest.mock import MagicMock
 import sys
 import os
 
 # Add the Code directory to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../Code')))
 
+from sampler import Sampler, Snapshot
 from plugins.cpu_monitor_plugin import CpuMonitorPlugin
 
 def test_cpu_monitor_plugin_update():
-    with patch('psutil.cpu_percent') as mock_cpu_percent:
-        mock_cpu_percent.return_value = 50.0
-        
-        plugin = CpuMonitorPlugin()
-        plugin.update()
-        
-        mock_cpu_percent.assert_called_once_with(interval=0)
-        assert plugin.cpu_usage == 50.0
+    mock_pi_monitor = MagicMock()
+    mock_pi_monitor.sampler = MagicMock(spec=Sampler)
+    mock_pi_monitor.sampler.snapshot.return_value = Snapshot(0.0, cpu_usage=50.0, per_core_usage=(25.0, 75.0))
+
+    plugin = CpuMonitorPlugin()
+    plugin.update(mock_pi_monitor)
+
+    mock_pi_monitor.sampler.snapshot.assert_called_once_with()
+    assert plugin.cpu_usage == 50.0
+    assert plugin.per_core_usage == (25.0, 75.0)
+
+def test_cpu_monitor_plugin_without_monitor_uses_shared_sampler():
+    plugin = CpuMonitorPlugin()
+    plugin.update()
+    assert 0.0 <= plugin.cpu_usage <= 100.0
+
+def test_cpu_monitor_plugin_breakdown_and_top_processes():
+    mock_pi_monitor = MagicMock()
+    mock_pi_monitor.sampler = MagicMock(spec=Sampler)
+    breakdown = {'user': 40.0, 'system': 10.0, 'iowait': 12.5, 'irq': 3.0, 'steal': 0.5}
+    mock_pi_monitor.sampler.snapshot.return_value = Snapshot(0.0, cpu_usage=60.0, per_core_usage=(20.0, 100.0),
+                                                             cpu_breakdown=breakdown)
+    mock_pi_monitor.sampler.top_processes.return_value = ((42, 'python3', 98.0),)
+
+    plugin = CpuMonitorPlugin()
+    plugin.update(mock_pi_monitor)
+
+    assert plugin.max_core_usage == 100.0
+    assert (plugin.iowait, plugin.irq, plugin.steal) == (12.5, 3.0, 0.5)
+    assert plugin.top_processes == ((42, 'python3', 98.0),)
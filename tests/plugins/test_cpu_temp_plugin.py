@@ -1,24 +1,29 @@
 import pytest
-from unittest.mock import patch, mock_open, MagicMock
+from unittest.mock import MagicMock
 import sys
 import os
 
 # Add the Code directory to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../Code')))
 
+from sampler import Sampler, Snapshot
 from plugins.cpu_temp_plugin import CpuTempPlugin
 
-def test_cpu_temp_plugin_update():
+def test_cpu_temp_plugin_update(tmp_path):
+    thermal = tmp_path / 'temp'
+    thermal.write_text('55000\n')
     mock_pi_monitor = MagicMock()
-    with patch('builtins.open', mock_open(read_data='55000')) as mock_file:
-        plugin = CpuTempPlugin()
-        plugin.update(mock_pi_monitor)
-        mock_file.assert_called_once_with('/sys/devices/virtual/thermal/thermal_zone0/temp', 'r')
-        assert plugin.cpu_temperature == 55.0
+    mock_pi_monitor.sampler = Sampler(thermal_path=str(thermal), hwmon_base=str(tmp_path))
 
-def test_cpu_temp_plugin_update_exception():
+    plugin = CpuTempPlugin()
+    plugin.update(mock_pi_monitor)
+    assert plugin.cpu_temperature == 55.0
+    mock_pi_monitor.sampler.close()
+
+def test_cpu_temp_plugin_update_exception(tmp_path):
     mock_pi_monitor = MagicMock()
-    with patch('builtins.open', side_effect=IOError):
-        plugin = CpuTempPlugin()
-        plugin.update(mock_pi_monitor)
-        assert plugin.cpu_temperature == 0
+    mock_pi_monitor.sampler = Sampler(thermal_path=str(tmp_path / 'missing'), hwmon_base=str(tmp_path))
+
+    plugin = CpuTempPlugin()
+    plugin.update(mock_pi_monitor)
+    assert plugin.cpu_temperature == 0
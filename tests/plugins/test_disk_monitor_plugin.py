@@ -1,21 +1,107 @@
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import MagicMock
 import sys
 import os
 
 # Add the Code directory to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../Code')))
 
+from sampler import Sampler, Snapshot
 from plugins.disk_monitor_plugin import DiskMonitorPlugin
 
+def diskstats(reads, read_sectors, writes, write_sectors, busy):
+    return {'mmcblk0p2': (reads, read_sectors, writes, write_sectors, busy), 'loop0': (0, 0, 0, 0, 0)}
+
+@pytest.fixture
+def mock_pi_monitor():
+    mock_pi_monitor = MagicMock()
+    mock_pi_monitor.sampler = MagicMock(spec=Sampler)
+    mock_pi_monitor.sampler.disk_usage.return_value = 25.0
+    mock_pi_monitor.sampler.mounts.return_value = [('/dev/mmcblk0p2', '/'), ('/dev/mmcblk0p2', '/var/log')]
+    mock_pi_monitor.sampler.block_device.return_value = 'mmcblk0p2'
+    return mock_pi_monitor
+
 def test_disk_monitor_plugin_update():
-    with patch('psutil.disk_usage') as mock_disk_usage:
-        mock_disk = MagicMock()
-        mock_disk.percent = 25.0
-        mock_disk_usage.return_value = mock_disk
-        
-        plugin = DiskMonitorPlugin()
-        plugin.update()
-        
-        mock_disk_usage.assert_called_once_with('/')
-        assert plugin.disk_usage == 25.0
+    mock_pi_monitor = MagicMock()
+    mock_pi_monitor.sampler = MagicMock(spec=Sampler)
+    mock_pi_monitor.sampler.disk_usage.return_value = 25.0
+    mock_pi_monitor.sampler.mounts.return_value = []
+    mock_pi_monitor.sampler.diskstats.return_value = (0.0, {})
+
+    plugin = DiskMonitorPlugin()
+    plugin.update(mock_pi_monitor)
+
+    mock_pi_monitor.sampler.disk_usage.assert_called_once_with('/')
+    assert plugin.disk_usage == 25.0
+
+def test_disk_monitor_plugin_io_rates(mock_pi_monitor):
+    plugin = DiskMonitorPlugin()
+    mock_pi_monitor.sampler.diskstats.return_value = (10.0, diskstats(100, 800, 50, 400, 1000))
+    plugin.update(mock_pi_monitor)
+    assert plugin.disk_io == {}  # Needs two readings
+
+    mock_pi_monitor.sampler.diskstats.return_value = (15.0, diskstats(150, 1800, 100, 10640, 1500))
+    plugin.update(mock_pi_monitor)
+
+    assert plugin.mount_usage == {'/': 25.0, '/var/log': 25.0}
+    assert plugin.disk_io == {'mmcblk0p2': {'read_bytes': 102400.0, 'write_bytes': 1048576.0,
+                                            'iops': 20.0, 'service_time': 5.0}}
+    assert plugin.write_bytes_per_sec == 1048576.0
+    assert plugin.iops == 20.0
+
+def test_disk_monitor_plugin_resolves_dev_root(mock_pi_monitor):
+    # Raspberry Pi OS lists the root file system as /dev/root, which has no diskstats entry
+    mock_pi_monitor.sampler.mounts.return_value = [('/dev/root', '/')]
+    plugin = DiskMonitorPlugin()
+    mock_pi_monitor.sampler.diskstats.return_value = (10.0, diskstats(100, 800, 50, 400, 1000))
+    plugin.update(mock_pi_monitor)
+    mock_pi_monitor.sampler.diskstats.return_value = (15.0, diskstats(150, 1800, 100, 10640, 1500))
+    plugin.update(mock_pi_monitor)
+
+    mock_pi_monitor.sampler.block_device.assert_called_with('/')
+    assert list(plugin.disk_io) == ['mmcblk0p2']
+    assert plugin.write_bytes_per_sec == 1048576.0
+
+def test_disk_monitor_plugin_falls_back_to_device_path(mock_pi_monitor):
+    mock_pi_monitor.sampler.block_device.return_value = None
+    plugin = DiskMonitorPlugin()
+    mock_pi_monitor.sampler.diskstats.return_value = (10.0, diskstats(100, 800, 50, 400, 1000))
+    plugin.update(mock_pi_monitor)
+    mock_pi_monitor.sampler.diskstats.return_value = (15.0, diskstats(150, 1800, 100, 10640, 1500))
+    plugin.update(mock_pi_monitor)
+    assert list(plugin.disk_io) == ['mmcblk0p2']
+
+def test_disk_monitor_plugin_write_alert(mock_pi_monitor):
+    hook = MagicMock()
+    plugin = DiskMonitorPlugin(write_alert_rate=1000, write_alert_after=10.0, on_write_alert=hook)
+    sectors = 0
+    for second in range(0, 30, 5):
+        sectors += 100  # 10240 bytes/s
+        mock_pi_monitor.sampler.diskstats.return_value = (float(second), diskstats(0, 0, 10, sectors, 10))
+        plugin.update(mock_pi_monitor)
+
+    hook.assert_called_once_with('mmcblk0p2', 10240.0)
+
+    # The rate drops, then a new storm alerts again
+    mock_pi_monitor.sampler.diskstats.return_value = (30.0, diskstats(0, 0, 10, sectors, 10))
+    plugin.update(mock_pi_monitor)
+    for second in range(35, 60, 5):
+        sectors += 100
+        mock_pi_monitor.sampler.diskstats.return_value = (float(second), diskstats(0, 0, 10, sectors, 10))
+        plugin.update(mock_pi_monitor)
+    assert hook.call_count == 2
+
+def test_disk_monitor_plugin_with_real_sampler(tmp_path):
+    mounts = tmp_path / 'mounts'
+    mounts.write_text(f'/dev/vda {tmp_path} ext4 rw 0 0\nproc /proc proc rw 0 0\n')
+    stats = tmp_path / 'diskstats'
+    stats.write_text(' 254 0 vda 10 0 80 5 20 0 160 10 0 12 15 0 0 0 0\n')
+    mock_pi_monitor = MagicMock()
+    mock_pi_monitor.sampler = Sampler(diskstats_path=str(stats), mounts_path=str(mounts),
+                                      hwmon_base=str(tmp_path))
+
+    plugin = DiskMonitorPlugin(path=str(tmp_path))
+    plugin.update(mock_pi_monitor)
+    assert list(plugin.mount_usage) == [str(tmp_path)]
+    assert 0.0 <= plugin.disk_usage <= 100.0
+    mock_pi_monitor.sampler.close()
@@ -1,75 +1,182 @@
 import pytest
-from unittest.mock import MagicMock, call
+from unittest.mock import MagicMock, patch
+import json
 import sys
 import os
 
 # Add the Code directory to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../Code')))
 
-from plugins.fan_control_plugin import FanControlPlugin
+from plugins.fan_control_plugin import FanControlPlugin, FanCurve, FAN_CURVES, load_fan_curve
 
 @pytest.fixture
 def mock_pi_monitor():
     mock_pi_monitor = MagicMock()
-    
+
     # Mock plugins that FanControlPlugin will depend on
     mock_cpu_temp_plugin = MagicMock()
     mock_cpu_temp_plugin.cpu_temperature = 50.0 # Default value for cpu temperature
-    
-    mock_fan_pwm_plugin = MagicMock()
-    mock_fan_pwm_plugin.fan_pwm = 0 # Default value for fan pwm
-    
+
+    mock_cpu_monitor_plugin = MagicMock()
+    mock_cpu_monitor_plugin.cpu_usage = 0.0 # Default value for cpu load
+
     mock_pi_monitor.plugins = {
         'cpu_temp': mock_cpu_temp_plugin,
-        'fan_pwm': mock_fan_pwm_plugin
+        'cpu_monitor': mock_cpu_monitor_plugin
     }
     return mock_pi_monitor
 
+def run_updates(plugin, pi_monitor, count, dt=1.0):
+    # Drive the controller with a fake monotonic clock advancing dt per update
+    times = [i * dt for i in range(count)]
+    with patch('plugins.fan_control_plugin.time.monotonic', side_effect=times):
+        for _ in range(count):
+            plugin.update(pi_monitor)
+
 def test_fan_control_plugin_init():
     mock_expansion = MagicMock()
-    plugin = FanControlPlugin(mock_expansion)
+    plugin = FanControlPlugin(mock_expansion, curve='balanced')
     assert plugin.expansion is mock_expansion
+    assert plugin.curve is FAN_CURVES['balanced']
     mock_expansion.set_fan_mode.assert_called_once_with(1)
 
-def test_fan_control_plugin_fan_off_to_on(mock_pi_monitor):
+def test_fan_control_plugin_cool_stays_off(mock_pi_monitor):
+    mock_expansion = MagicMock()
+    plugin = FanControlPlugin(mock_expansion, curve='balanced')
+
+    mock_pi_monitor.plugins['cpu_temp'].cpu_temperature = 45.0 # Well below setpoint
+    run_updates(plugin, mock_pi_monitor, 5)
+
+    mock_expansion.set_fan_duty.assert_not_called()
+    assert plugin.last_fan_pwm == 0
+
+def test_fan_control_plugin_ramps_within_slew_limit(mock_pi_monitor):
+    mock_expansion = MagicMock()
+    plugin = FanControlPlugin(mock_expansion, curve='balanced')
+
+    mock_pi_monitor.plugins['cpu_temp'].cpu_temperature = 75.0 # Hot, but below critical
+    run_updates(plugin, mock_pi_monitor, 10)
+
+    duties = [c.args[0] for c in mock_expansion.set_fan_duty.call_args_list]
+    assert duties == sorted(duties)
+    steps = [b - a for a, b in zip([0] + duties, duties)]
+    assert max(steps) <= plugin.curve.slew_rate
+    assert 0 < duties[-1] <= 255
+
+def test_fan_control_plugin_deadband():
     mock_expansion = MagicMock()
-    plugin = FanControlPlugin(mock_expansion)
-    
-    # Simulate high temperature to trigger fan on
-    # fan_pwm in pi_monitor.plugins['fan_pwm'] refers to the Raspberry Pi's fan PWM value,
-    # current_cpu_temp in pi_monitor.plugins['cpu_temp'] refers to the Raspberry Pi's CPU temperature
-    mock_pi_monitor.plugins['cpu_temp'].cpu_temperature = 180 # Above temp_threshold_high (170)
-    mock_pi_monitor.plugins['fan_pwm'].fan_pwm = 0 # Initial state: fan is off
-    
-    plugin.update(mock_pi_monitor)
-    
+    plugin = FanControlPlugin(mock_expansion, curve='balanced')
+    plugin.fan_duty = 100.0
+    plugin.last_fan_pwm = 100
+
+    # Changes smaller than the deadband are not written to the bus
+    plugin.set_duty(102, 1.0)
+    mock_expansion.set_fan_duty.assert_not_called()
+
+    plugin.set_duty(110, 1.0)
+    mock_expansion.set_fan_duty.assert_called_once_with(110, 110)
+
+def test_fan_control_plugin_feed_forward(mock_pi_monitor):
+    idle_expansion = MagicMock()
+    idle = FanControlPlugin(idle_expansion, curve='balanced')
+    busy_expansion = MagicMock()
+    busy = FanControlPlugin(busy_expansion, curve='balanced')
+
+    mock_pi_monitor.plugins['cpu_temp'].cpu_temperature = 58.0 # Just below setpoint
+    run_updates(idle, mock_pi_monitor, 3)
+    mock_pi_monitor.plugins['cpu_monitor'].cpu_usage = 100.0
+    run_updates(busy, mock_pi_monitor, 3)
+
+    assert idle.last_fan_pwm == 0
+    assert busy.last_fan_pwm > 0
+
+def test_fan_control_plugin_load_counts_pegged_core():
+    cpu_monitor = MagicMock()
+    cpu_monitor.cpu_usage = 25.0
+    cpu_monitor.max_core_usage = 100.0
+    assert FanControlPlugin.load(cpu_monitor) == 50.0
+    cpu_monitor.max_core_usage = 30.0
+    assert FanControlPlugin.load(cpu_monitor) == 25.0
+
+def test_fan_control_plugin_throttling_targets_full_speed(mock_pi_monitor):
+    mock_expansion = MagicMock()
+    plugin = FanControlPlugin(mock_expansion, curve='balanced')
+    throttle_monitor = MagicMock()
+    throttle_monitor.thermal_throttled = True
+    mock_pi_monitor.plugins['throttle_monitor'] = throttle_monitor
+    mock_pi_monitor.plugins['cpu_temp'].cpu_temperature = 50.0 # Well below setpoint
+
+    run_updates(plugin, mock_pi_monitor, 3)
+    assert plugin.last_fan_pwm > 0
+
+    throttle_monitor.thermal_throttled = False
+    assert not FanControlPlugin.throttled(throttle_monitor)
+    assert not FanControlPlugin.throttled(MagicMock())
+
+def test_fan_control_plugin_critical_temp_full_speed(mock_pi_monitor):
+    mock_expansion = MagicMock()
+    plugin = FanControlPlugin(mock_expansion, curve='balanced')
+
+    mock_pi_monitor.plugins['cpu_temp'].cpu_temperature = 85.0 # Above critical_temp
+    run_updates(plugin, mock_pi_monitor, 1)
+
     mock_expansion.set_fan_duty.assert_called_once_with(255, 255)
-    assert plugin.last_fan_pwm_limit == 1
 
-def test_fan_control_plugin_fan_on_to_off(mock_pi_monitor):
+def test_fan_control_plugin_anti_windup(mock_pi_monitor):
     mock_expansion = MagicMock()
-    plugin = FanControlPlugin(mock_expansion)
-    plugin.last_fan_pwm_limit = 1 # Fan is already on
-    
-    # Simulate low temperature to trigger fan off
-    mock_pi_monitor.plugins['cpu_temp'].cpu_temperature = 120 # Below temp_threshold_low (130)
-    mock_pi_monitor.plugins['fan_pwm'].fan_pwm = 255 # Initial state: fan is on
-    
-    plugin.update(mock_pi_monitor)
-    
-    mock_expansion.set_fan_duty.assert_called_once_with(0, 0)
-    assert plugin.last_fan_pwm_limit == 0
-
-def test_fan_control_plugin_no_change(mock_pi_monitor):
+    plugin = FanControlPlugin(mock_expansion, curve='balanced')
+
+    # Saturated at full speed for a long time must not wind the integral up
+    mock_pi_monitor.plugins['cpu_temp'].cpu_temperature = 79.0
+    run_updates(plugin, mock_pi_monitor, 100)
+    assert plugin.curve.ki * plugin._integral <= plugin.curve.max_duty
+
+    # Once cooled down, the fan ramps down instead of staying pinned
+    mock_pi_monitor.plugins['cpu_temp'].cpu_temperature = 50.0
+    plugin._last_time = None
+    run_updates(plugin, mock_pi_monitor, 20)
+    assert plugin.last_fan_pwm < 255
+
+def test_fan_control_plugin_failed_temperature_read(mock_pi_monitor):
     mock_expansion = MagicMock()
-    plugin = FanControlPlugin(mock_expansion)
-    
-    # Simulate temperature that doesn't cross threshold
-    mock_pi_monitor.plugins['cpu_temp'].cpu_temperature = 150 # Between thresholds
-    mock_pi_monitor.plugins['fan_pwm'].fan_pwm = 0 # Fan is off, stays off
-    
-    plugin.update(mock_pi_monitor)
-    
+    plugin = FanControlPlugin(mock_expansion, curve='balanced')
+
+    mock_pi_monitor.plugins['cpu_temp'].cpu_temperature = 0 # Read failure
+    run_updates(plugin, mock_pi_monitor, 3)
+
     mock_expansion.set_fan_duty.assert_not_called()
-    assert plugin.last_fan_pwm_limit == 0
 
+def test_load_fan_curve(tmp_path):
+    assert load_fan_curve(tmp_path / 'missing.json') is FAN_CURVES['balanced']
+
+    path = tmp_path / 'fan_curve.json'
+    path.write_text(json.dumps({'curve': 'quiet', 'setpoint': 62.0}))
+    curve = load_fan_curve(path)
+    assert curve.setpoint == 62.0
+    assert curve.kp == FAN_CURVES['quiet'].kp
+
+    path.write_text(json.dumps({'bogus': 1}))
+    assert load_fan_curve(path) is FAN_CURVES['balanced']
+
+def test_load_fan_curve_converts_and_rejects_bad_types(tmp_path):
+    path = tmp_path / 'fan_curve.json'
+    path.write_text(json.dumps({'curve': 'quiet', 'kp': '7.5', 'deadband': 5}))
+    curve = load_fan_curve(path)
+    assert curve.kp == 7.5 and isinstance(curve.kp, float)
+    assert curve.deadband == 5
+
+    for bad in ({'curve': 'quiet', 'kp': 'fast'}, {'curve': 'quiet', 'ki': None},
+                {'curve': 'quiet', 'deadband': '2.5'}, {'curve': 'quiet', 'setpoint': True}):
+        path.write_text(json.dumps(bad))
+        assert load_fan_curve(path) is FAN_CURVES['quiet']
+
+    path.write_text(json.dumps({'curve': ['quiet']}))
+    assert load_fan_curve(path) is FAN_CURVES['balanced']
+    path.write_text('{not json')
+    assert load_fan_curve(path) is FAN_CURVES['balanced']
+
+def test_fan_curve_replace():
+    curve = FanCurve().replace(deadband=10)
+    assert curve.deadband == 10
+    with pytest.raises(ValueError):
+        FanCurve().replace(bogus=1)
@@ -1,34 +1,52 @@
 import pytest
-from unittest.mock import patch, mock_open, MagicMock
+from unittest.mock import MagicMock
 import sys
 import os
 
 # Add the Code directory to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../Code')))
 
+from sampler import Sampler, Snapshot
 from plugins.fan_pwm_plugin import FanPwmPlugin
 
-def test_fan_pwm_plugin_update():
+def make_hwmon(tmp_path, value):
+    hwmon = tmp_path / 'hwmon' / 'hwmon0'
+    hwmon.mkdir(parents=True)
+    (hwmon / 'pwm1').write_text(value)
+    return tmp_path / 'hwmon'
+
+def test_fan_pwm_plugin_update(tmp_path):
     mock_pi_monitor = MagicMock()
-    with patch('os.listdir', return_value=['hwmon0']):
-        with patch('builtins.open', mock_open(read_data='150')) as mock_file:
-            plugin = FanPwmPlugin()
-            plugin.update(mock_pi_monitor)
-            mock_file.assert_called_once_with('/sys/devices/platform/cooling_fan/hwmon/hwmon0/pwm1', 'r')
-            assert plugin.fan_pwm == 150
-
-def test_fan_pwm_plugin_update_exception():
+    mock_pi_monitor.sampler = Sampler(thermal_path=str(tmp_path / 'temp'), hwmon_base=str(make_hwmon(tmp_path, '150\n')))
+
+    plugin = FanPwmPlugin()
+    plugin.update(mock_pi_monitor)
+    assert plugin.fan_pwm == 150
+    mock_pi_monitor.sampler.close()
+
+def test_fan_pwm_plugin_update_exception(tmp_path):
     mock_pi_monitor = MagicMock()
-    with patch('os.listdir', return_value=['hwmon0']):
-        with patch('builtins.open', side_effect=IOError):
-            plugin = FanPwmPlugin()
-            plugin.update(mock_pi_monitor)
-            assert plugin.fan_pwm == -1
+    mock_pi_monitor.sampler = Sampler(thermal_path=str(tmp_path / 'temp'), hwmon_base=str(make_hwmon(tmp_path, 'garbage')))
 
-def test_fan_pwm_plugin_update_no_hwmon_dir():
+    plugin = FanPwmPlugin()
+    plugin.update(mock_pi_monitor)
+    assert plugin.fan_pwm == -1
+
+def test_fan_pwm_plugin_update_no_hwmon_dir(tmp_path):
     mock_pi_monitor = MagicMock()
-    with patch('os.listdir', return_value=[]):
-        with patch('builtins.open', mock_open()):
-            plugin = FanPwmPlugin()
-            plugin.update(mock_pi_monitor)
-            assert plugin.fan_pwm == -1
\ No newline at end of file
+    mock_pi_monitor.sampler = Sampler(thermal_path=str(tmp_path / 'temp'), hwmon_base=str(tmp_path))
+
+    plugin = FanPwmPlugin()
+    plugin.update(mock_pi_monitor)
+    assert plugin.fan_pwm == -1
+
+import asyncio
+
+def test_fan_pwm_plugin_update_async(tmp_path):
+    mock_pi_monitor = MagicMock()
+    mock_pi_monitor.sampler = Sampler(thermal_path=str(tmp_path / 'temp'), hwmon_base=str(make_hwmon(tmp_path, '80')))
+
+    plugin = FanPwmPlugin()
+    asyncio.run(plugin.update_async(mock_pi_monitor))
+    assert plugin.fan_pwm == 80
+    mock_pi_monitor.sampler.close()
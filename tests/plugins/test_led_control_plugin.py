@@ -18,17 +18,23 @@ def test_led_control_plugin_init():
 
 import logging
 
+def analytic_color(plugin, elapsed, hue_rate, breathing_rate):
+    # The curve the lookup tables are sampled from
+    brightness = (math.sin(elapsed * breathing_rate) + 1) / 2
+    r, g, b = plugin.hsv_to_rgb(elapsed * hue_rate, 1, 1)
+    return r * brightness, g * brightness, b * brightness
+
 def test_led_control_plugin_rainbow_fade(caplog):
     mock_expansion = MagicMock()
     
-    with patch('time.time') as mock_time:
-        mock_time.return_value = 1.0
+    with patch('time.monotonic') as mock_time:
+        mock_time.return_value = 0.0 # Animation starts when the mode is set
         
         plugin = LedControlPlugin(mock_expansion)
         plugin.set_mode('rainbow_fade') # Ensure rainbow_fade is the current mode
         mock_expansion.set_led_mode.assert_called_once_with(1) # Assert set_led_mode is called
         mock_expansion.reset_mock() # Reset mock to only count calls within update
-        plugin.start_time = 0.0 # for predictable calculation
+        mock_time.return_value = 1.0
         
         mock_pi_monitor = MagicMock() # Not directly used in this method
         
@@ -36,43 +42,36 @@ def test_led_control_plugin_rainbow_fade(caplog):
             plugin.update(mock_pi_monitor)
         
         # Expected values based on time = 1.0, start_time = 0.0, hue_factor = 0.02
-        brightness = (math.sin(1.0) + 1) / 2
-        hue = 0.02
-        r, g, b = plugin.hsv_to_rgb(hue, 1, 1)
-        r = int(r * brightness)
-        g = int(g * brightness)
-        b = int(b * brightness)
-        
+        r, g, b = LedControlPlugin.EFFECTS['rainbow_fade'].color_at(1.0)
         mock_expansion.set_all_led_color.assert_called_once_with(r, g, b)
-        assert f"Rainbow Fade - Setting LED color to: r={r}, g={g}, b={b}" in caplog.text
+        for actual, expected in zip((r, g, b), analytic_color(plugin, 1.0, 0.02, 1)):
+            assert abs(actual - expected) <= 6
+        # No per-frame logging
+        assert "Setting LED color" not in caplog.text
 
 def test_led_control_plugin_rgb_strobe(caplog):
     mock_expansion = MagicMock()
     
-    with patch('time.time') as mock_time:
-        mock_time.return_value = 1.0
+    with patch('time.monotonic') as mock_time:
+        mock_time.return_value = 0.0 # Animation starts when the mode is set
         
         plugin = LedControlPlugin(mock_expansion)
         plugin.set_mode('rgb_strobe') # Ensure rgb_strobe is the current mode
         mock_expansion.set_led_mode.assert_called_once_with(1) # Assert set_led_mode is called
         mock_expansion.reset_mock() # Reset mock to only count calls within update
-        plugin.start_time = 0.0 # for predictable calculation
+        mock_time.return_value = 1.0
         
         mock_pi_monitor = MagicMock() # Not directly used in this method
         
         with caplog.at_level(logging.DEBUG):
-            # Expected values based on time = 1.0, start_time = 0.0, hue_factor = 0.5, brightness_factor = 5
-            brightness = (math.sin(1.0 * 5) + 1) / 2
-            hue = 0.5
-            r, g, b = plugin.hsv_to_rgb(hue, 1, 1)
-            r = int(r * brightness)
-            g = int(g * brightness)
-            b = int(b * brightness)
-            
             plugin.update(mock_pi_monitor)
         
+        # Expected values based on time = 1.0, start_time = 0.0, hue_factor = 0.5, brightness_factor = 5
+        r, g, b = LedControlPlugin.EFFECTS['rgb_strobe'].color_at(1.0)
         mock_expansion.set_all_led_color.assert_called_once_with(r, g, b)
-        assert f"RGB Strobe - Setting LED color to: r={r}, g={g}, b={b}" in caplog.text
+        for actual, expected in zip((r, g, b), analytic_color(plugin, 1.0, 0.5, 5)):
+            assert abs(actual - expected) <= 6
+        assert "Setting LED color" not in caplog.text
 
 def test_led_control_plugin_off_mode(caplog):
     mock_expansion = MagicMock()
@@ -152,3 +151,23 @@ def test_hsv_to_rgb():
     
     r, g, b = plugin.hsv_to_rgb(5/6, 1, 1) # Magenta
     assert (r, g, b) == (255, 0, 255)
+
+def test_cpu_meter_mode_shows_per_core_load():
+    mock_expansion = MagicMock()
+    plugin = LedControlPlugin(mock_expansion)
+    plugin.set_mode('cpu_meter')
+
+    mock_pi_monitor = MagicMock()
+    mock_pi_monitor.plugins = {'cpu_monitor': MagicMock(per_core_usage=(0.0, 100.0, 0.0, 100.0))}
+    plugin.update(mock_pi_monitor)
+
+    mock_expansion.set_led_colors.assert_called_once_with(((0, 255, 0), (255, 0, 0), (0, 255, 0), (255, 0, 0)))
+
+def test_chase_mode_uses_per_led_writes():
+    mock_expansion = MagicMock()
+    plugin = LedControlPlugin(mock_expansion)
+    plugin.set_mode('chase')
+    plugin.update(MagicMock())
+
+    mock_expansion.set_led_colors.assert_called_once()
+    mock_expansion.set_all_led_color.assert_not_called()
@@ -1,21 +1,21 @@
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import MagicMock
 import sys
 import os
 
 # Add the Code directory to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../Code')))
 
+from sampler import Sampler, Snapshot
 from plugins.memory_monitor_plugin import MemoryMonitorPlugin
 
 def test_memory_monitor_plugin_update():
-    with patch('psutil.virtual_memory') as mock_virtual_memory:
-        mock_memory = MagicMock()
-        mock_memory.percent = 75.0
-        mock_virtual_memory.return_value = mock_memory
-        
-        plugin = MemoryMonitorPlugin()
-        plugin.update()
-        
-        mock_virtual_memory.assert_called_once()
-        assert plugin.memory_usage == 75.0
+    mock_pi_monitor = MagicMock()
+    mock_pi_monitor.sampler = MagicMock(spec=Sampler)
+    mock_pi_monitor.sampler.snapshot.return_value = Snapshot(0.0, memory_usage=75.0)
+
+    plugin = MemoryMonitorPlugin()
+    plugin.update(mock_pi_monitor)
+
+    mock_pi_monitor.sampler.snapshot.assert_called_once()
+    assert plugin.memory_usage == 75.0
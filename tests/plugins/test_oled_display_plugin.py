@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import MagicMock, call
+from unittest.mock import MagicMock, call, patch
 import sys
 import os
 
@@ -40,7 +40,10 @@ def mock_pi_monitor():
         'pc_temp': "PC TEMP: {}C",
         'fan_mode': "FAN Mode: {}",
         'fan_duty': "FAN Duty: {}%",
-        'led_mode': "LED Mode: {}"
+        'led_mode': "LED Mode: {}",
+        'cores': "CORE {}",
+        'cpu_wait': "IO{}% IRQ{}% ST{}%",
+        'process': "{} {}%"
     }
     mock_pi_monitor.get_raspberry_date.return_value = "2025-12-24"
     mock_pi_monitor.get_raspberry_weekday.return_value = "Wednesday"
@@ -105,14 +108,96 @@ def test_oled_display_plugin_screen_cycling(mock_pi_monitor):
     mock_oled = MagicMock()
     plugin = OledDisplayPlugin(mock_oled)
     assert plugin.oled_screen == 0
-    plugin.update(mock_pi_monitor)
-    assert plugin.oled_screen == 1
-    plugin.update(mock_pi_monitor) # This will not trigger the screen change
-    assert plugin.oled_screen == 1
-    plugin.update(mock_pi_monitor) # This will not trigger the screen change
-    assert plugin.oled_screen == 1
-    plugin.update(mock_pi_monitor) # This will trigger the screen change
+    # The scheduler calls update() once per screen period, so every call redraws
+    with patch('plugins.oled_display_plugin.time.monotonic', side_effect=[0.0, 3.0, 6.0]):
+        plugin.update(mock_pi_monitor)
+        assert plugin.oled_screen == 1
+        plugin.update(mock_pi_monitor)
+        assert plugin.oled_screen == 2
+        plugin.update(mock_pi_monitor)
+        assert plugin.oled_screen == 0
+    assert mock_oled.show.call_count == 3
+
+def test_oled_display_plugin_requested_runs_keep_the_rotation(mock_pi_monitor):
+    mock_oled = MagicMock()
+    plugin = OledDisplayPlugin(mock_oled)
+    with patch('plugins.oled_display_plugin.time.monotonic', side_effect=[0.0, 1.0, 2.0, 3.0]):
+        plugin.update(mock_pi_monitor)  # Scheduled: screen 0
+        mock_pi_monitor.plugins['cpu_monitor'].cpu_usage = 60.0
+        plugin.update(mock_pi_monitor)  # Requested: screen 0 again, with the new value
+        plugin.update(mock_pi_monitor)  # Requested: nothing changed
+        assert plugin.oled_screen == 1
+        mock_oled.draw_text.assert_any_call("CPU: 60.0%", position=(0, 16), font_size=12)
+        assert mock_oled.show.call_count == 2
+
+        plugin.update(mock_pi_monitor)  # Scheduled: screen 1
     assert plugin.oled_screen == 2
-    plugin.oled_counter = 0 # Reset counter to trigger screen change
+    mock_oled.draw_text.assert_any_call("Date: 2025-12-24", position=(0, 0), font_size=12)
+
+def test_oled_display_plugin_cores_screen(mock_pi_monitor):
+    cpu_plugin = mock_pi_monitor.plugins['cpu_monitor']
+    cpu_plugin.per_core_usage = (12.0, 99.6)
+    cpu_plugin.iowait = 4.2
+    cpu_plugin.irq = 1.0
+    cpu_plugin.steal = 0.0
+    cpu_plugin.top_processes = ((42, 'python3', 97.5), (7, 'kworker/0:1-events', 3.0), (1, 'init', 0.1))
+    mock_oled = MagicMock()
+    plugin = OledDisplayPlugin(mock_oled)
+    plugin.oled_screen = 3
+
+    plugin.update(mock_pi_monitor)
+
+    mock_oled.draw_text.assert_has_calls([
+        call("CORE 12 99", position=(0, 0), font_size=12),
+        call("IO4% IRQ1% ST0%", position=(0, 16), font_size=12),
+        call("python3 97%", position=(0, 32), font_size=12),
+        call("kworker/0: 3%", position=(0, 48), font_size=12),
+    ])
+    assert plugin.oled_screen == 0
+
+def test_oled_display_plugin_throttle_alert(mock_pi_monitor):
+    throttle_monitor = MagicMock()
+    throttle_monitor.under_voltage = False
+    throttle_monitor.thermal_throttled = True
+    throttle_monitor.cpu_freq = 1500
+    mock_pi_monitor.plugins['throttle_monitor'] = throttle_monitor
+    mock_oled = MagicMock()
+    plugin = OledDisplayPlugin(mock_oled)
+
+    plugin.update(mock_pi_monitor)
+    mock_oled.draw_text.assert_any_call("! THROTTLED 1500MHz", position=(0, 0), font_size=12)
+
+    throttle_monitor.under_voltage = True
+    plugin.oled_screen = 0
+    plugin.update(mock_pi_monitor)
+    mock_oled.draw_text.assert_any_call("! UNDER-VOLTAGE", position=(0, 0), font_size=12)
+
+def test_oled_display_plugin_period():
+    assert OledDisplayPlugin.period == 3.0
+
+def test_oled_display_plugin_skips_unchanged_screen(mock_pi_monitor):
+    mock_oled = MagicMock()
+    plugin = OledDisplayPlugin(mock_oled)
+    with patch('plugins.oled_display_plugin.time.monotonic', side_effect=[0.0, 3.0, 6.0]):
+        plugin.update(mock_pi_monitor)  # Screen 0
+        plugin.update(mock_pi_monitor)  # Screen 1
+        plugin.update(mock_pi_monitor)  # Screen 2
+    mock_oled.reset_mock()
+
+    # Security screen stays up; only redraw when its content changes
+    security_plugin = MagicMock()
+    security_plugin.current_mode = 'wifi_scan'
+    security_plugin.current_phase = 'WiFi Scan'
+    security_plugin.current_target = 'wlan1'
+    security_plugin.current_message = None
+    security_plugin.current_progress = None
+    security_plugin.details = {}
+    mock_pi_monitor.plugins['security_status'] = security_plugin
+    plugin.update(mock_pi_monitor)
+    plugin.update(mock_pi_monitor)
+    assert mock_oled.show.call_count == 1
+
+    security_plugin.current_target = 'wlan0'
     plugin.update(mock_pi_monitor)
-    assert plugin.oled_screen == 0
\ No newline at end of file
+    assert mock_oled.show.call_count == 2
+    mock_oled.draw_text.assert_any_call("TGT: wlan0", position=(0, 16), font_size=12)
@@ -0,0 +1,142 @@
+import pytest
+from unittest.mock import MagicMock, patch
+import json
+import sys
+import os
+
+# Add the Code directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../Code')))
+
+from plugins.security_status_plugin import SecurityStatusPlugin
+from status_channel import StatusClient
+
+@pytest.fixture
+def socket_path(tmp_path):
+    path = str(tmp_path / 'cyberdeck_status.sock')
+    with patch('status_channel.SOCKET_PATH', path):
+        yield path
+
+@pytest.fixture
+def status_file(tmp_path, socket_path):
+    path = tmp_path / 'cyberdeck_status.json'
+    with patch('plugins.security_status_plugin.STATUS_FILE', path):
+        yield path
+
+def write_status(path, **status):
+    with open(path, 'w') as f:
+        json.dump(status, f)
+
+def test_status_file_parsed_only_when_written(status_file):
+    write_status(status_file, mode='scanning', progress=10)
+    plugin = SecurityStatusPlugin(MagicMock(), MagicMock())
+    pi_monitor = MagicMock()
+
+    with patch('plugins.security_status_plugin.json.load', wraps=json.load) as mock_load:
+        plugin.update(pi_monitor)
+        plugin.update(pi_monitor)
+        plugin.update(pi_monitor)
+        assert mock_load.call_count == 1
+        assert plugin.current_mode == 'scanning'
+
+        write_status(status_file, mode='scanning', progress=20)
+        plugin.update(pi_monitor)
+        assert mock_load.call_count == 2
+        assert plugin.current_progress == 20
+
+def test_status_change_requests_oled_update(status_file):
+    write_status(status_file, mode='recon')
+    plugin = SecurityStatusPlugin(MagicMock(), MagicMock())
+    pi_monitor = MagicMock()
+
+    plugin.update(pi_monitor)
+    pi_monitor.request_update.assert_called_once_with('oled_display')
+
+    pi_monitor.request_update.reset_mock()
+    plugin.update(pi_monitor)
+    pi_monitor.request_update.assert_not_called()
+
+def test_missing_status_file_keeps_idle(status_file):
+    led_control = MagicMock()
+    expansion = MagicMock()
+    plugin = SecurityStatusPlugin(expansion, led_control)
+
+    plugin.update(MagicMock())
+
+    assert plugin.current_mode == 'idle'
+    expansion.set_all_led_color.assert_not_called()
+
+def test_status_channel_updates_applied_in_order(status_file, socket_path):
+    plugin = SecurityStatusPlugin(MagicMock(), MagicMock())
+    pi_monitor = MagicMock()
+    plugin.update(pi_monitor)
+
+    client = StatusClient(socket_path)
+    client.send('scanning', phase='Nmap', target='10.0.0.0/24', progress=0)
+    for progress in range(1, 200):
+        client.send('scanning', progress=progress)
+    plugin.update(pi_monitor)
+    assert client.flush()
+    client.close()
+
+    pi_monitor.reset_mock()
+    plugin.update(pi_monitor)
+
+    assert plugin.current_mode == 'scanning'
+    assert plugin.current_phase == 'Nmap'
+    assert plugin.current_target == '10.0.0.0/24'
+    assert plugin.current_progress == 199
+    assert 'seq' not in plugin.status
+    pi_monitor.request_update.assert_called_once_with('oled_display')
+    plugin.channel.close()
+
+def test_mode_effect_drives_leds(status_file):
+    write_status(status_file, mode='alert')
+    expansion = MagicMock()
+    plugin = SecurityStatusPlugin(expansion)
+
+    with patch('time.monotonic', return_value=100.0):
+        plugin.update(MagicMock())
+        expansion.set_all_led_color.assert_called_with(255, 0, 0)
+    with patch('time.monotonic', return_value=100.3):
+        plugin.update(MagicMock())
+        expansion.set_all_led_color.assert_called_with(51, 0, 0)
+
+def test_status_layer_overrides_led_mode_and_idle_restores_it(status_file):
+    from plugins.led_control_plugin import LedControlPlugin
+    expansion = MagicMock()
+    led_control = LedControlPlugin(expansion)
+    led_control.set_mode('off')
+    plugin = SecurityStatusPlugin(expansion, led_control)
+    assert plugin.compositor is led_control.compositor
+
+    write_status(status_file, mode='safe')
+    plugin.update(MagicMock())
+    assert led_control.compositor.active_layer() == 'status'
+
+    # LED plugin running after the security plugin still shows the status color
+    expansion.reset_mock()
+    led_control.update(MagicMock())
+    r, g, b = expansion.set_all_led_color.call_args.args
+    assert g > 0 and r == 0 and b == 0
+
+    write_status(status_file, mode='idle')
+    plugin.update(MagicMock())
+    assert led_control.compositor.active_layer() == 'base'
+    assert led_control.mode == 'off'
+
+def test_progress_shown_on_leds(status_file):
+    write_status(status_file, mode='safe', progress=50, progress_max=100)
+    expansion = MagicMock()
+    plugin = SecurityStatusPlugin(expansion)
+
+    with patch('time.monotonic', return_value=0.0):
+        plugin.update(MagicMock())
+    frame = expansion.set_led_colors.call_args.args[0]
+    assert frame[0] != (0, 0, 0) and frame[1] != (0, 0, 0)
+    assert frame[2] == frame[3] == (0, 0, 0)
+
+    # Dropping the progress value restores the plain mode effect
+    write_status(status_file, mode='safe', progress=None)
+    expansion.reset_mock()
+    plugin.update(MagicMock())
+    expansion.set_all_led_color.assert_called_once()
@@ -0,0 +1,138 @@
+import pytest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+
+# Add the Code directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../Code')))
+
+from plugins.throttle_monitor_plugin import ThrottleMonitorPlugin, UNDER_VOLTAGE, THROTTLED
+
+@pytest.fixture
+def sysfs(tmp_path):
+    for policy, freq in (('policy0', '2400000'), ('policy4', '1500000')):
+        path = tmp_path / 'cpufreq' / policy
+        path.mkdir(parents=True)
+        (path / 'scaling_cur_freq').write_text(freq + '\n')
+        (path / 'scaling_max_freq').write_text('2400000\n')
+        (path / 'cpuinfo_max_freq').write_text('2400000\n')
+    for zone, kind, temp in (('thermal_zone0', 'cpu-thermal', '61250'), ('thermal_zone1', 'gpu-thermal', '58000')):
+        path = tmp_path / 'thermal' / zone
+        path.mkdir(parents=True)
+        (path / 'type').write_text(kind + '\n')
+        (path / 'temp').write_text(temp + '\n')
+    firmware = tmp_path / 'firmware'
+    firmware.mkdir()
+    (firmware / 'get_throttled').write_text('0\n')
+    return tmp_path
+
+def make_plugin(sysfs, throttled=True):
+    patterns = (str(sysfs / 'firmware' / 'get_throttled'),) if throttled else ()
+    return ThrottleMonitorPlugin(cpufreq_base=str(sysfs / 'cpufreq'), thermal_base=str(sysfs / 'thermal'),
+                                 throttled_patterns=patterns, hwmon_class=str(sysfs / 'hwmon'))
+
+def test_throttle_monitor_reads_clocks_and_zones(sysfs):
+    plugin = make_plugin(sysfs)
+    plugin.update()
+
+    assert plugin.clocks == {'policy0': 2400, 'policy4': 1500}
+    assert plugin.cpu_freq == 2400
+    assert plugin.zone_temperatures == {'cpu-thermal': 61.25, 'gpu-thermal': 58.0}
+    assert plugin.max_zone_temperature == 61.25
+    assert plugin.throttle_flags == 0
+    assert not plugin.thermal_throttled
+    assert list(plugin.events) == []
+    plugin.close()
+
+def test_throttle_monitor_records_transitions(sysfs):
+    plugin = make_plugin(sysfs)
+    get_throttled = sysfs / 'firmware' / 'get_throttled'
+
+    get_throttled.write_text('50005\n')  # Under-voltage and throttled, both also since boot
+    with patch('plugins.throttle_monitor_plugin.time.time', return_value=100.0):
+        plugin.update()
+    plugin.update()  # No change, no event
+    get_throttled.write_text('50001\n')
+    with patch('plugins.throttle_monitor_plugin.time.time', return_value=160.0):
+        plugin.update()
+
+    assert plugin.throttle_flags == UNDER_VOLTAGE
+    assert plugin.under_voltage and not plugin.thermal_throttled
+    assert [tuple(event) for event in plugin.events] == [
+        (100.0, 'under_voltage', True),
+        (100.0, 'throttled', True),
+        (160.0, 'throttled', False),
+    ]
+    assert plugin.recent_events(1)[0].condition == 'throttled'
+    plugin.close()
+
+def test_throttle_monitor_detects_capped_clock(sysfs):
+    plugin = make_plugin(sysfs, throttled=False)
+    (sysfs / 'cpufreq' / 'policy0' / 'scaling_max_freq').write_text('1800000\n')
+    (sysfs / 'thermal' / 'thermal_zone0' / 'temp').write_text('82000\n')
+    plugin.update()
+    assert plugin.thermal_throttled
+    assert plugin.events[-1].condition == 'freq_capped'
+    plugin.close()
+
+def test_throttle_monitor_ignores_user_cap_with_firmware_flags(sysfs):
+    plugin = make_plugin(sysfs)
+    (sysfs / 'cpufreq' / 'policy0' / 'scaling_max_freq').write_text('1800000\n')
+    plugin.update()
+    assert plugin.throttle_flags == 0
+    assert plugin.thermal_throttled is False
+    assert list(plugin.events) == []
+    plugin.close()
+
+def test_throttle_monitor_under_voltage_is_not_thermal(sysfs):
+    plugin = make_plugin(sysfs)
+    get_throttled = sysfs / 'firmware' / 'get_throttled'
+    (sysfs / 'thermal' / 'thermal_zone0' / 'temp').write_text('82000\n')
+
+    get_throttled.write_text('50007\n')  # Under-voltage, capped and throttled
+    plugin.update()
+    assert plugin.under_voltage
+    assert plugin.thermal_throttled is False
+
+    get_throttled.write_text('6\n')  # Capped and throttled while hot
+    plugin.update()
+    assert plugin.thermal_throttled is True
+
+    (sysfs / 'thermal' / 'thermal_zone0' / 'temp').write_text('61000\n')
+    plugin.update()
+    assert plugin.thermal_throttled is False  # Not hot enough to be thermal
+
+    get_throttled.write_text('9\n')  # The soft temperature limit always counts
+    plugin.update()
+    assert plugin.thermal_throttled is True
+    plugin.close()
+
+def test_throttle_monitor_under_voltage_from_hwmon(sysfs):
+    hwmon = sysfs / 'hwmon' / 'hwmon1'
+    hwmon.mkdir(parents=True)
+    (hwmon / 'name').write_text('rpi_volt\n')
+    (hwmon / 'in0_lcrit_alarm').write_text('1\n')
+    plugin = make_plugin(sysfs, throttled=False)
+    plugin.update()
+    assert plugin.under_voltage
+    plugin.close()
+
+def test_throttle_monitor_without_sources(tmp_path):
+    plugin = make_plugin(tmp_path, throttled=False)
+    plugin.update()
+    assert plugin.cpu_freq == 0
+    assert plugin.zone_temperatures == {}
+    assert plugin.throttle_flags == 0
+
+def test_throttle_monitor_state_survives_reload(sysfs):
+    plugin = make_plugin(sysfs)
+    (sysfs / 'firmware' / 'get_throttled').write_text('4\n')
+    plugin.update()
+
+    reloaded = make_plugin(sysfs)
+    reloaded.import_state(plugin.export_state())
+    reloaded.update()
+    assert reloaded.throttle_flags == THROTTLED
+    assert len(reloaded.events) == 1
+    plugin.close()
+    reloaded.close()
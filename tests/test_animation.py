@@ -0,0 +1,62 @@
+import pytest
+from unittest.mock import patch, MagicMock
+import sys
+import os
+import shutil
+
+# Add the Code directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../Code')))
+
+from PIL import Image
+from animation import Animation, AnimationCache, decode_gif, play
+
+GIF_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '../Code/picture/1.gif'))
+
+def test_decode_gif():
+    animation = decode_gif(GIF_PATH, (128, 64))
+    with Image.open(GIF_PATH) as gif:
+        assert len(animation.frames) == gif.n_frames
+    assert all(len(frame) == 128 * 64 // 8 for frame in animation.frames)
+    assert all(delay > 0 for delay in animation.delays)
+    assert animation.last_image.size == (128, 64)
+
+def test_cache_reuses_decoded_frames(tmp_path):
+    path = tmp_path / 'anim.gif'
+    shutil.copy(GIF_PATH, path)
+    mock_decode = MagicMock(wraps=decode_gif)
+    cache = AnimationCache(decoder=mock_decode)
+    first = cache.get(str(path), (128, 64))
+    assert cache.get(str(path), (128, 64)) is first
+    assert mock_decode.call_count == 1
+
+    # A rewritten file is decoded again
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1_000_000))
+    cache.get(str(path), (128, 64))
+    assert mock_decode.call_count == 2
+
+def test_cache_missing_file():
+    with pytest.raises(FileNotFoundError):
+        AnimationCache().get('/nonexistent.gif', (128, 64))
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+def test_play_compensates_for_transfer_time():
+    clock = FakeClock()
+    animation = Animation((b'a', b'b', b'c'), (0.1, 0.1, 0.1), None)
+    shown = []
+
+    def push_frame(frame):
+        shown.append((frame, round(clock.now, 6)))
+        clock.now += 0.03  # Transfer time
+
+    play(animation, push_frame, clock=clock, sleep=clock.sleep)
+    # Frames start exactly one delay apart despite the transfer time
+    assert shown == [(b'a', 0.0), (b'b', 0.1), (b'c', 0.2)]
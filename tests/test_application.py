@@ -1,12 +1,15 @@
 import pytest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, AsyncMock
 import sys
 import os
+import asyncio
+import time
 
 # Add the Code directory to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../Code')))
 
 from application import Pi_Monitor
+from plugins.base_plugin import BasePlugin
 
 def test_pi_monitor_initialization():
     mock_oled = MagicMock()
@@ -64,4 +67,254 @@ def test_run_monitor_loop_calls_plugins():
         mock_plugin5.update.assert_called_once()
         mock_plugin6.update.assert_called_once()
         mock_plugin7.update.assert_called_once()
-        mock_plugin8.update.assert_called_once()
\ No newline at end of file
+        mock_plugin8.update.assert_called_once()
+
+def test_build_schedule_uses_plugin_periods():
+    with patch('application.load_plugins') as mock_load_plugins:
+        fast_plugin = MagicMock()
+        fast_plugin.period = 0.05
+        mock_plugin = MagicMock()  # MagicMock period is not a number
+        mock_load_plugins.return_value = {'led_control': fast_plugin, 'other': mock_plugin}
+
+        monitor = Pi_Monitor(MagicMock(), MagicMock())
+        monitor.build_schedule()
+
+        assert 'led_control' in monitor.scheduler
+        assert 'other' in monitor.scheduler
+        assert monitor.plugin_period(fast_plugin) == 0.05
+        assert monitor.plugin_period(mock_plugin) == Pi_Monitor.DEFAULT_PERIOD
+
+def test_run_monitor_loop_async_isolates_blocking_plugins():
+    class BlockingPlugin(BasePlugin):
+        period = 0.01
+
+        def __init__(self):
+            super().__init__()
+            self.calls = 0
+
+        def update(self, pi_monitor=None):
+            self.calls += 1
+            time.sleep(0.2)  # Simulates a stuck sensor
+
+    class FastPlugin(BasePlugin):
+        period = 0.01
+
+        def __init__(self):
+            super().__init__()
+            self.calls = 0
+
+        async def update_async(self, pi_monitor=None):
+            self.calls += 1
+            if self.calls == 10:
+                pi_monitor.stop_event.set()
+
+    with patch('application.load_plugins') as mock_load_plugins:
+        blocking_plugin = BlockingPlugin()
+        fast_plugin = FastPlugin()
+        mock_load_plugins.return_value = {'blocking': blocking_plugin, 'fast': fast_plugin}
+        monitor = Pi_Monitor(MagicMock(), MagicMock())
+
+        asyncio.run(asyncio.wait_for(monitor.run_monitor_loop_async(), timeout=5))
+
+        # The fast plugin kept its cadence while the blocking one was stuck
+        assert fast_plugin.calls == 10
+        assert blocking_plugin.calls == 1
+
+def test_expansion_getters_use_cached_snapshot():
+    from expansion import ExpansionSnapshot
+    with patch('application.load_plugins', return_value={}):
+        mock_expansion = MagicMock()
+        mock_expansion.snapshot.return_value = ExpansionSnapshot(
+            timestamp=time.monotonic(), temp=40, fan_mode=1, fan0_duty=255,
+            fan1_duty=255, fan_frequency=50, fan_threshold=(30, 45), led_mode=1)
+        monitor = Pi_Monitor(MagicMock(), mock_expansion)
+
+        assert monitor.get_computer_temperature() == 40
+        assert monitor.get_computer_fan_mode() == 1
+        assert monitor.get_computer_fan_duty() == 255
+        assert monitor.get_computer_led_mode() == 1
+        # One bus pass serves all four readings
+        mock_expansion.snapshot.assert_called_once()
+        mock_expansion.get_temp.assert_not_called()
+
+        # A stale snapshot is refreshed on demand
+        assert monitor.get_expansion_snapshot(max_age=-1) is not None
+        assert mock_expansion.snapshot.call_count == 2
+
+def test_expansion_getters_on_bus_error():
+    with patch('application.load_plugins', return_value={}):
+        mock_expansion = MagicMock()
+        mock_expansion.snapshot.side_effect = IOError("bus error")
+        monitor = Pi_Monitor(MagicMock(), mock_expansion)
+        assert monitor.get_computer_temperature() == 0
+
+def test_run_plugin_records_metrics():
+    class TempPlugin(BasePlugin):
+        metrics = ('cpu_temperature',)
+
+        def update(self, pi_monitor=None):
+            self.cpu_temperature = 51.5
+
+    with patch('application.load_plugins', return_value={}):
+        monitor = Pi_Monitor(MagicMock(), MagicMock())
+        monitor.run_plugin('cpu_temp', TempPlugin())
+        assert monitor.metrics.latest('cpu_temp.cpu_temperature') == 51.5
+
+def test_request_update_wakes_async_plugin():
+    class SlowPlugin(BasePlugin):
+        period = 60.0  # Would never run twice without a wakeup
+
+        def __init__(self):
+            super().__init__()
+            self.calls = 0
+
+        async def update_async(self, pi_monitor=None):
+            self.calls += 1
+            if self.calls == 2:
+                pi_monitor.stop_event.set()
+
+    class TriggerPlugin(BasePlugin):
+        period = 0.01
+
+        def update(self, pi_monitor=None):
+            pi_monitor.request_update('slow')
+
+    with patch('application.load_plugins') as mock_load_plugins:
+        slow_plugin = SlowPlugin()
+        mock_load_plugins.return_value = {'slow': slow_plugin, 'trigger': TriggerPlugin()}
+        monitor = Pi_Monitor(MagicMock(), MagicMock())
+
+        asyncio.run(asyncio.wait_for(monitor.run_monitor_loop_async(), timeout=5))
+
+        assert slow_plugin.calls == 2
+
+def test_request_update_triggers_scheduled_plugin():
+    with patch('application.load_plugins') as mock_load_plugins:
+        mock_load_plugins.return_value = {'oled_display': MagicMock()}
+        monitor = Pi_Monitor(MagicMock(), MagicMock())
+        monitor.build_schedule()
+        monitor.scheduler.run_pending()
+
+        assert monitor.request_update('oled_display')
+        assert monitor.scheduler.time_until_next() == 0.0
+        assert not monitor.request_update('missing')
+
+def test_led_compositor_renders_after_plugins():
+    with patch('application.load_plugins') as mock_load_plugins:
+        mock_load_plugins.return_value = {'led_control': MagicMock()}
+        monitor = Pi_Monitor(MagicMock(), MagicMock())
+
+        # Plugins draw on the monitor's compositor
+        assert mock_load_plugins.call_args.args[2] is monitor.leds
+        jobs = [job for job in monitor.housekeeping_jobs() if job[0] == '_led_render']
+        assert jobs == [('_led_render', monitor.leds.render, Pi_Monitor.LED_FRAME_PERIOD, True)]
+
+def test_plugin_levels_run_producers_before_consumers():
+    from plugins.cpu_monitor_plugin import CpuMonitorPlugin
+    from plugins.cpu_temp_plugin import CpuTempPlugin
+    from plugins.fan_control_plugin import FanControlPlugin
+    from plugins.oled_display_plugin import OledDisplayPlugin
+    with patch('application.load_plugins') as mock_load_plugins:
+        # Consumers are loaded first on purpose
+        mock_load_plugins.return_value = {
+            'oled_display': MagicMock(spec=OledDisplayPlugin, consumes=OledDisplayPlugin.consumes),
+            'fan_control': MagicMock(spec=FanControlPlugin, produces=FanControlPlugin.produces, consumes=FanControlPlugin.consumes),
+            'cpu_temp': MagicMock(spec=CpuTempPlugin, produces=CpuTempPlugin.produces, consumes=()),
+            'cpu_monitor': MagicMock(spec=CpuMonitorPlugin, produces=CpuMonitorPlugin.produces, consumes=()),
+        }
+        monitor = Pi_Monitor(MagicMock(), MagicMock())
+
+        assert monitor.plugin_levels() == {'cpu_temp': 0, 'cpu_monitor': 0, 'fan_control': 1, 'oled_display': 1}
+        assert monitor.build_schedule() == 2
+
+def test_plugin_levels_reject_cycles():
+    with patch('application.load_plugins') as mock_load_plugins:
+        mock_load_plugins.return_value = {
+            'a': MagicMock(produces=('x',), consumes=('y',)),
+            'b': MagicMock(produces=('y',), consumes=('x',)),
+        }
+        monitor = Pi_Monitor(MagicMock(), MagicMock())
+        with pytest.raises(ValueError):
+            monitor.plugin_levels()
+
+def test_hot_reload_job_runs_before_plugins():
+    with patch('application.load_plugins', return_value={}), patch('application.PluginReloader') as mock_reloader:
+        monitor = Pi_Monitor(MagicMock(), MagicMock(), hot_reload=True)
+        mock_reloader.return_value.check.return_value = ['led_control']
+
+        jobs = {job[0]: job for job in monitor.housekeeping_jobs()}
+        assert jobs['_plugin_reload'] == ('_plugin_reload', monitor.reload_plugins, Pi_Monitor.RELOAD_CHECK_PERIOD, False)
+        assert monitor.reload_plugins() == ['led_control']
+
+    with patch('application.load_plugins', return_value={}):
+        assert Pi_Monitor(MagicMock(), MagicMock()).reloader is None
+
+def test_reload_waits_for_async_updates():
+    with patch('application.load_plugins', return_value={}):
+        monitor = Pi_Monitor(MagicMock(), MagicMock())
+        plugin = MagicMock(period=1.0, metrics=())
+        plugin.update_async = AsyncMock()
+
+        monitor._updates_in_flight = 1  # An update is still running
+        with monitor.paused_updates(timeout=0.01) as idle:
+            assert not idle
+            asyncio.run(monitor.run_plugin_async('plugin', plugin))
+            plugin.update_async.assert_not_called()  # No update starts during a reload
+        monitor._updates_in_flight = 0
+
+        with monitor.paused_updates() as idle:
+            assert idle
+        asyncio.run(monitor.run_plugin_async('plugin', plugin))
+        plugin.update_async.assert_awaited_once_with(monitor)
+        assert monitor._updates_in_flight == 0
+
+        monitor.reloader = MagicMock()
+        monitor.reload_plugins()
+        assert monitor.reloader.check.call_args.kwargs == {'pause': monitor.paused_updates}
+
+def test_critical_plugins_are_exempt_from_the_watchdog():
+    monitor = Pi_Monitor(MagicMock(), MagicMock())
+    assert {'fan_control', 'throttle_monitor'} <= monitor.profiler.exempt
+    assert 'oled_display' not in monitor.profiler.exempt
+    for _ in range(monitor.profiler.overrun_limit * 3):
+        monitor.profiler.record('fan_control', 1.0, 2.0)
+    assert monitor.profiler.stats('fan_control')['scale'] == 1
+
+def test_run_plugin_is_profiled():
+    with patch('application.load_plugins', return_value={}):
+        monitor = Pi_Monitor(MagicMock(), MagicMock())
+        plugin = MagicMock(period=1.0, metrics=())
+        monitor.run_plugin('cpu_monitor', plugin)
+
+        plugin.update.assert_called_once_with(monitor)
+        assert monitor.profiler.stats('cpu_monitor')['runs'] == 1
+
+        # A demoted plugin skips ticks
+        for _ in range(monitor.profiler.overrun_limit):
+            monitor.profiler.record('cpu_monitor', 1.0, 5.0)
+        monitor.run_plugin('cpu_monitor', plugin)
+        assert plugin.update.call_count == 1
+
+        monitor.expansion.cache_stats.return_value = {'hits': 3, 'misses': 1, 'hit_rate': 0.75}
+        with patch.object(monitor.logger, 'info') as mock_info:
+            monitor.log_profile_summary()
+        assert 'cpu_monitor' in mock_info.call_args.args[0]
+        assert '75% hits' in mock_info.call_args.args[0]
+
+def test_metrics_export_job_publishes_snapshot():
+    with patch('application.load_plugins', return_value={}), patch('application.MetricsExporter') as mock_exporter:
+        monitor = Pi_Monitor(MagicMock(), MagicMock(), metrics_port=9100)
+        mock_exporter.assert_called_once_with(9100, '127.0.0.1')
+        mock_exporter.return_value.start.assert_called_once()
+        assert '_metrics_export' in [job[0] for job in monitor.housekeeping_jobs()]
+
+        monitor.metrics.record('cpu_monitor.cpu_usage', 12.5)
+        monitor.export_metrics()
+        page = mock_exporter.return_value.publish.call_args.args[0]
+        assert b'cyberdeck_cpu_monitor_cpu_usage 12.5' in page
+
+        monitor.cleanup()
+        mock_exporter.return_value.stop.assert_called_once()
+
+    with patch('application.load_plugins', return_value={}):
+        assert Pi_Monitor(MagicMock(), MagicMock()).exporter is None
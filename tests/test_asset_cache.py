@@ -0,0 +1,95 @@
+import pytest
+from unittest.mock import patch
+import sys
+import os
+import shutil
+import mmap
+
+# Add the Code directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../Code')))
+
+from asset_cache import AssetCache
+from animation import decode_gif
+
+PICTURE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../Code/picture'))
+
+def test_image_round_trip(tmp_path):
+    cache = AssetCache(str(tmp_path))
+    image = cache.load_image(os.path.join(PICTURE_DIR, '2.png'), (64, 32))
+    cached = AssetCache(str(tmp_path)).load_image(os.path.join(PICTURE_DIR, '2.png'), (64, 32))
+    assert image.mode == cached.mode == '1'
+    assert cached.size == (64, 32)
+    assert cached.tobytes() == image.tobytes()
+    assert len(os.listdir(tmp_path)) == 1
+
+def test_animation_round_trip(tmp_path):
+    gif_path = os.path.join(PICTURE_DIR, '1.gif')
+    cache = AssetCache(str(tmp_path))
+    animation = cache.load_animation(gif_path, (128, 64))
+
+    restarted = AssetCache(str(tmp_path))
+    with patch('asset_cache.decode_gif') as mock_decode:
+        cached = restarted.load_animation(gif_path, (128, 64))
+        mock_decode.assert_not_called()
+    assert cached.frames == animation.frames
+    assert cached.delays == pytest.approx(animation.delays)
+    assert cached.last_image.tobytes() == animation.last_image.tobytes()
+
+def test_entries_keyed_by_content_and_size(tmp_path):
+    source = tmp_path / 'splash.png'
+    shutil.copy(os.path.join(PICTURE_DIR, '2.png'), source)
+    cache = AssetCache(str(tmp_path / 'cache'))
+    cache.load_image(str(source), (128, 64))
+    cache.load_image(str(source), (64, 32))
+    assert len(os.listdir(tmp_path / 'cache')) == 2
+
+    shutil.copy(os.path.join(PICTURE_DIR, '3.jpg'), source)  # Content changed
+    cache.load_image(str(source), (128, 64))
+    assert len(os.listdir(tmp_path / 'cache')) == 3
+    assert cache.hits == 0
+
+def test_lru_eviction(tmp_path):
+    cache = AssetCache(str(tmp_path), max_bytes=2500)  # Room for two 1 KB entries
+    for name in ('1.bmp', '2.png', '3.jpg'):
+        cache.load_image(os.path.join(PICTURE_DIR, name), (128, 64))
+    remaining = os.listdir(tmp_path)
+    assert len(remaining) == 2
+    assert not any(name.startswith(cache.source_hash(os.path.join(PICTURE_DIR, '1.bmp'))) for name in remaining)
+
+def test_corrupt_entry_is_rebuilt(tmp_path):
+    cache = AssetCache(str(tmp_path))
+    path = os.path.join(PICTURE_DIR, '1.bmp')
+    image = cache.load_image(path, (128, 64))
+    entry = os.path.join(tmp_path, os.listdir(tmp_path)[0])
+    with open(entry, 'r+b') as f:
+        f.truncate(10)
+    assert cache.load_image(path, (128, 64)).tobytes() == image.tobytes()
+    assert os.path.getsize(entry) > 10
+
+def test_hits_do_not_write_to_disk(tmp_path):
+    cache = AssetCache(str(tmp_path))
+    path = os.path.join(PICTURE_DIR, '2.png')
+    cache.load_image(path, (64, 32))
+    restarted = AssetCache(str(tmp_path))
+    with patch('asset_cache.os.utime') as mock_utime, patch('asset_cache.mmap.mmap', wraps=mmap.mmap) as mock_mmap:
+        for _ in range(5):
+            restarted.load_image(path, (64, 32))
+    mock_utime.assert_not_called()  # The entry was written less than TOUCH_INTERVAL ago
+    assert mock_mmap.call_count == 1  # Later hits are served from memory
+    assert restarted.hits == 5
+
+def test_eviction_uses_in_memory_recency(tmp_path):
+    cache = AssetCache(str(tmp_path), max_bytes=2500)  # Room for two 1 KB entries
+    first = os.path.join(PICTURE_DIR, '1.bmp')
+    cache.load_image(first, (128, 64))
+    cache.load_image(os.path.join(PICTURE_DIR, '2.png'), (128, 64))
+    entry = os.path.join(tmp_path, [name for name in os.listdir(tmp_path)
+                                    if name.startswith(cache.source_hash(first))][0])
+    cache.load_image(first, (128, 64))  # Read from disk, now kept in memory
+    os.utime(entry, (1, 1))  # Oldest on disk, but used again below
+    with patch('asset_cache.os.utime', wraps=os.utime) as mock_utime:
+        cache.load_image(first, (128, 64))
+        mock_utime.assert_not_called()
+    cache.load_image(os.path.join(PICTURE_DIR, '3.jpg'), (128, 64))
+    assert os.path.exists(entry)
+    assert os.path.getmtime(entry) > 1  # Recency was saved while evicting
@@ -0,0 +1,147 @@
+import pytest
+from unittest.mock import patch, MagicMock
+import sys
+import os
+
+# Add the Code directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../Code')))
+
+from expansion import Expansion
+
+@pytest.fixture
+def expansion():
+    with patch('smbus.SMBus') as mock_smbus:
+        board = Expansion()
+        board.bus = mock_smbus.return_value
+        yield board
+
+def test_redundant_writes_are_skipped(expansion):
+    expansion.set_all_led_color(0, 0, 0)
+    expansion.set_all_led_color(0, 0, 0)
+    expansion.set_led_mode(1)
+    expansion.set_led_mode(1)
+
+    assert expansion.bus.write_i2c_block_data.call_count == 1
+    assert expansion.bus.write_byte_data.call_count == 1
+    assert expansion.cache_stats()['hits'] == 2
+    assert expansion.cache_stats()['misses'] == 2
+
+def test_changed_value_is_written(expansion):
+    expansion.set_fan_duty(0, 0)
+    expansion.set_fan_duty(128, 128)
+    expansion.set_fan_duty(0, 0)
+    assert expansion.bus.write_i2c_block_data.call_count == 3
+
+def test_all_led_write_updates_individual_leds(expansion):
+    expansion.set_all_led_color(10, 20, 30)
+    expansion.set_led_color(2, 10, 20, 30)  # Already that color
+    assert expansion.bus.write_i2c_block_data.call_count == 1
+
+    expansion.set_led_color(2, 0, 0, 0)
+    expansion.set_all_led_color(10, 20, 30)  # LED 2 differs now, must be rewritten
+    assert expansion.bus.write_i2c_block_data.call_count == 3
+
+def test_led_select_for_read_is_not_cached(expansion):
+    expansion.get_led_color(1)
+    expansion.get_led_color(1)
+    assert expansion.bus.write_i2c_block_data.call_count == 2
+
+def test_failed_write_is_retried(expansion):
+    expansion.bus.write_byte_data.side_effect = [IOError("bus error"), None]
+    expansion.set_led_mode(1)
+    expansion.set_led_mode(1)
+    assert expansion.bus.write_byte_data.call_count == 2
+
+def test_failed_led_write_invalidates_all_leds(expansion):
+    expansion.set_all_led_color(10, 20, 30)
+    expansion.bus.write_i2c_block_data.side_effect = [IOError("bus error"), None]
+    expansion.set_led_color(2, 0, 0, 0)
+    expansion.set_all_led_color(10, 20, 30)  # LED 2 is in an unknown state
+    assert expansion.bus.write_i2c_block_data.call_count == 3
+
+def test_bus_errors_invalidate_every_register(expansion):
+    expansion.set_fan_mode(1)
+    expansion.bus.read_byte_data.side_effect = IOError("board reset")
+    with pytest.raises(IOError):
+        expansion.get_temp()
+    expansion.set_fan_mode(1)
+    assert expansion.bus.write_byte_data.call_count == 2
+
+def test_shadow_expires(expansion):
+    expired = 100.0 + Expansion.SHADOW_MAX_AGE
+    with patch('expansion.time.monotonic', side_effect=[100.0, 100.0, expired, expired]):
+        expansion.invalidate()
+        expansion.set_fan_mode(1)
+        expansion.set_fan_mode(1)  # Rewritten in case the board lost it
+    assert expansion.bus.write_byte_data.call_count == 2
+
+def test_force_and_invalidate(expansion):
+    expansion.set_fan_mode(1)
+    expansion.write(Expansion.REG_FAN_MODE, 1, force=True)
+    expansion.invalidate()
+    expansion.set_fan_mode(1)
+    assert expansion.bus.write_byte_data.call_count == 3
+
+def test_cache_disabled():
+    with patch('smbus.SMBus'):
+        board = Expansion(cache_writes=False)
+    board.set_led_mode(1)
+    board.set_led_mode(1)
+    assert board.bus.write_byte_data.call_count == 2
+    assert board.cache_stats()['hits'] == 0
+
+def test_snapshot_reads_all_registers(expansion):
+    expansion.bus.read_byte_data.side_effect = lambda addr, reg: {
+        Expansion.REG_TEMP_READ: 42,
+        Expansion.REG_FAN_MODE_READ: 1,
+        Expansion.REG_FAN0_DUTY_READ: 128,
+        Expansion.REG_FAN1_DUTY_READ: 127,
+        Expansion.REG_LED_MODE_READ: 4,
+    }[reg]
+    expansion.bus.read_i2c_block_data.side_effect = lambda addr, reg, length: {
+        Expansion.REG_FAN_FREQUENCY_READ: [0, 0, 0, 50],
+        Expansion.REG_FAN_THRESHOLD_READ: [30, 45],
+    }[reg]
+
+    snapshot = expansion.snapshot()
+
+    assert snapshot.temp == 42
+    assert snapshot.fan_mode == 1
+    assert snapshot.fan0_duty == 128
+    assert snapshot.fan1_duty == 127
+    assert snapshot.fan_frequency == 50
+    assert snapshot.fan_threshold == (30, 45)
+    assert snapshot.led_mode == 4
+    with pytest.raises(AttributeError):
+        snapshot.temp = 0  # Snapshots are immutable
+
+def test_set_led_colors_writes_only_changed_leds(expansion):
+    expansion.set_all_led_color(0, 0, 0)
+    expansion.bus.reset_mock()
+
+    assert expansion.set_led_colors([(0, 0, 0), (255, 0, 0), (0, 0, 0), (0, 0, 0)]) == 1
+    expansion.bus.write_i2c_block_data.assert_called_once_with(
+        expansion.address, Expansion.REG_LED_SPECIFIED, [1, 255, 0, 0])
+
+    expansion.bus.reset_mock()
+    assert expansion.set_led_colors([(0, 0, 0), (255, 0, 0), (0, 0, 0), (0, 0, 0)]) == 0
+    expansion.bus.write_i2c_block_data.assert_not_called()
+
+    # Every skipped LED write counts as one hit, as in write()
+    assert expansion.cache_stats()['hits'] == 3 + 4
+    assert expansion.cache_stats()['misses'] == 2
+
+def test_set_led_colors_uses_one_write_for_uniform_frame(expansion):
+    expansion.set_led_colors([(1, 2, 3), (4, 5, 6), (7, 8, 9), (0, 0, 0)])
+    expansion.bus.reset_mock()
+
+    assert expansion.set_led_colors([(9, 9, 9)] * 4) == 1
+    expansion.bus.write_i2c_block_data.assert_called_once_with(
+        expansion.address, Expansion.REG_LED_ALL, [9, 9, 9])
+
+def test_set_led_colors_rewrites_after_the_shadow_expires(expansion):
+    expansion.set_led_colors([(1, 2, 3), (4, 5, 6), (7, 8, 9), (0, 0, 0)])
+    expansion.bus.reset_mock()
+    expansion._shadow_since -= expansion.shadow_max_age  # An unchanged frame, long after the last refresh
+
+    assert expansion.set_led_colors([(1, 2, 3), (4, 5, 6), (7, 8, 9), (0, 0, 0)]) == 4
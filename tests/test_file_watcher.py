@@ -0,0 +1,69 @@
+import pytest
+import sys
+import os
+
+# Add the Code directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../Code')))
+
+from file_watcher import FileWatcher
+
+@pytest.fixture(params=[True, False], ids=['inotify', 'stat'])
+def use_inotify(request):
+    return request.param
+
+def write(path, text):
+    with open(path, 'w') as f:
+        f.write(text)
+
+def test_first_check_reports_change(tmp_path, use_inotify):
+    path = tmp_path / 'status.json'
+    write(path, '{}')
+    watcher = FileWatcher(path, use_inotify=use_inotify)
+    assert watcher.changed()
+    assert not watcher.changed()
+    watcher.close()
+
+def test_detects_writes(tmp_path, use_inotify):
+    path = tmp_path / 'status.json'
+    write(path, '{}')
+    watcher = FileWatcher(path, use_inotify=use_inotify)
+    watcher.changed()
+
+    write(path, '{"mode": "scanning"}')
+    assert watcher.changed()
+    assert not watcher.changed()
+    watcher.close()
+
+def test_detects_creation_replace_and_removal(tmp_path, use_inotify):
+    path = tmp_path / 'status.json'
+    watcher = FileWatcher(path, use_inotify=use_inotify)
+    watcher.changed()
+
+    write(path, '{}')
+    assert watcher.changed()
+
+    # Atomic replace, as done by writers that rename a temporary file
+    tmp = tmp_path / 'status.json.tmp'
+    write(tmp, '{"mode": "alert"}')
+    os.replace(tmp, path)
+    assert watcher.changed()
+
+    os.remove(path)
+    assert watcher.changed()
+    watcher.close()
+
+def test_ignores_other_files(tmp_path):
+    path = tmp_path / 'status.json'
+    write(path, '{}')
+    watcher = FileWatcher(path)
+    watcher.changed()
+
+    write(tmp_path / 'other.json', '{}')
+    assert not watcher.changed()
+    watcher.close()
+
+def test_falls_back_to_stat_for_missing_directory(tmp_path):
+    watcher = FileWatcher(tmp_path / 'missing' / 'status.json')
+    assert not watcher.uses_inotify
+    assert watcher.changed()
+    assert not watcher.changed()
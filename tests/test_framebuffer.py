@@ -0,0 +1,49 @@
+import pytest
+from unittest.mock import MagicMock
+import sys
+import os
+import random
+
+# Add the Code directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../Code')))
+
+from PIL import Image
+from luma.oled.device import ssd1306
+from framebuffer import pack_pages, dirty_window, window_bytes
+
+def random_image(seed):
+    rng = random.Random(seed)
+    image = Image.new('1', (128, 64))
+    image.putdata([rng.randint(0, 1) for _ in range(128 * 64)])
+    return image
+
+def test_pack_pages_matches_luma_display():
+    serial = MagicMock()
+    device = ssd1306(serial)
+    serial.reset_mock()
+    image = random_image(1)
+
+    device.display(image)
+
+    sent = serial.data.call_args[0][0]
+    assert pack_pages(image) == bytes(sent)
+
+def test_pack_pages_bit_order():
+    image = Image.new('1', (128, 64))
+    image.putpixel((5, 9), 1)  # Page 1, bit 1
+    frame = pack_pages(image)
+    assert frame[128 + 5] == 0b10
+    assert sum(frame) == 0b10
+
+def test_dirty_window():
+    first = pack_pages(random_image(2))
+    assert dirty_window(first, first, 128) is None
+    assert dirty_window(None, first, 128) == (0, 7, 0, 127)
+
+    image = random_image(2)
+    image.putpixel((10, 20), 1 - image.getpixel((10, 20)))
+    image.putpixel((40, 35), 1 - image.getpixel((40, 35)))
+    second = pack_pages(image)
+    window = dirty_window(first, second, 128)
+    assert window == (2, 4, 10, 40)
+    assert len(window_bytes(second, 128, window)) == 3 * 31
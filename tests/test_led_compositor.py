@@ -0,0 +1,73 @@
+import pytest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+
+# Add the Code directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../Code')))
+
+from led_compositor import LedCompositor, OFF
+from led_effects import LedEffect, solid, square_table
+
+RED = LedEffect(solid(255, 0, 0), 1.0)
+GREEN = LedEffect(solid(0, 255, 0), 1.0)
+BLUE = LedEffect(solid(0, 0, 255), 1.0)
+
+def test_render_without_layers_writes_nothing():
+    expansion = MagicMock()
+    compositor = LedCompositor(expansion)
+    assert compositor.render() is None
+    expansion.set_all_led_color.assert_not_called()
+
+def test_highest_priority_layer_wins_regardless_of_submit_order():
+    expansion = MagicMock()
+    compositor = LedCompositor(expansion)
+    compositor.set_layer('alert', RED)
+    compositor.set_layer('base', BLUE)
+    compositor.set_layer('status', GREEN)
+
+    assert compositor.render() == ((255, 0, 0),) * 4
+    expansion.set_all_led_color.assert_called_once_with(255, 0, 0)
+
+    compositor.clear_layer('alert')
+    assert compositor.active_layer() == 'status'
+    assert compositor.render() == ((0, 255, 0),) * 4
+    compositor.clear_layer('status')
+    assert compositor.render() == ((0, 0, 255),) * 4
+
+def test_one_write_per_frame():
+    expansion = MagicMock()
+    compositor = LedCompositor(expansion)
+    compositor.set_layer('base', BLUE)
+    compositor.set_layer('status', GREEN)
+    for _ in range(5):
+        compositor.render()
+    assert expansion.set_all_led_color.call_count == 5
+    assert compositor.frames == 5
+
+def test_layer_animation_starts_when_submitted():
+    expansion = MagicMock()
+    compositor = LedCompositor(expansion)
+    flash = LedEffect(solid(255, 0, 0), 1.0, square_table(1.0, 0.2), 0.5)
+    with patch('time.monotonic', return_value=10.0):
+        compositor.set_layer('alert', flash)
+    with patch('time.monotonic', return_value=10.3):
+        assert compositor.render() == ((51, 0, 0),) * 4
+
+def test_custom_priority():
+    compositor = LedCompositor(MagicMock())
+    compositor.set_layer('status', GREEN)
+    compositor.set_layer('overlay', OFF, priority=15)
+    assert compositor.active_layer() == 'overlay'
+    assert compositor.render() == ((0, 0, 0),) * 4
+
+def test_per_led_frame_uses_led_colors():
+    from led_effects import LedFrames, chase_table
+    expansion = MagicMock()
+    compositor = LedCompositor(expansion)
+    with patch('time.monotonic', return_value=0.0):
+        compositor.set_layer('base', LedFrames(chase_table((0, 0, 255)), 1.0))
+        frame = compositor.render()
+    assert frame[0] == (0, 0, 255)
+    expansion.set_led_colors.assert_called_once_with(frame)
+    expansion.set_all_led_color.assert_not_called()
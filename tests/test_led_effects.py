@@ -0,0 +1,81 @@
+import pytest
+import sys
+import os
+import math
+
+# Add the Code directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../Code')))
+
+from led_effects import (LedEffect, HUE_CYCLE, HUE_STEPS, breathing_table, square_table,
+                         hue_table, solid)
+
+def test_hue_table_primaries():
+    assert len(HUE_CYCLE) == HUE_STEPS * 3
+    table = hue_table(6)
+    colors = [tuple(table[i:i + 3]) for i in range(0, 18, 3)]
+    assert colors == [(255, 0, 0), (255, 255, 0), (0, 255, 0), (0, 255, 255), (0, 0, 255), (255, 0, 255)]
+
+def test_breathing_table_follows_sine():
+    table = breathing_table(steps=4)
+    assert list(table) == [127, 255, 127, 0]
+    floored = breathing_table(0.5)
+    assert min(floored) == 127
+    assert max(floored) == 255
+
+def test_effect_loops_over_its_period():
+    effect = LedEffect(HUE_CYCLE, 10.0, breathing_table(), 2.0)
+    assert effect.color_at(0.7) == effect.color_at(10.7)
+    assert effect.color_at(3.3) == effect.color_at(23.3)
+
+def test_effect_matches_analytic_curve():
+    effect = LedEffect(solid(255, 0, 0), 1.0, breathing_table(0.5), 2 * math.pi / 2)
+    for elapsed in (0.0, 0.3, 1.1, 2.9):
+        expected = ((math.sin(elapsed * 2) + 1) / 2 * 0.5 + 0.5) * 255
+        assert abs(effect.color_at(elapsed)[0] - expected) <= 4
+
+def test_square_wave():
+    effect = LedEffect(solid(255, 0, 0), 1.0, square_table(1.0, 0.2), 0.5)
+    assert effect.color_at(0.1) == (255, 0, 0)
+    assert effect.color_at(0.3) == (51, 0, 0)
+    assert effect.color_at(0.6) == (255, 0, 0)
+
+def test_invalid_tables():
+    with pytest.raises(ValueError):
+        LedEffect(b'\x00\x00', 1.0)
+    with pytest.raises(ValueError):
+        LedEffect(solid(1, 2, 3), 1.0, b'', 1.0)
+
+from led_effects import LedFrames, ProgressBar, LoadMeter, chase_table
+
+def test_chase_moves_one_led_per_step():
+    chase = LedFrames(chase_table((0, 0, 255), steps_per_led=1, tail=1), 4.0)
+    assert chase.frame(0.0) == ((0, 0, 255), (0, 0, 0), (0, 0, 0), (0, 0, 0))
+    assert chase.frame(1.0) == ((0, 0, 0), (0, 0, 255), (0, 0, 0), (0, 0, 0))
+    assert chase.frame(4.0) == chase.frame(0.0)
+    with pytest.raises(ValueError):
+        LedFrames(b'\x00' * 6, 1.0)
+
+def test_progress_bar():
+    progress = [0.625]
+    bar = ProgressBar(LedEffect(solid(200, 0, 0), 1.0), lambda: progress[0])
+    assert bar.frame(0.0) == ((200, 0, 0), (200, 0, 0), (100, 0, 0), (0, 0, 0))
+    progress[0] = None
+    assert bar.frame(0.0) == ((0, 0, 0),) * 4
+    progress[0] = 2.0
+    assert bar.frame(0.0) == ((200, 0, 0),) * 4
+
+def test_load_meter():
+    loads = [0.0, 50.0, 100.0, 100.0]
+    meter = LoadMeter(lambda: loads)
+    assert meter.frame(0.0) == ((0, 255, 0), (255, 255, 0), (255, 0, 0), (255, 0, 0))
+
+    # Eight cores share four LEDs; each LED shows the busier core
+    loads = [0.0, 100.0, 0.0, 0.0, 50.0, 0.0, 0.0, 0.0]
+    assert meter.frame(0.0) == ((255, 0, 0), (0, 255, 0), (255, 255, 0), (0, 255, 0))
+
+    # Two cores spread over four LEDs
+    loads = [100.0, 0.0]
+    assert meter.frame(0.0) == ((255, 0, 0), (255, 0, 0), (0, 255, 0), (0, 255, 0))
+
+    loads = ()
+    assert meter.frame(0.0) == ((0, 0, 0),) * 4
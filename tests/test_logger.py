@@ -0,0 +1,117 @@
+import pytest
+import logging
+import queue
+import sys
+import time
+import os
+
+# Add the Code directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../Code')))
+
+import logger as logger_module
+from logger import BatchingFileHandler, BatchingQueueListener, setup_logger, shutdown_logging, set_log_level, get_log_level
+
+@pytest.fixture
+def logs_dir(tmp_path, monkeypatch):
+    logs_dir = tmp_path / 'logs'
+    monkeypatch.setattr(logger_module, 'LOGS_DIR', str(logs_dir))
+    monkeypatch.setattr(logger_module, '_master_handler', None)
+    monkeypatch.setattr(logger_module, '_file_handlers', {})
+    monkeypatch.setattr(logger_module, '_levels', None)
+    monkeypatch.setenv(logger_module.LOG_LEVELS_ENV, 'verbose_module=DEBUG,*=INFO')
+    yield logs_dir
+    shutdown_logging()
+    for name in ('quiet_module', 'verbose_module'):
+        logging.getLogger(name).handlers.clear()
+
+def fresh_logger(name, **kwargs):
+    # pytest attaches its capture handlers, which would make the logger look configured
+    existing = logging.getLogger(name)
+    existing.handlers.clear()
+    existing.propagate = False
+    return setup_logger(name, **kwargs)
+
+class Counted:
+    formatted = 0
+
+    def __str__(self):
+        Counted.formatted += 1
+        return 'counted'
+
+def test_records_reach_files_through_the_listener(logs_dir):
+    quiet = fresh_logger('quiet_module')
+    verbose = fresh_logger('verbose_module', log_to_master=False)
+    assert quiet.handlers == [logger_module._queue_handler]
+
+    quiet.info("Fan duty %s", 42)
+    quiet.debug("Not logged %s", Counted())
+    verbose.debug("Detail %s", 7)
+    shutdown_logging()
+
+    assert 'INFO - Fan duty 42' in (logs_dir / 'quiet_module.log').read_text()
+    assert 'Detail 7' in (logs_dir / 'verbose_module.log').read_text()
+    master = (logs_dir / '_master_log.log').read_text()
+    assert '[quiet_module] - Fan duty 42' in master
+    assert 'Detail' not in master
+    # Disabled debug messages are never formatted
+    assert Counted.formatted == 0
+
+def test_per_logger_levels(logs_dir):
+    assert get_log_level('verbose_module') == logging.DEBUG
+    assert get_log_level('other_module') == logging.INFO
+    quiet = fresh_logger('quiet_module')
+    set_log_level('quiet_module', 'warning')
+    assert quiet.level == logging.WARNING
+
+def test_batching_file_handler_flushes_in_batches(tmp_path):
+    path = tmp_path / 'batch.log'
+    handler = BatchingFileHandler(str(path), batch_size=3, flush_interval=3600)
+    record = lambda level: logging.LogRecord('test', level, __file__, 1, 'message', None, None)
+
+    handler.handle(record(logging.INFO))
+    handler.handle(record(logging.INFO))
+    assert path.read_text() == ''
+    handler.handle(record(logging.INFO))
+    assert path.read_text().count('message') == 3
+
+    # Warnings are written out immediately
+    handler.handle(record(logging.WARNING))
+    assert path.read_text().count('message') == 4
+    handler.close()
+
+def test_batching_file_handler_rotates_by_age(tmp_path, monkeypatch):
+    path = tmp_path / 'aged.log'
+    handler = BatchingFileHandler(str(path), rotate_interval=60, batch_size=1)
+    record = logging.LogRecord('test', logging.INFO, __file__, 1, 'message', None, None)
+    handler.handle(record)
+
+    opened = handler._opened_at
+    monkeypatch.setattr(logger_module.time, 'time', lambda: opened + 61)
+    handler.handle(record)
+    handler.close()
+    assert (tmp_path / 'aged.log.1').read_text().count('message') == 1
+    assert path.read_text().count('message') == 1
+
+def test_batching_file_handler_counts_bytes(tmp_path):
+    path = tmp_path / 'sized.log'
+    handler = BatchingFileHandler(str(path), max_bytes=1024, batch_size=1)
+    handler.handle(logging.LogRecord('test', logging.INFO, __file__, 1, 'Temp 45°C ✓', None, None))
+    handler.close()
+    assert handler._size == path.stat().st_size == len('Temp 45°C ✓\n'.encode('utf-8'))
+
+def test_listener_flushes_while_idle(tmp_path):
+    path = tmp_path / 'idle.log'
+    handler = BatchingFileHandler(str(path), batch_size=100, flush_interval=0.05)
+    records = queue.SimpleQueue()
+    listener = BatchingQueueListener(records, handler, idle_interval=0.01)
+    listener.start()
+    try:
+        records.put(logging.LogRecord('test', logging.INFO, __file__, 1, 'message', None, None))
+        deadline = time.monotonic() + 5
+        while not (path.exists() and 'message' in path.read_text()) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        # Written out with no further record and no close
+        assert 'message' in path.read_text()
+    finally:
+        listener.stop()
+        handler.close()
@@ -0,0 +1,53 @@
+import pytest
+import sys
+import os
+
+# Add the Code directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../Code')))
+
+from metrics import RingBuffer, MetricsStore
+
+def test_ring_buffer_wraps_around():
+    buffer = RingBuffer(capacity=3)
+    for t in range(5):
+        buffer.append(t * 10, timestamp=float(t))
+    assert len(buffer) == 3
+    assert buffer.values() == [20.0, 30.0, 40.0]
+    assert buffer.latest() == (4.0, 40.0)
+
+def test_window_stats():
+    buffer = RingBuffer(capacity=100)
+    for t in range(10):
+        buffer.append(t, timestamp=float(t))
+    # Last 3 seconds at t=9: samples 6, 7, 8, 9
+    stats = buffer.stats(3, now=9.0)
+    assert stats == {'count': 4, 'min': 6.0, 'max': 9.0, 'mean': 7.5}
+    assert buffer.stats(3, now=100.0) is None
+
+def test_percentile():
+    buffer = RingBuffer(capacity=200)
+    for t in range(101):
+        buffer.append(t, timestamp=float(t))
+    assert buffer.percentile(1000, 50, now=100.0) == pytest.approx(50.0)
+    assert buffer.percentile(1000, 95, now=100.0) == pytest.approx(95.0)
+    assert buffer.percentile(10, 0, now=100.0) == pytest.approx(90.0)
+    assert RingBuffer(1).percentile(10, 50) is None
+
+def test_memory_is_preallocated():
+    buffer = RingBuffer(capacity=50)
+    times, values = buffer._times, buffer._values
+    for t in range(500):
+        buffer.append(t, timestamp=float(t))
+    assert buffer._times is times and len(times) == 50
+    assert buffer._values is values and len(values) == 50
+
+def test_store_records_numeric_values_only():
+    store = MetricsStore(capacity=10)
+    store.record('cpu_monitor.cpu_usage', 12.5, timestamp=1.0)
+    store.record('cpu_monitor.cpu_usage', None, timestamp=2.0)
+    store.record('cpu_monitor.cpu_usage', 'n/a', timestamp=3.0)
+    assert store.latest('cpu_monitor.cpu_usage') == 12.5
+    assert len(store.series('cpu_monitor.cpu_usage')) == 1
+    assert store.latest('missing') is None
+    assert store.stats('missing', 10) is None
+    assert store.names() == ['cpu_monitor.cpu_usage']
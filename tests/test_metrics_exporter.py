@@ -0,0 +1,74 @@
+import pytest
+from unittest.mock import MagicMock
+import sys
+import os
+import urllib.error
+import urllib.request
+
+# Add the Code directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../Code')))
+
+from metrics import MetricsStore
+from metrics_exporter import MetricsExporter, render_metrics, metric_name
+from profiler import Profiler
+
+def test_render_metrics():
+    metrics = MetricsStore()
+    metrics.record('cpu_temp.cpu_temperature', 51.5)
+    metrics.record('expansion.fan0_duty', 128)
+    profiler = Profiler()
+    profiler.record('cpu_temp', 1.0, 0.002)
+
+    page = render_metrics(metrics, profiler, 'scanning', ('idle', 'scanning')).decode()
+
+    assert '# TYPE cyberdeck_cpu_temp_cpu_temperature gauge\ncyberdeck_cpu_temp_cpu_temperature 51.5\n' in page
+    assert 'cyberdeck_expansion_fan0_duty 128\n' in page
+    assert 'cyberdeck_security_mode{mode="idle"} 0\n' in page
+    assert 'cyberdeck_security_mode{mode="scanning"} 1\n' in page
+    assert 'cyberdeck_plugin_updates_total{plugin="cpu_temp"} 1\n' in page
+    assert page.endswith('\n')
+
+def test_render_labeled_metrics():
+    labeled = [('cpu_core_usage', {'core': 0}, 12.5), ('cpu_core_usage', {'core': 1}, 80),
+               ('process_cpu_usage', {'pid': 42, 'name': 'my "app"'}, 98)]
+
+    page = render_metrics(MetricsStore(), labeled=labeled).decode()
+
+    assert page.count('# TYPE cyberdeck_cpu_core_usage gauge') == 1
+    assert 'cyberdeck_cpu_core_usage{core="0"} 12.5\ncyberdeck_cpu_core_usage{core="1"} 80\n' in page
+    assert 'cyberdeck_process_cpu_usage{pid="42",name="my \\"app\\""} 98\n' in page
+
+def test_render_special_values():
+    metrics = MetricsStore()
+    metrics.record('a.nan', float('nan'))
+    metrics.record('a.up', float('inf'))
+    labeled = [('down', {'core': 0}, float('-inf'))]
+
+    page = render_metrics(metrics, labeled=labeled).decode()
+
+    assert 'cyberdeck_a_nan NaN\n' in page
+    assert 'cyberdeck_a_up +Inf\n' in page
+    assert 'cyberdeck_down{core="0"} -Inf\n' in page
+
+def test_metric_name_is_sanitized():
+    assert metric_name('disk_monitor./dev/sda1') == 'cyberdeck_disk_monitor__dev_sda1'
+
+def test_exporter_binds_localhost_by_default():
+    exporter = MetricsExporter(0)
+    try:
+        assert exporter.server.server_address[0] == '127.0.0.1'
+    finally:
+        exporter.stop()
+
+def test_exporter_serves_published_page():
+    exporter = MetricsExporter(0, host='127.0.0.1')
+    exporter.start()
+    try:
+        exporter.publish(b'cyberdeck_up 1\n')
+        with urllib.request.urlopen(f'http://127.0.0.1:{exporter.port}/metrics', timeout=5) as response:
+            assert response.read() == b'cyberdeck_up 1\n'
+            assert response.headers['Content-Type'].startswith('text/plain')
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f'http://127.0.0.1:{exporter.port}/other', timeout=5)
+    finally:
+        exporter.stop()
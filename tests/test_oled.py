@@ -0,0 +1,149 @@
+import pytest
+from unittest.mock import patch, MagicMock
+import sys
+import os
+
+# Add the Code directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../Code')))
+
+from PIL import Image, ImageDraw, ImageFont
+from oled import OLED
+from asset_cache import AssetCache
+
+@pytest.fixture
+def oled(tmp_path):
+    with patch('oled.i2c'), patch('oled.ssd1306') as mock_ssd1306:
+        device = mock_ssd1306.return_value
+        device.width = 128
+        device.height = 64
+        device.rotate = 0
+        device._colstart = 0
+        yield OLED(asset_cache=AssetCache(str(tmp_path / 'cache')))
+
+def pin_layout(oled, layout):
+    # Fonts loaded from now on use `layout`, whichever one this Pillow build defaults to
+    truetype = ImageFont.truetype
+    oled._fonts.clear()
+    return patch('oled.ImageFont.truetype',
+                 side_effect=lambda path, size: truetype(path, size, layout_engine=layout))
+
+def test_show_skips_unchanged_frame(oled):
+    oled.draw_rectangle(((0, 0), (127, 63)), outline="white")
+    oled.show()
+    oled.show()
+    assert oled.device.data.call_count == 1
+    assert oled.frames_sent == 1
+    assert oled.frames_skipped == 1
+
+def test_show_sends_only_changed_window(oled):
+    oled.show()
+    oled.device.reset_mock()
+
+    oled.draw_point((70, 30), fill="white")
+    oled.show()
+
+    oled.device.command.assert_called_once_with(OLED.CMD_COLUMN_ADDR, 70, 70, OLED.CMD_PAGE_ADDR, 3, 3)
+    assert oled.device.data.call_args[0][0] == [1 << 6]
+    assert oled.frames_partial == 1
+
+def test_show_force_and_invalidate(oled):
+    oled.show()
+    oled.show(force=True)
+    oled.invalidate()
+    oled.show()
+    assert oled.device.data.call_count == 3
+    assert len(oled.device.data.call_args[0][0]) == 128 * 8
+
+def test_show_rotated_display_uses_luma(oled):
+    oled.device.rotate = 2
+    oled.show()
+    oled.device.display.assert_called_once_with(oled.buffer)
+
+@pytest.mark.parametrize('font_size', [None, 12])
+@pytest.mark.parametrize('text', ["FAN Duty: 50%", "Temp: 47.5°C (max 80)", "5.1V supply"])
+def test_draw_text_matches_pil(oled, font_size, text):
+    with pin_layout(oled, ImageFont.Layout.BASIC):
+        oled.draw_text(text, position=(3, 16), font_size=font_size)
+
+    expected = Image.new('1', (128, 64))
+    ImageDraw.Draw(expected).text((3, 16), text, font=oled.get_font(font_size), fill="white")
+    assert oled.buffer.tobytes() == expected.tobytes()
+
+def test_fonts_and_text_are_cached(oled):
+    with patch('oled.ImageFont.truetype', wraps=ImageFont.truetype) as mock_truetype:
+        for _ in range(3):
+            oled.clear()
+            oled.draw_text("CPU: 5%", position=(0, 16), font_size=11)
+            oled.draw_text("CPU: 5%", position=(0, 32), font_size=11)
+        mock_truetype.assert_called_once_with(oled.default_font_path, 11)
+    assert len(oled._text_masks) == 1
+    assert oled.text_size("CPU: 5%", font_size=11)[0] > 0
+
+def test_new_strings_reuse_cached_glyphs(oled):
+    with pin_layout(oled, ImageFont.Layout.BASIC):
+        oled.draw_text("CPU: 57%", font_size=11)
+    glyphs = len(oled._glyphs)
+    with patch('oled.ImageDraw.Draw', wraps=ImageDraw.Draw) as mock_draw:
+        oled.draw_text("CPU: 75%", font_size=11)
+    mock_draw.assert_not_called()  # Every character was already rasterized
+    assert len(oled._glyphs) == glyphs
+    assert len(oled._text_masks) == 2
+
+def test_other_layouts_render_whole_strings(oled):
+    font = oled.get_font(12)
+    with patch.object(font, 'layout_engine', ImageFont.Layout.RAQM):
+        oled.draw_text("AVAWAY To", position=(3, 16), font_size=12)
+
+    assert len(oled._glyphs) == 0  # Raqm kerning and ligatures cannot be composed from glyphs
+    expected = Image.new('1', (128, 64))
+    ImageDraw.Draw(expected).text((3, 16), "AVAWAY To", font=font, fill="white")
+    assert oled.buffer.tobytes() == expected.tobytes()
+
+def test_font_cache_is_bounded(oled):
+    for size in range(6, 6 + OLED.FONT_CACHE_SIZE + 4):
+        oled.get_font(size)
+    assert len(oled._fonts) == OLED.FONT_CACHE_SIZE
+
+def test_preload_missing_font(oled, capsys):
+    oled.preload_fonts([12], font_path='/nonexistent/font.ttf')
+    assert "Error loading font" in capsys.readouterr().out
+
+def test_draw_gif_plays_from_memory(oled, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.mkdir('work')
+    monkeypatch.chdir('work')
+    gif_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../Code/picture/1.gif'))
+    with patch('animation.time.sleep'):
+        oled.draw_gif(gif_path)
+        frames = oled.frames_sent + oled.frames_skipped
+        oled.draw_gif(gif_path)
+
+    assert frames > 1
+    assert len(oled.animations._entries) == 1
+    assert os.listdir('.') == []  # No temporary frame files
+    assert oled.buffer.size == (128, 64)
+
+def test_draw_gif_on_rotated_display_uses_luma(oled):
+    oled.device.rotate = 2
+    gif_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../Code/picture/1.gif'))
+    with patch('animation.time.sleep'):
+        oled.draw_gif(gif_path)
+
+    # Every frame goes through luma's display(), which applies the rotation
+    oled.device.data.assert_not_called()
+    oled.device.command.assert_not_called()
+    frames = oled.animations.get(gif_path, (128, 64)).frames
+    assert oled.device.display.call_count == len(frames) == oled.frames_sent
+    last = oled.device.display.call_args.args[0]
+    assert last.size == (128, 64)
+    assert last.tobytes() == oled.buffer.tobytes()
+
+def test_draw_image_uses_asset_cache(oled):
+    image_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../Code/picture/1.bmp'))
+    oled.draw_image(image_path)
+    first = oled.buffer.tobytes()
+    oled.clear()
+    oled.draw_image(image_path)
+    assert oled.buffer.tobytes() == first
+    assert oled.assets.misses == 1
+    assert oled.assets.hits == 1
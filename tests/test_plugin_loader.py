@@ -1,14 +1,16 @@
 import pytest
 import os
 import sys
+import contextlib
 
 # Add the Code directory to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../Code')))
 
-from plugin_loader import load_plugins
+from plugin_loader import load_plugins, resolve_order
 from plugins.base_plugin import BasePlugin
+from plugins.manifest import PluginSpec
 
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, call, patch
 
 def test_plugin_loading():
     mock_oled = MagicMock()
@@ -41,4 +43,167 @@ def test_plugin_loading():
     assert type(plugins['fan_pwm']).__name__ == 'FanPwmPlugin'
     assert isinstance(plugins['led_control'], BasePlugin)
     assert type(plugins['led_control']).__name__ == 'LedControlPlugin'
-    assert plugins['led_control'].expansion is mock_expansion
\ No newline at end of file
+    assert plugins['led_control'].expansion is mock_expansion
+
+def test_dependencies_load_first():
+    order = resolve_order(['oled_display', 'fan_control'])
+    for dependency in ('cpu_monitor', 'memory_monitor', 'disk_monitor', 'cpu_temp'):
+        assert order.index(dependency) < order.index('oled_display')
+    assert order.index('cpu_temp') < order.index('fan_control')
+    assert 'led_control' not in order
+
+def test_resolve_order_errors():
+    registry = {
+        'a': PluginSpec('a', 'plugins.a', 'A', requires=('b',)),
+        'b': PluginSpec('b', 'plugins.b', 'B', requires=('a',)),
+    }
+    with pytest.raises(ValueError):
+        resolve_order(['a'], registry)
+    with pytest.raises(KeyError):
+        resolve_order(['missing'])
+
+def test_only_enabled_plugins_are_imported():
+    import importlib
+    mock_expansion = MagicMock()
+    with patch('plugin_loader.importlib.import_module', wraps=importlib.import_module) as mock_import:
+        plugins = load_plugins(MagicMock(), mock_expansion, enabled=['fan_control'])
+
+    assert list(plugins) == ['cpu_temp', 'cpu_monitor', 'fan_control']
+    imported = {c.args[0] for c in mock_import.call_args_list}
+    assert imported == {'plugins.cpu_temp_plugin', 'plugins.cpu_monitor_plugin', 'plugins.fan_control_plugin'}
+    assert plugins['fan_control'].expansion is mock_expansion
+
+def test_resources_and_period_override():
+    registry = {
+        'led_control': PluginSpec('led_control', 'plugins.led_control_plugin', 'LedControlPlugin',
+                                  resources=('expansion', 'compositor'), period=0.5),
+        'security_status': PluginSpec('security_status', 'plugins.security_status_plugin', 'SecurityStatusPlugin',
+                                      requires=('led_control',), resources=('expansion', 'plugin:led_control')),
+    }
+    mock_expansion = MagicMock()
+    with patch('status_channel.SOCKET_PATH', '/nonexistent/status.sock'):
+        plugins = load_plugins(expansion=mock_expansion, registry=registry)
+
+    assert plugins['led_control'].period == 0.5
+    assert plugins['security_status'].led_control_plugin is plugins['led_control']
+    assert plugins['security_status'].compositor is plugins['led_control'].compositor
+
+def test_failed_import_skips_dependents(capsys):
+    registry = {
+        'broken': PluginSpec('broken', 'plugins.does_not_exist', 'Broken'),
+        'user': PluginSpec('user', 'plugins.cpu_monitor_plugin', 'CpuMonitorPlugin', requires=('broken',)),
+        'cpu_temp': PluginSpec('cpu_temp', 'plugins.cpu_temp_plugin', 'CpuTempPlugin'),
+    }
+    plugins = load_plugins(registry=registry)
+    assert list(plugins) == ['cpu_temp']
+    assert 'Skipping plugin user' in capsys.readouterr().out
+
+HOT_PLUGIN = """
+from plugins.base_plugin import BasePlugin
+
+class HotPlugin(BasePlugin):
+    version = {version}
+
+    def __init__(self, expansion):
+        super().__init__()
+        self.expansion = expansion
+        self.count = 0
+
+    def export_state(self):
+        return {{'count': self.count}}
+
+    def import_state(self, state):
+        self.count = state['count']
+
+    def update(self, pi_monitor=None):
+        self.count += 1
+
+    def close(self):
+        self.expansion.closed(self.version)
+"""
+
+class Holder(BasePlugin):
+    def __init__(self, hot):
+        super().__init__()
+        if hot.version == 99:
+            raise RuntimeError("cannot hold version 99")
+        self.hot = hot
+
+    def update(self, pi_monitor=None):
+        pass
+
+@pytest.fixture
+def hot_registry(tmp_path, monkeypatch):
+    source = tmp_path / 'hot_plugin_module.py'
+    source.write_text(HOT_PLUGIN.format(version=1))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(sys, 'dont_write_bytecode', True)
+    registry = {
+        'hot': PluginSpec('hot', 'hot_plugin_module', 'HotPlugin', resources=('expansion',)),
+        'holder': PluginSpec('holder', __name__, 'Holder', requires=('hot',), resources=('plugin:hot',)),
+    }
+    yield source, registry
+    sys.modules.pop('hot_plugin_module', None)
+
+def test_reloader_swaps_changed_plugin_and_keeps_state(hot_registry):
+    from plugin_loader import PluginReloader
+    source, registry = hot_registry
+    mock_expansion = MagicMock()
+    plugins = load_plugins(expansion=mock_expansion, registry=registry)
+    plugins['hot'].update()
+    reloader = PluginReloader(plugins, expansion=mock_expansion, registry=registry)
+    assert reloader.check() == []
+
+    source.write_text(HOT_PLUGIN.format(version=22))
+    assert reloader.check() == ['hot', 'holder']
+    assert plugins['hot'].version == 22
+    assert plugins['hot'].count == 1
+    assert plugins['hot'].expansion is mock_expansion
+    assert plugins['holder'].hot is plugins['hot']
+    reloader.close()
+
+def test_reloader_keeps_running_version_on_error(hot_registry, capsys):
+    from plugin_loader import PluginReloader
+    source, registry = hot_registry
+    plugins = load_plugins(expansion=MagicMock(), registry=registry)
+    running = dict(plugins)
+    reloader = PluginReloader(plugins, registry=registry)
+
+    source.write_text(HOT_PLUGIN.format(version='undefined_name'))
+    assert reloader.check() == []
+    assert plugins == running
+    assert sys.modules['hot_plugin_module'].HotPlugin.version == 1
+    assert reloader.failures == 1
+    assert 'keeping the running version' in capsys.readouterr().out
+    reloader.close()
+
+def test_reloader_closes_partially_built_plugins(hot_registry, capsys):
+    from plugin_loader import PluginReloader
+    source, registry = hot_registry
+    mock_expansion = MagicMock()
+    plugins = load_plugins(expansion=mock_expansion, registry=registry)
+    reloader = PluginReloader(plugins, expansion=mock_expansion, registry=registry)
+
+    source.write_text(HOT_PLUGIN.format(version=99))  # Builds, but 'holder' rejects it
+    assert reloader.check() == []
+    assert mock_expansion.closed.call_args_list == [call(1), call(99)]
+    assert plugins['hot'].version == 1
+    assert plugins['holder'].hot is plugins['hot']
+    assert 'Error rebuilding plugins' in capsys.readouterr().out
+    reloader.close()
+
+def test_reloader_defers_while_plugins_are_updating(hot_registry):
+    from plugin_loader import PluginReloader
+    source, registry = hot_registry
+    plugins = load_plugins(expansion=MagicMock(), registry=registry)
+    reloader = PluginReloader(plugins, registry=registry)
+    pause = MagicMock(return_value=contextlib.nullcontext(False))
+    assert reloader.check(pause=pause) == []
+    pause.assert_not_called()  # Nothing changed
+
+    source.write_text(HOT_PLUGIN.format(version=2))
+    assert reloader.check(pause=pause) == []
+    assert plugins['hot'].version == 1
+    assert reloader.check() == ['hot', 'holder']  # Retried although the file did not change again
+    assert plugins['hot'].version == 2
+    reloader.close()
@@ -0,0 +1,83 @@
+import pytest
+from unittest.mock import MagicMock
+import sys
+import os
+
+# Add the Code directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../Code')))
+
+from profiler import Histogram, Profiler
+
+def test_histogram_stats():
+    histogram = Histogram()
+    for seconds in (0.0008, 0.0009, 0.002, 0.3):
+        histogram.add(seconds)
+    stats = histogram.stats()
+    assert stats['count'] == 4
+    assert stats['max'] == 0.3
+    assert stats['mean'] == pytest.approx(0.075925)
+    assert stats['p50'] == 0.001
+    assert stats['p95'] == 0.5
+    assert Histogram().percentile(50) is None
+
+def test_measure_records_wall_and_cpu_time():
+    profiler = Profiler()
+    func = MagicMock()
+    assert profiler.measure('cpu_monitor', 1.0, func)
+    func.assert_called_once()
+
+    stats = profiler.stats('cpu_monitor')
+    assert stats['runs'] == 1
+    assert stats['wall']['count'] == 1
+    assert stats['cpu']['count'] == 1
+    assert stats['overruns'] == 0
+    assert profiler.stats('missing') is None
+
+def test_measure_records_failed_updates():
+    profiler = Profiler()
+    with pytest.raises(RuntimeError):
+        profiler.measure('oled_display', 1.0, MagicMock(side_effect=RuntimeError("I2C error")))
+    assert profiler.stats('oled_display')['runs'] == 1
+
+def test_watchdog_demotes_and_promotes():
+    logger = MagicMock()
+    profiler = Profiler(overrun_limit=3, recover_after=2, logger=logger)
+    for _ in range(3):
+        profiler.record('oled_display', 1.0, 1.5)
+    assert profiler.stats('oled_display')['scale'] == 2
+    assert profiler.stats('oled_display')['overruns'] == 3
+    logger.warning.assert_called_once()
+
+    # A demoted plugin runs on every second due tick
+    ran = [profiler.should_run('oled_display') for _ in range(4)]
+    assert ran.count(True) == 2
+    assert profiler.stats('oled_display')['skipped'] == 2
+
+    profiler.record('oled_display', 1.0, 0.1)
+    profiler.record('oled_display', 1.0, 0.1)
+    assert profiler.stats('oled_display')['scale'] == 1
+
+def test_demotion_is_capped():
+    profiler = Profiler(overrun_limit=1)
+    for _ in range(10):
+        profiler.record('slow', 0.1, 1.0)
+    assert profiler.stats('slow')['scale'] == Profiler.MAX_SCALE
+
+def test_exempt_plugins_are_never_demoted():
+    profiler = Profiler(overrun_limit=1, exempt=('fan_control',))
+    for _ in range(10):
+        profiler.record('fan_control', 1.0, 2.0)
+    assert profiler.stats('fan_control')['scale'] == 1
+    assert profiler.stats('fan_control')['overruns'] == 10
+    assert all(profiler.should_run('fan_control') for _ in range(5))
+
+def test_summary_lists_slowest_first():
+    profiler = Profiler()
+    profiler.record('fast', 1.0, 0.001)
+    profiler.record('slow', 1.0, 0.2)
+    profiler.record('late', 0.01, 0.02)
+    assert profiler.slowest(2) == ['slow', 'late']
+    summary = profiler.summary()
+    assert summary.index('slow') < summary.index('fast')
+    assert 'late 20.0/25.0ms (1 overruns)' in summary
+    assert Profiler().summary() == 'no plugin updates'
@@ -0,0 +1,173 @@
+import pytest
+from unittest.mock import patch
+import sys
+import os
+import threading
+
+# Add the Code directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../Code')))
+
+import sampler as sampler_module
+from sampler import (Sampler, Source, ProcessSampler, parse_cpu_times, parse_meminfo, parse_process_stat,
+                     parse_diskstats, parse_mounts, busy_percent, time_breakdown, io_rates)
+
+STAT = """cpu  {u} 0 {s} {i} {w} 0 0 0 0 0
+cpu0 {u} 0 {s} {i} {w} 0 0 0 0 0
+cpu1 0 0 0 {i} 0 0 0 0 0 0
+intr 12345 0 0
+ctxt 999
+"""
+
+MEMINFO = """MemTotal:        1000000 kB
+MemFree:          100000 kB
+MemAvailable:     250000 kB
+Buffers:           10000 kB
+"""
+
+@pytest.fixture
+def proc(tmp_path):
+    stat = tmp_path / 'stat'
+    stat.write_text(STAT.format(u=100, s=0, i=900, w=0))
+    meminfo = tmp_path / 'meminfo'
+    meminfo.write_text(MEMINFO)
+    thermal = tmp_path / 'temp'
+    thermal.write_text('48250\n')
+    pwm = tmp_path / 'hwmon' / 'hwmon3' / 'pwm1'
+    pwm.parent.mkdir(parents=True)
+    pwm.write_text('300\n')
+    sampler = Sampler(max_age=0.0, stat_path=str(stat), meminfo_path=str(meminfo),
+                      thermal_path=str(thermal), hwmon_base=str(tmp_path / 'hwmon'))
+    yield sampler, stat
+    sampler.close()
+
+def test_parsers():
+    aggregate, cores = parse_cpu_times(STAT.format(u=1, s=2, i=3, w=4).encode())
+    assert aggregate == (1, 0, 2, 3, 4, 0, 0, 0, 0, 0)
+    assert len(cores) == 2
+    assert parse_meminfo(MEMINFO.encode()) == 75.0
+    assert busy_percent((10, 0, 0, 90, 0, 0, 0, 0), (30, 0, 10, 150, 10, 0, 0, 0)) == 30.0
+
+def test_sample_reads_every_source(proc):
+    sampler, stat = proc
+    first = sampler.snapshot()
+    assert first.cpu_usage == 0.0  # Needs two samples
+    assert first.memory_usage == 75.0
+    assert first.cpu_temperature == 48.25
+    assert first.fan_pwm == 255  # Clamped
+
+    stat.write_text(STAT.format(u=150, s=50, i=1000, w=0))
+    second = sampler.snapshot()
+    assert second.cpu_usage == 50.0
+    assert second.per_core_usage == (50.0, 0.0)
+
+def test_sources_stay_open(proc):
+    sampler, _ = proc
+    sampler.snapshot()
+    with patch('os.open') as mock_open:
+        sampler.snapshot()
+        sampler.snapshot()
+    mock_open.assert_not_called()
+    assert sampler.samples == 3
+
+def test_source_grows_buffer(tmp_path):
+    path = tmp_path / 'big'
+    path.write_bytes(b'x' * 100)
+    source = Source(str(path), size=16)
+    assert bytes(source.read()) == b'x' * 100
+    source.close()
+
+def test_snapshot_is_shared_within_max_age(proc):
+    sampler, _ = proc
+    sampler.max_age = 60.0
+    snapshots = []
+    threads = [threading.Thread(target=lambda: snapshots.append(sampler.snapshot())) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sampler.samples == 1
+    assert all(snapshot is snapshots[0] for snapshot in snapshots)
+
+def test_missing_sources_use_defaults(tmp_path):
+    sampler = Sampler(stat_path=str(tmp_path / 'a'), meminfo_path=str(tmp_path / 'b'),
+                      thermal_path=str(tmp_path / 'c'), hwmon_base=str(tmp_path / 'd'))
+    snapshot = sampler.snapshot()
+    assert (snapshot.cpu_usage, snapshot.memory_usage, snapshot.cpu_temperature, snapshot.fan_pwm) == (0.0, 0.0, 0, -1)
+
+def test_disk_usage_is_cached(tmp_path):
+    sampler = Sampler(statvfs_ttl=30.0)
+    with patch('os.statvfs', wraps=os.statvfs) as mock_statvfs:
+        usage = sampler.disk_usage(str(tmp_path))
+        assert sampler.disk_usage(str(tmp_path)) == usage
+    assert mock_statvfs.call_count == 1
+    assert 0.0 <= usage <= 100.0
+
+def test_time_breakdown():
+    before = (100, 0, 50, 800, 0, 0, 0, 0)
+    after = (130, 10, 60, 820, 10, 5, 5, 10)
+    assert time_breakdown(before, after) == {'user': 40.0, 'system': 10.0, 'iowait': 10.0, 'irq': 10.0, 'steal': 10.0}
+    assert time_breakdown(after, after)['iowait'] == 0.0
+
+def test_parse_process_stat():
+    line = b'42 (my (odd) name) S 1 42 42 0 -1 4194560 100 0 0 0 250 50 0 0 20 0 1 0 100 0 0\n'
+    assert parse_process_stat(line) == ('my (odd) name', 300)
+
+def write_process(proc_dir, pid, name, ticks):
+    stat = proc_dir / str(pid) / 'stat'
+    stat.parent.mkdir(exist_ok=True)
+    stat.write_text(f'{pid} ({name}) S 1 1 1 0 -1 0 0 0 0 0 {ticks} 0 0 0 20 0 1 0 0 0 0\n')
+
+def test_process_sampler_top(tmp_path):
+    write_process(tmp_path, 10, 'busy', 100)
+    write_process(tmp_path, 20, 'idle', 50)
+    write_process(tmp_path, 30, 'other', 0)
+    (tmp_path / 'self').mkdir()
+    processes = ProcessSampler(count=2, interval=1.0, rescan_interval=10.0, tracked=2, proc=str(tmp_path))
+
+    assert processes.top(now=0.0) == ()  # Needs two readings
+    write_process(tmp_path, 10, 'busy', 100 + 2 * sampler_module.CLK_TCK)
+    write_process(tmp_path, 20, 'idle', 50 + sampler_module.CLK_TCK // 10)
+
+    assert processes.top(now=0.5) == ()  # Rate limited
+    top = processes.top(now=2.0)
+    assert top == ((10, 'busy', 100.0), (20, 'idle', 5.0))
+    assert processes.scans == 1  # Tracked processes are re-read without a walk
+    processes.close()
+
+def test_process_sampler_skips_exited_processes(tmp_path):
+    write_process(tmp_path, 10, 'short', 0)
+    processes = ProcessSampler(interval=0.0, rescan_interval=0.0, proc=str(tmp_path))
+    processes.top(now=0.0)
+    (tmp_path / '10' / 'stat').unlink()
+    assert processes.top(now=1.0) == ()
+    processes.close()
+
+def test_parse_diskstats_and_io_rates():
+    data = b"""   1       0 ram0 0 0 0 0 0 0 0 0 0 0 0
+ 179       0 mmcblk0 120 4 960 50 30 2 240 90 0 100 140 0 0 0 0
+"""
+    stats = parse_diskstats(data)
+    assert stats['mmcblk0'] == (120, 960, 30, 240, 100)
+    after = (140, 1160, 50, 2288, 120)
+    assert io_rates(stats['mmcblk0'], after, 2.0) == {'read_bytes': 51200.0, 'write_bytes': 524288.0,
+                                                      'iops': 20.0, 'service_time': 0.5}
+    assert io_rates(after, after, 2.0)['service_time'] == 0.0
+
+def test_parse_mounts():
+    data = b"""/dev/mmcblk0p2 / ext4 rw,noatime 0 0
+proc /proc proc rw 0 0
+/dev/sda1 /media/my\\040disk vfat rw 0 0
+"""
+    assert parse_mounts(data) == [('/dev/mmcblk0p2', '/'), ('/dev/sda1', '/media/my disk')]
+
+def test_block_device_uses_device_numbers(tmp_path):
+    dev = os.stat(tmp_path).st_dev
+    sys_dev_block = tmp_path / 'block'
+    sys_dev_block.mkdir()
+    (sys_dev_block / f'{os.major(dev)}:{os.minor(dev)}').symlink_to('../../devices/platform/mmc/block/mmcblk0/mmcblk0p2')
+    sampler = Sampler(sys_dev_block=str(sys_dev_block))
+    assert sampler.block_device(str(tmp_path)) == 'mmcblk0p2'
+
+    assert Sampler(sys_dev_block=str(tmp_path / 'missing')).block_device(str(tmp_path)) is None
+    with pytest.raises(OSError):
+        sampler.block_device(str(tmp_path / 'unmounted'))
@@ -0,0 +1,151 @@
+import pytest
+import sys
+import os
+import threading
+
+# Add the Code directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../Code')))
+
+from scheduler import Scheduler
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+def test_tasks_run_at_their_own_period():
+    clock = FakeClock()
+    scheduler = Scheduler(clock=clock)
+    calls = []
+    scheduler.add('fast', lambda: calls.append('fast'), 0.5)
+    scheduler.add('slow', lambda: calls.append('slow'), 2.0)
+
+    for _ in range(5):  # t = 100.0 .. 102.0
+        scheduler.run_pending()
+        clock.now += 0.5
+
+    assert calls.count('fast') == 5
+    assert calls.count('slow') == 2
+
+def test_same_deadline_runs_in_registration_order():
+    clock = FakeClock()
+    scheduler = Scheduler(clock=clock)
+    calls = []
+    scheduler.add('producer', lambda: calls.append('producer'), 1.0)
+    scheduler.add('consumer', lambda: calls.append('consumer'), 1.0)
+    scheduler.run_pending()
+    assert calls == ['producer', 'consumer']
+
+def test_deadlines_do_not_drift():
+    clock = FakeClock()
+    scheduler = Scheduler(clock=clock)
+
+    def slow_task():
+        clock.now += 0.3  # Task takes 300 ms
+
+    scheduler.add('task', slow_task, 1.0)
+    scheduler.run_pending()
+    # Next run is anchored to the previous deadline, not the finish time
+    assert scheduler.time_until_next() == pytest.approx(0.7)
+
+def test_overrun_skips_missed_runs():
+    clock = FakeClock()
+    scheduler = Scheduler(clock=clock)
+    calls = []
+
+    def stuck_task():
+        calls.append(clock.now)
+        clock.now += 3.5
+
+    scheduler.add('task', stuck_task, 1.0)
+    scheduler.run_pending()
+    assert scheduler.time_until_next() == pytest.approx(0.5)
+    assert scheduler.run_pending() == 0
+    assert len(calls) == 1
+
+def test_remove_task():
+    clock = FakeClock()
+    scheduler = Scheduler(clock=clock)
+    calls = []
+    scheduler.add('task', lambda: calls.append(1), 1.0)
+    scheduler.remove('task')
+    assert 'task' not in scheduler
+    assert scheduler.run_pending() == 0
+    assert scheduler.time_until_next() is None
+
+def test_invalid_period():
+    with pytest.raises(ValueError):
+        Scheduler().add('task', lambda: None, 0)
+
+def test_run_stops_on_event():
+    scheduler = Scheduler()
+    stop_event = threading.Event()
+    calls = []
+
+    def task():
+        calls.append(1)
+        if len(calls) == 3:
+            stop_event.set()
+
+    scheduler.add('task', task, 0.001)
+    scheduler.run(stop_event)
+    assert len(calls) == 3
+
+def test_trigger_runs_task_early():
+    clock = FakeClock()
+    scheduler = Scheduler(clock=clock)
+    calls = []
+    scheduler.add('display', lambda: calls.append(clock.now), 3.0)
+    scheduler.run_pending()
+    assert calls == [100.0]
+
+    clock.now = 101.0
+    assert scheduler.trigger('display')
+    assert scheduler.time_until_next() == 0.0
+    scheduler.run_pending()
+    assert calls == [100.0, 101.0]
+
+    # The cadence continues from the triggered run
+    clock.now = 103.5
+    scheduler.run_pending()
+    assert len(calls) == 2
+    clock.now = 104.0
+    scheduler.run_pending()
+    assert calls[-1] == 104.0
+
+    assert not scheduler.trigger('missing')
+
+def test_levels_run_in_order_and_in_parallel():
+    from concurrent.futures import ThreadPoolExecutor
+    clock = FakeClock()
+    calls = []
+    barrier = threading.Barrier(2, timeout=1)
+
+    def producer(name):
+        barrier.wait()  # Only returns if both producers run at the same time
+        calls.append(name)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        scheduler = Scheduler(clock=clock, executor=executor)
+        scheduler.add('consumer', lambda: calls.append('consumer'), 1.0, level=1)
+        scheduler.add('temp', lambda: producer('temp'), 1.0)
+        scheduler.add('cpu', lambda: producer('cpu'), 1.0)
+        scheduler.run_pending()
+
+    assert sorted(calls[:2]) == ['cpu', 'temp']
+    assert calls[2] == 'consumer'
+
+def test_level_failure_is_raised():
+    from concurrent.futures import ThreadPoolExecutor
+
+    def fail():
+        raise RuntimeError("sensor error")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        scheduler = Scheduler(clock=FakeClock(), executor=executor)
+        scheduler.add('bad', fail, 1.0)
+        scheduler.add('good', lambda: None, 1.0)
+        with pytest.raises(RuntimeError):
+            scheduler.run_pending()
@@ -0,0 +1,134 @@
+import pytest
+import json
+import sys
+import os
+import stat
+
+# Add the Code directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../Code')))
+
+from status_channel import (StatusChannel, StatusClient, encode_status, decode_status,
+                            write_status_file, SOCKET_MODE)
+
+def test_record_round_trip():
+    record = encode_status('wifi_scan', seq=7, progress=50, progress_max=200, phase='WiFi Scan',
+                           target='wlan1', message='APs: 12', details={'channel': 6})
+    assert decode_status(record) == {
+        'mode': 'wifi_scan', 'seq': 7, 'progress': 50.0, 'progress_max': 200.0,
+        'phase': 'WiFi Scan', 'target': 'wlan1', 'message': 'APs: 12', 'details': {'channel': 6},
+    }
+
+def test_progress_record_is_compact():
+    record = encode_status('scanning', progress=42)
+    assert len(record) <= 20
+    assert decode_status(record) == {'mode': 'scanning', 'seq': 0, 'progress': 42.0}
+
+def test_clear_progress():
+    assert decode_status(encode_status('recon', progress=None))['progress'] is None
+
+def test_encode_rejects_unknown_mode_and_fields():
+    with pytest.raises(ValueError):
+        encode_status('dancing')
+    with pytest.raises(ValueError):
+        encode_status('idle', colour='red')
+
+def test_decode_rejects_malformed_records():
+    record = encode_status('alert', message='boom')
+    with pytest.raises(ValueError):
+        decode_status(record[:-2])
+    with pytest.raises(ValueError):
+        decode_status(b'XX' + record[2:])
+    with pytest.raises(ValueError):
+        decode_status(record + b'\0')
+
+def test_client_to_channel(tmp_path):
+    path = str(tmp_path / 'status.sock')
+    channel = StatusChannel(path)
+    client = StatusClient(path)
+    for progress in range(5):
+        assert client.send('scanning', progress=progress)
+    channel.sock.sendto(b'garbage', path)
+
+    records = channel.drain()
+    assert [r['progress'] for r in records] == list(range(5))
+    assert [r['seq'] for r in records] == list(range(5))
+    assert channel.dropped == 1
+    assert channel.drain() == []
+
+    client.close()
+    channel.close()
+    assert not os.path.exists(path)
+
+def test_client_coalesces_when_channel_is_full(tmp_path):
+    path = str(tmp_path / 'status.sock')
+    channel = StatusChannel(path)
+    client = StatusClient(path)
+    client.send('scanning', phase='Nmap')
+    for progress in range(1000):
+        client.send('scanning', progress=progress, message=f'host {progress}')
+
+    records = channel.drain()
+    assert records[0]['phase'] == 'Nmap'
+    assert client.flush()
+    last = channel.drain()[-1]
+    assert last['progress'] == 999
+    assert last['message'] == 'host 999'
+
+    client.close()
+    channel.close()
+
+def test_channel_replaces_stale_socket_but_not_live_one(tmp_path):
+    path = str(tmp_path / 'status.sock')
+    channel = StatusChannel(path)
+    with pytest.raises(OSError):
+        StatusChannel(path)
+    channel.sock.close()  # Crashed without removing the path
+
+    channel = StatusChannel(path)
+    channel.close()
+
+def test_channel_socket_mode_ignores_umask(tmp_path):
+    path = str(tmp_path / 'status.sock')
+    umask = os.umask(0o077)
+    try:
+        channel = StatusChannel(path)
+    finally:
+        os.umask(umask)
+    assert stat.S_IMODE(os.stat(path).st_mode) == SOCKET_MODE == 0o666
+    channel.close()
+
+    channel = StatusChannel(path, mode=0o660, group=os.getgid())
+    info = os.stat(path)
+    assert stat.S_IMODE(info.st_mode) == 0o660
+    assert info.st_gid == os.getgid()
+    channel.close()
+
+def test_client_falls_back_to_status_file(tmp_path):
+    status_file = str(tmp_path / 'status.json')
+    client = StatusClient(str(tmp_path / 'missing.sock'), fallback_file=status_file)
+    assert not client.send('recon', phase='OSINT')
+    assert not client.send('recon', progress=5)
+    with pytest.raises(ValueError):
+        client.send('recon', colour='red')
+    client.close()
+
+    with open(status_file) as f:
+        assert json.load(f) == {'mode': 'recon', 'phase': 'OSINT', 'progress': 5}
+
+def test_write_status_file(tmp_path):
+    path = str(tmp_path / 'status.json')
+    write_status_file({'mode': 'safe'}, path)
+    with open(path) as f:
+        assert json.load(f) == {'mode': 'safe'}
+    assert os.listdir(tmp_path) == ['status.json']
+
+def test_client_rejects_seq(tmp_path):
+    client = StatusClient(str(tmp_path / 'status.sock'))
+    with pytest.raises(ValueError):
+        client.send('scanning', seq=5)
+    assert client._pending == {}
+    client.close()
+
+def test_tests_use_a_private_socket(tmp_path):
+    import status_channel
+    assert status_channel.SOCKET_PATH == str(tmp_path / 'cyberdeck_status.sock')